@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+import logging
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """Serve fixture pages, resolving extensionless paths to .html files"""
+
+    def __init__(self, *args, latency_ms=0, **kwargs):
+        self.latency_ms = latency_ms
+        super().__init__(*args, **kwargs)
+
+    def translate_path(self, path):
+        resolved = super().translate_path(path)
+        if not os.path.exists(resolved) and os.path.exists(resolved + ".html"):
+            return resolved + ".html"
+        return resolved
+
+    def do_GET(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        logger.debug("fixture server: " + format, *args)
+
+class FixtureServer:
+    """
+    Local stand-in for Edelweiss, Hachette and Fantastic Fiction.
+
+    Serves the pages under benchmarks/fixtures so runs need no network
+    access. The pages are hand-built stand-ins, not recordings: they
+    reproduce the markup and class names the scrapers select on, and the
+    Edelweiss one renders its results from the records in books.js. Use the
+    HAR archives (har_archive.py) for byte-for-byte recorded sessions.
+
+        /edelweiss/                  Edelweiss+ login, dashboard and search
+        /hachette/login              Hachette trade login
+        /fantastic-fiction/search/   Fantastic Fiction author search
+
+    Usage:
+        with FixtureServer() as server:
+            os.environ.update(server.env())
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        handler = partial(FixtureRequestHandler, directory=FIXTURES_DIR, latency_ms=latency_ms)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """
+        Environment variables that point the scrapers at this server, and
+        keep the URLs and catalogs they learn out of the persistent stores
+        """
+        return {
+            "EDELWEISS_URL": f"{self.base_url}/edelweiss/",
+            "HACHETTE_LOGIN_URL": f"{self.base_url}/hachette/login",
+            "FANTASTIC_FICTION_URL": f"{self.base_url}/fantastic-fiction",
+            "PRODUCT_INDEX_PATH": ":memory:",
+            "CATALOG_SNAPSHOTS_PATH": ":memory:",
+            "BOOK_INDEX_PATH": ":memory:",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Fixture server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the scraper fixtures locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency_ms=args.latency_ms)
+    for key, value in server.env().items():
+        print(f"{key}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
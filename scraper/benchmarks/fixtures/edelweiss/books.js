@@ -0,0 +1,115 @@
+// Title records backing the recorded Edelweiss+ search results.
+window.EDELWEISS_BOOKS = [
+  {
+    "isbn": "9781869712341",
+    "title": "The River at Dusk",
+    "subtitle": "A Novel",
+    "author": "Mere Walker",
+    "pubDate": "Feb 2026",
+    "formatPrice": "Trade Paperback $37.99 NZD",
+    "discountCode": "T",
+    "status": "Active",
+    "pages": 352,
+    "dimensions": "23.4 x 15.3 cm",
+    "bisac": [
+      "FICTION / Literary",
+      "FICTION / Family Life / General"
+    ],
+    "honors": [
+      "Ockham Longlist"
+    ],
+    "community": [
+      "14 Reviews",
+      "3 Pre-orders"
+    ],
+    "summary": "Three generations of a family return to the river that shaped them in this luminous novel about memory, land and belonging. When the old homestead is put up for sale, Aroha must decide what she owes the past and what she is willing to carry forward into the story of her own children."
+  },
+  {
+    "isbn": "9781869715670",
+    "title": "Glass Harbour",
+    "subtitle": null,
+    "author": "Tom Ellery",
+    "pubDate": "Mar 2026",
+    "formatPrice": "Hardback $49.99 NZD",
+    "discountCode": "H",
+    "status": "Active",
+    "pages": 416,
+    "dimensions": "24.0 x 16.0 cm",
+    "bisac": [
+      "FICTION / Thrillers / Suspense"
+    ],
+    "honors": [],
+    "community": [
+      "5 Reviews"
+    ],
+    "summary": "A detective returns to the coastal town she fled a decade ago after a body surfaces beneath the harbour ice. Critics have called this debut thriller taut and atmospheric, a story of old secrets, small-town loyalties and the characters who would rather the truth stayed frozen."
+  },
+  {
+    "isbn": "9781869718909",
+    "title": "Kitchen Garden Year",
+    "subtitle": "Growing Food in Every Season",
+    "author": "Ana Lusk",
+    "pubDate": "Apr 2026",
+    "formatPrice": "Trade Paperback $45.00 NZD",
+    "discountCode": "T",
+    "status": "Forthcoming",
+    "pages": 288,
+    "dimensions": "25.0 x 20.0 cm",
+    "bisac": [
+      "GARDENING / Vegetables",
+      "COOKING / Seasonal"
+    ],
+    "honors": [],
+    "community": [],
+    "summary": "From the first seedlings of spring to the last winter greens, this practical guide walks readers through a full year of growing food at home. Packed with planting calendars, simple recipes and hard-won advice, the book is written for gardeners with a balcony, a backyard or a shared plot."
+  },
+  {
+    "isbn": "9781869720032",
+    "title": "The Cartographer's Daughter",
+    "subtitle": null,
+    "author": "Lydia Marsh",
+    "pubDate": "Jan 2026",
+    "formatPrice": "Trade Paperback $36.99 NZD",
+    "discountCode": "T",
+    "status": "Active",
+    "pages": 400,
+    "dimensions": "23.4 x 15.3 cm",
+    "bisac": [
+      "FICTION / Historical / General"
+    ],
+    "honors": [
+      "Bestseller"
+    ],
+    "community": [
+      "22 Reviews"
+    ],
+    "summary": "In 1862, a mapmaker's daughter sets out to finish the survey her father abandoned, crossing uncharted ranges with a reluctant guide. A sweeping historical novel about ambition and grief, and the lines we draw across land that was never empty."
+  },
+  {
+    "isbn": "9781869712990",
+    "title": "The River at Dusk",
+    "subtitle": "A Novel",
+    "author": "Mere Walker",
+    "pubDate": "Feb 2026",
+    "formatPrice": "Hardback $55.00 NZD",
+    "discountCode": "H",
+    "status": "Active",
+    "pages": 352,
+    "dimensions": "23.4 x 15.3 cm",
+    "bisac": [
+      "FICTION / Literary",
+      "FICTION / Family Life / General"
+    ],
+    "honors": [
+      "Ockham Longlist"
+    ],
+    "community": [
+      "14 Reviews",
+      "3 Pre-orders"
+    ],
+    "summary": "Three generations of a family return to the river that shaped them in this luminous novel about memory, land and belonging. When the old homestead is put up for sale, Aroha must decide what she owes the past and what she is willing to carry forward into the story of her own children.",
+    "related": [
+      "9781869712341"
+    ]
+  }
+];
@@ -0,0 +1,257 @@
+"""
+Load-test harness for the FastAPI endpoints.
+
+Starts the real app under uvicorn in a subprocess, points it at the local
+fixture server (with tunable upstream latency) and drives it with an
+open-loop arrival rate, a concurrency cap and a weighted request mix.
+Reports API-level throughput, tail latency, error rates and the memory
+growth of the server process tree.
+
+Run from the scraper directory:
+
+    python -m benchmarks.load_test --rate 0.5 --concurrency 4 --duration 120
+    python -m benchmarks.load_test --stages 0.1,0.2,0.5,1 --duration 60 \
+        --mix scrape-multiple=1 --upstream-latency-ms 200
+
+Each stage runs for --duration seconds; throughput flattening while p95 and
+queue time climb marks the saturation point.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.run_benchmarks import load_edelweiss_fixture_books
+from benchmarks.stats import percentile
+from process_memory import tree_rss_bytes
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REQUEST_KINDS = ("scrape", "scrape-multiple", "summary", "hachette", "hachette-enrich", "fantastic-fiction")
+DEFAULT_MIX = "scrape=6,scrape-multiple=1,hachette=2,fantastic-fiction=1"
+
+def build_request(kind, isbns):
+    """
+    Build one request of the given kind
+
+    Returns:
+        tuple: (method, path, json body or None)
+    """
+    if kind == "scrape":
+        return "POST", "/scrape", {"isbn": random.choice(isbns)}
+    if kind == "scrape-multiple":
+        return "POST", "/scrape-multiple", {"isbns": random.sample(isbns, min(3, len(isbns)))}
+    if kind == "summary":
+        return "GET", f"/edelweiss/summary/{random.choice(isbns)}", None
+    if kind == "hachette":
+        return "GET", "/hachette/scrape?query=January%202026%20HNZ", None
+    if kind == "hachette-enrich":
+        return "GET", "/hachette/enrich?query=January%202026%20HNZ", None
+    if kind == "fantastic-fiction":
+        return "GET", "/fantastic-fiction/search?author_name=David%20Baldacci", None
+    raise ValueError(f"Unknown request kind: {kind}")
+
+def parse_mix(mix):
+    """Parse 'kind=weight,kind=weight' into parallel lists"""
+    kinds, weights = [], []
+    for part in mix.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of: {', '.join(REQUEST_KINDS)}")
+        kinds.append(kind)
+        weights.append(float(weight or 1))
+    return kinds, weights
+
+def send(base_url, method, path, body, timeout):
+    """
+    Send one blocking HTTP request
+
+    Returns:
+        tuple: (ok, status code or error name)
+    """
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method)
+    if data is not None:
+        request.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return 200 <= response.status < 300, response.status
+    except urllib.error.HTTPError as e:
+        return False, e.code
+    except Exception as e:
+        return False, type(e).__name__
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_app(env, port):
+    """Start the API under uvicorn and wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SCRAPER_DIR,
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API process exited during startup")
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=2).read()
+            return process, base_url
+        except Exception:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API did not start within 60s")
+
+async def run_stage(base_url, rate, concurrency, duration, kinds, weights, isbns, timeout, server_pid):
+    """
+    Drive the API at one arrival rate
+
+    With rate > 0 requests arrive as a Poisson process regardless of how fast
+    the server answers (open loop); latency is measured from the scheduled
+    arrival, so time spent waiting for a free concurrency slot is included.
+    With rate == 0 the harness runs closed loop with `concurrency` workers.
+
+    Returns:
+        dict: Per-kind and overall results plus memory samples
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    samples = []
+    memory = [tree_rss_bytes(server_pid)]
+
+    async def one(kind, arrived):
+        async with slots:
+            started = time.perf_counter()
+            method, path, body = build_request(kind, isbns)
+            ok, status = await loop.run_in_executor(executor, send, base_url, method, path, body, timeout)
+        finished = time.perf_counter()
+        samples.append({
+            "kind": kind,
+            "ok": ok,
+            "status": status,
+            "latency_ms": (finished - arrived) * 1000,
+            "queue_ms": (started - arrived) * 1000,
+        })
+
+    async def sample_memory():
+        while True:
+            await asyncio.sleep(1)
+            memory.append(await loop.run_in_executor(None, tree_rss_bytes, server_pid))
+
+    sampler = asyncio.create_task(sample_memory())
+    stage_started = time.perf_counter()
+    tasks = []
+
+    if rate > 0:
+        next_arrival = stage_started
+        while next_arrival - stage_started < duration:
+            await asyncio.sleep(max(0, next_arrival - time.perf_counter()))
+            kind = random.choices(kinds, weights)[0]
+            tasks.append(asyncio.create_task(one(kind, next_arrival)))
+            next_arrival += random.expovariate(rate)
+    else:
+        async def worker():
+            while time.perf_counter() - stage_started < duration:
+                await one(random.choices(kinds, weights)[0], time.perf_counter())
+        tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - stage_started
+    sampler.cancel()
+    memory.append(tree_rss_bytes(server_pid))
+    executor.shutdown(wait=False)
+
+    return {"samples": samples, "elapsed": elapsed, "memory": memory}
+
+def summarize(samples, elapsed):
+    latencies = [s["latency_ms"] for s in samples]
+    errors = [s for s in samples if not s["ok"]]
+    return {
+        "requests": len(samples),
+        "throughput_per_s": round(len(samples) / elapsed, 3) if elapsed else 0,
+        "error_rate": round(len(errors) / len(samples), 3) if samples else 0,
+        "p50_ms": round(percentile(latencies, 50)),
+        "p95_ms": round(percentile(latencies, 95)),
+        "p99_ms": round(percentile(latencies, 99)),
+        "max_ms": round(max(latencies)) if latencies else 0,
+        "queue_p95_ms": round(percentile([s["queue_ms"] for s in samples], 95)),
+    }
+
+def print_stage(label, result):
+    samples = result["samples"]
+    print(f"\n=== {label} ===")
+    print("endpoint            requests  thr/s   err%    p50 ms   p95 ms   p99 ms   max ms   queue p95")
+    kinds = sorted({s["kind"] for s in samples})
+    for kind in kinds + ["ALL"]:
+        subset = samples if kind == "ALL" else [s for s in samples if s["kind"] == kind]
+        m = summarize(subset, result["elapsed"])
+        print(f"{kind:<19} {m['requests']:>8} {m['throughput_per_s']:>6} {m['error_rate'] * 100:>6.1f} "
+              f"{m['p50_ms']:>9} {m['p95_ms']:>8} {m['p99_ms']:>8} {m['max_ms']:>8} {m['queue_p95_ms']:>11}")
+    statuses = {}
+    for s in samples:
+        if not s["ok"]:
+            statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+    if statuses:
+        print(f"errors by status: {statuses}")
+    memory = result["memory"]
+    mb = 1024 * 1024
+    print(f"server RSS: start {memory[0] / mb:.0f} MB, end {memory[-1] / mb:.0f} MB, "
+          f"peak {max(memory) / mb:.0f} MB, growth {(memory[-1] - memory[0]) / mb:+.0f} MB")
+
+async def main_async(args):
+    kinds, weights = parse_mix(args.mix)
+    isbns = [b["isbn"] for b in load_edelweiss_fixture_books()]
+    stages = [float(r) for r in args.stages.split(",")] if args.stages else [args.rate]
+
+    with FixtureServer(latency_ms=args.upstream_latency_ms) as server:
+        process, base_url = start_app(server.env(), args.port or free_port())
+        try:
+            results = {}
+            for rate in stages:
+                label = f"rate {rate}/s, concurrency {args.concurrency}" if rate > 0 else f"closed loop, concurrency {args.concurrency}"
+                print(f"Running stage: {label} for {args.duration}s...")
+                result = await run_stage(base_url, rate, args.concurrency, args.duration, kinds, weights,
+                                         isbns, args.timeout, process.pid)
+                print_stage(label, result)
+                results[label] = {**summarize(result["samples"], result["elapsed"]),
+                                  "rss_growth_mb": round((result["memory"][-1] - result["memory"][0]) / (1024 * 1024), 1)}
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the scraper API against local upstream stand-ins")
+    parser.add_argument("--rate", type=float, default=0.2, help="Arrivals per second (0 = closed loop)")
+    parser.add_argument("--stages", help="Comma separated arrival rates to run one after another")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum requests in flight")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per stage")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted request mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--upstream-latency-ms", type=int, default=0, help="Latency added to every fixture response")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-request client timeout in seconds")
+    parser.add_argument("--port", type=int, default=0, help="API port (default: random free port)")
+    parser.add_argument("--output", help="Write stage summaries as JSON to this file")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Offline benchmark suite for the scrapers.
+
+Serves the fixture pages from a local server, points the scrapers at it and
+runs each scraper a number of times, reporting throughput, p50/p95 latency
+and peak RSS of the process tree (Python + Playwright + Chromium). Results
+are compared against benchmarks/baseline.json to catch regressions; a
+missing baseline is an error (exit code 2), regressions exit with 1.
+
+Run from the scraper directory:
+
+    python -m benchmarks.run_benchmarks                     # compare to baseline
+    python -m benchmarks.run_benchmarks --update-baseline   # record a new baseline
+    python -m benchmarks.run_benchmarks --only edelweiss --iterations 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+from benchmarks.fixture_server import FixtureServer, FIXTURES_DIR
+from benchmarks.stats import percentile, PeakRSSSampler
+from browser_pool import close_browser_pool
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics where a larger value is a regression, and where a smaller one is
+LOWER_IS_BETTER = ["p50_ms", "p95_ms", "peak_rss_mb"]
+HIGHER_IS_BETTER = ["throughput_per_s"]
+
+def load_edelweiss_fixture_books():
+    """Read the title records behind the Edelweiss fixture"""
+    with open(os.path.join(FIXTURES_DIR, "edelweiss", "books.js")) as f:
+        source = f.read()
+    return json.loads(source[source.index("["):source.rindex("]") + 1])
+
+def count_hachette_fixture_books(catalog_file):
+    """Unique ISBNs listed in a Hachette catalog fixture"""
+    with open(os.path.join(FIXTURES_DIR, "hachette", "catalog", catalog_file)) as f:
+        return len(set(re.findall(r'<p class="details">(97[89]\d{10})', f.read())))
+
+def count_fantastic_fiction_fixture_results():
+    """Search results in the Fantastic Fiction fixture"""
+    with open(os.path.join(FIXTURES_DIR, "fantastic-fiction", "search", "index.html")) as f:
+        return f.read().count('class="search-result"')
+
+def build_scenarios(server):
+    """
+    Build the benchmark scenarios. Imports the scrapers only after the
+    environment points them at the fixture server.
+    """
+    import main
+    from fantastic_fiction_scraper import search_fantastic_fiction
+
+    fixture_books = load_edelweiss_fixture_books()
+    expected_summaries = {b["isbn"]: main.clean_string(b["summary"]) for b in fixture_books}
+    isbns = [b["isbn"] for b in fixture_books if not b.get("related")]
+    expected_hachette_books = count_hachette_fixture_books("january-2026-HNZ.html")
+    batch_catalogs = {
+        "January 2026 HNZ": count_hachette_fixture_books("january-2026-HNZ.html"),
+        "February 2026 HNZ": count_hachette_fixture_books("february-2026-HNZ.html"),
+        "January 2026 HCB": count_hachette_fixture_books("january-2026-HCB.html"),
+    }
+    # search_fantastic_fiction only extracts the first 10 results
+    expected_ff_books = min(10, count_fantastic_fiction_fixture_results())
+
+    async def edelweiss():
+        # Measure extraction, not the summary cache
+        main.summary_cache.clear()
+        results = await main.scrape_isbns(isbns, login_required=True, include_summary=True)
+        for isbn in isbns:
+            result = results.get(isbn, {})
+            if result.get("status") != "data_found":
+                return False
+            for book in result["books"]:
+                if book.get("summary") != expected_summaries.get(book.get("isbn")):
+                    return False
+        return True
+
+    async def edelweiss_exact():
+        # After the first iteration every title opens from the product index
+        main.summary_cache.clear()
+        results = await main.scrape_isbns(isbns, login_required=True, include_summary=True, exact=True)
+        for isbn in isbns:
+            books = [b for b in results.get(isbn, {}).get("books", []) if not b.get("stub")]
+            if len(books) != 1 or books[0].get("summary") != expected_summaries.get(isbn):
+                return False
+        return True
+
+    async def edelweiss_summary_fallback():
+        # With no summary selectors every summary comes from the in-page
+        # text-density pass, which must find the same text
+        selectors, fallbacks = main.SUMMARY_SELECTORS, main.SUMMARY_FALLBACKS
+        main.SUMMARY_SELECTORS, main.SUMMARY_FALLBACKS = [], []
+        try:
+            return await edelweiss()
+        finally:
+            main.SUMMARY_SELECTORS, main.SUMMARY_FALLBACKS = selectors, fallbacks
+
+    async def hachette():
+        books = await main.navigate_and_login_hachette(
+            f"{server.base_url}/hachette/login", "46628", "January 2026 HNZ"
+        )
+        return len(books) == expected_hachette_books
+
+    async def hachette_batch():
+        counts = {}
+        async for query, books, error, _ in main.scrape_hachette_catalogs(
+            list(batch_catalogs), f"{server.base_url}/hachette/login", "46628"
+        ):
+            counts[query] = None if error else len(books)
+        return counts == batch_catalogs
+
+    async def fantastic_fiction():
+        result = await search_fantastic_fiction("David Baldacci")
+        return result.success and result.total_books == expected_ff_books
+
+    return {
+        "edelweiss": (edelweiss, len(isbns)),
+        "edelweiss_exact": (edelweiss_exact, len(isbns)),
+        "edelweiss_summary_fallback": (edelweiss_summary_fallback, len(isbns)),
+        "hachette": (hachette, 1),
+        "hachette_batch": (hachette_batch, len(batch_catalogs)),
+        "fantastic_fiction": (fantastic_fiction, 1),
+    }
+
+async def run_scenario(name, func, items_per_call, iterations):
+    """
+    Run one scenario repeatedly
+
+    Args:
+        name (str): Scenario name
+        func: Coroutine function returning True if the output was correct
+        items_per_call (int): Items (ISBNs, catalogs, searches) handled per call
+        iterations (int): Number of calls
+
+    Returns:
+        dict: Measured metrics
+    """
+    latencies = []
+    correct = True
+    with PeakRSSSampler() as sampler:
+        started = time.perf_counter()
+        for i in range(iterations):
+            call_started = time.perf_counter()
+            ok = await func()
+            latencies.append((time.perf_counter() - call_started) * 1000)
+            correct = correct and ok
+            print(f"  {name} #{i + 1}: {latencies[-1]:.0f} ms{'' if ok else ' (unexpected output)'}")
+        elapsed = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "throughput_per_s": round(items_per_call * iterations / elapsed, 4),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "peak_rss_mb": round(sampler.peak_bytes / (1024 * 1024), 1),
+        "correct": correct,
+    }
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare results to the baseline
+
+    Args:
+        results (dict): Metrics per scenario
+        baseline (dict): Baseline metrics per scenario
+        tolerance (float): Allowed relative regression (0.2 = 20%)
+
+    Returns:
+        List[str]: Human readable regressions, empty if none
+    """
+    regressions = []
+    for name, metrics in results.items():
+        if not metrics["correct"]:
+            regressions.append(f"{name}: output no longer matches the fixtures")
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in LOWER_IS_BETTER:
+            if base.get(key) and metrics[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {metrics[key]} > baseline {base[key]}")
+        for key in HIGHER_IS_BETTER:
+            if base.get(key) and metrics[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{name}: {key} {metrics[key]} < baseline {base[key]}")
+    return regressions
+
+async def main_async(args):
+    with FixtureServer(latency_ms=args.latency_ms) as server:
+        os.environ.update(server.env())
+        scenarios = build_scenarios(server)
+        selected = args.only or list(scenarios)
+
+        results = {}
+        try:
+            for name in selected:
+                func, items_per_call = scenarios[name]
+                print(f"Running {name} ({args.iterations} iterations)...")
+                results[name] = await run_scenario(name, func, items_per_call, args.iterations)
+        finally:
+            await close_browser_pool()
+
+    print("\nScenario            throughput/s   p50 ms   p95 ms   peak RSS MB   correct")
+    for name, m in results.items():
+        print(f"{name:<19} {m['throughput_per_s']:>12} {m['p50_ms']:>8} {m['p95_ms']:>8} {m['peak_rss_mb']:>13}   {m['correct']}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        baseline.update({name: {k: v for k, v in m.items() if k != "correct"} for name, m in results.items()})
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print(f"\nNo baseline at {BASELINE_PATH} - record one with --update-baseline on the reference machine")
+        return 2
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--only", action="append", choices=["edelweiss", "edelweiss_exact", "edelweiss_summary_fallback", "hachette", "hachette_batch", "fantastic_fiction"])
+    parser.add_argument("--latency-ms", type=int, default=0, help="Artificial latency per fixture request")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+if __name__ == "__main__":
+    main()
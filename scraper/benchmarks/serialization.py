@@ -0,0 +1,157 @@
+"""
+Serialization and transfer benchmark for catalog-sized responses.
+
+Builds realistic response payloads from the fixture records (a
+/scrape-multiple result with a summary on every book, and a full Hachette
+catalog) and compares, per payload:
+
+  - the default FastAPI path: pydantic validation (Hachette) or
+    jsonable_encoder (Edelweiss dicts) followed by json.dumps
+  - ORJSONResponse on plain dicts
+  - gzip and brotli (when installed) at the levels the middleware uses
+
+Transfer times are estimated from --bandwidth-mbps, so the table shows
+the end-to-end time saved per response, not just CPU time.
+
+Run from the scraper directory:
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --isbns 200 --catalog-size 2000 --bandwidth-mbps 50
+"""
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.run_benchmarks import load_edelweiss_fixture_books
+from benchmarks.stats import percentile
+import response_encoding
+from response_encoding import ORJSONResponse, compress
+
+def edelweiss_payload(isbn_count, books_per_isbn):
+    """/scrape-multiple result with every Edelweiss field and a summary on every book"""
+    fixtures = load_edelweiss_fixture_books()
+    words = " ".join(record["summary"] for record in fixtures).split()
+    # Shuffled summaries, so compression is not flattered by repeated text
+    shuffle = random.Random(0)
+    results = {}
+    for i in range(isbn_count):
+        isbn = f"978{i:010d}"
+        books = []
+        for j in range(books_per_isbn):
+            record = fixtures[(i + j) % len(fixtures)]
+            books.append({
+                "title": record["title"],
+                "subtitle": record.get("subtitle", ""),
+                "author": record["author"],
+                "isbn": isbn if j == 0 else f"979{i * books_per_isbn + j:010d}",
+                "cover": f"https://covers.edelweiss.plus/{isbn}.jpg",
+                "pubInfo": f"Penguin Random House | {record.get('pubDate', '')}",
+                "formatPrice": record.get("formatPrice", ""),
+                "discountCode": record.get("discountCode", ""),
+                "bisac": record.get("bisac", []),
+                "relatedProducts": [],
+                "pages": f"{record.get('pages', '')} pages",
+                "dimensions": record.get("dimensions", ""),
+                "status": record.get("status", ""),
+                "salesRights": "Sales rights: NZ, AU",
+                "honors": record.get("honors", []),
+                "community": record.get("community", []),
+                "summary": " ".join(shuffle.sample(words, min(len(words), 180))),
+            })
+        results[isbn] = {"status": "success", "message": f"Found {len(books)} book(s) for ISBN: {isbn}", "books": books}
+    return results
+
+def hachette_books(catalog_size):
+    """Book dicts as extracted from a Hachette catalog"""
+    formats = ["Paperback - B Format", "Paperback - C Format", "Hardback"]
+    return [
+        {
+            "title": f"Catalog Title {i}",
+            "author": f"Author {i % 150}",
+            "isbn": f"978{i:010d}",
+            "price": f"${20 + i % 30}.99",
+            "format": formats[i % 3],
+            "publication_date": "Jan 2026",
+            "cover_url": f"https://images.hachette.co.nz/covers/978{i:010d}.jpg",
+        }
+        for i in range(catalog_size)
+    ]
+
+def default_json(content):
+    """Starlette JSONResponse rendering"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def build_cases(args):
+    """
+    Returns:
+        list: (name, default serializer, orjson serializer) per payload
+    """
+    import main
+
+    edelweiss = edelweiss_payload(args.isbns, args.books_per_isbn)
+    books = hachette_books(args.catalog_size)
+    message = f"Successfully scraped {len(books)} books from Hachette HNZ catalog"
+    return [
+        (
+            f"scrape-multiple ({args.isbns} ISBNs)",
+            lambda: default_json(jsonable_encoder(edelweiss)),
+            lambda: ORJSONResponse(edelweiss).body,
+        ),
+        (
+            f"hachette ({args.catalog_size} titles)",
+            lambda: default_json(jsonable_encoder(main.ScraperResponse(
+                success=True, message=message, books=[main.BookData(**book) for book in books], total_books=len(books)
+            ))),
+            lambda: ORJSONResponse(main.scraper_payload(True, message, books)).body,
+        ),
+    ]
+
+def timed(fn, iterations):
+    """p50 milliseconds of fn, and its last result"""
+    samples, result = [], None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentile(samples, 50), result
+
+def transfer_ms(size, bandwidth_mbps):
+    return size * 8 / (bandwidth_mbps * 1_000_000) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization and compression benchmark")
+    parser.add_argument("--isbns", type=int, default=50)
+    parser.add_argument("--books-per-isbn", type=int, default=4)
+    parser.add_argument("--catalog-size", type=int, default=800)
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0, help="Link speed used for transfer estimates")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    encodings = ["gzip"] + (["br"] if response_encoding.brotli is not None else [])
+    print(f"Transfer estimates at {args.bandwidth_mbps:g} Mbit/s, p50 of {args.iterations} iterations")
+    if "br" not in encodings:
+        print("brotli is not installed - brotli rows skipped")
+
+    for name, default_fn, orjson_fn in build_cases(args):
+        default_ms, default_body = timed(default_fn, args.iterations)
+        orjson_ms, body = timed(orjson_fn, args.iterations)
+        assert json.loads(default_body) == json.loads(body), f"{name}: orjson output differs"
+        baseline_ms = default_ms + transfer_ms(len(default_body), args.bandwidth_mbps)
+
+        print(f"\n{name}")
+        print("  path                     size KB   serialize ms   compress ms   transfer ms   total ms   saved ms")
+        rows = [("default json", len(default_body), default_ms, 0.0), ("orjson", len(body), orjson_ms, 0.0)]
+        for encoding in encodings:
+            compress_ms, compressed = timed(lambda: compress(body, encoding), args.iterations)
+            rows.append((f"orjson + {encoding}", len(compressed), orjson_ms, compress_ms))
+        for label, size, serialize_ms, compress_ms in rows:
+            send_ms = transfer_ms(size, args.bandwidth_mbps)
+            total_ms = serialize_ms + compress_ms + send_ms
+            print(f"  {label:<22} {size / 1024:>9.1f} {serialize_ms:>14.1f} {compress_ms:>13.1f} "
+                  f"{send_ms:>13.1f} {total_ms:>10.1f} {baseline_ms - total_ms:>10.1f}")
+
+if __name__ == "__main__":
+    main()
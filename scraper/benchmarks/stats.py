@@ -0,0 +1,52 @@
+import math
+import threading
+from typing import List
+
+from process_memory import tree_rss_bytes
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        values (List[float]): Samples
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class PeakRSSSampler:
+    """
+    Sample the RSS of this process tree (Python, Playwright driver and
+    Chromium) on a background thread and keep the peak.
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_bytes = 0
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = tree_rss_bytes()
+            self.samples.append(rss)
+            self.peak_bytes = max(self.peak_bytes, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, tree_rss_bytes())
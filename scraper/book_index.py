@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from isbn import normalize_isbn
+
+logger = logging.getLogger(__name__)
+
+BOOK_INDEX_PATH = os.environ.get(
+    "BOOK_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "book_index.sqlite3"),
+)
+
+SOURCES = ("edelweiss", "hachette", "fantastic_fiction")
+# Keys describing one response rather than the book; never stored
+RESPONSE_FLAGS = ("incomplete",)
+
+def record_key(record: Dict[str, Any]) -> Optional[str]:
+    """ISBN-13 of a record, else its URL, else title and author"""
+    isbn = normalize_isbn(record.get("isbn") or "")
+    if isbn:
+        return isbn
+    if record.get("url"):
+        return record["url"]
+    if record.get("title"):
+        return f"{record['title']}|{record.get('author') or ''}"
+    return None
+
+def as_text(value) -> str:
+    if isinstance(value, list):
+        return " ; ".join(str(item) for item in value)
+    return str(value) if value else ""
+
+def fts_query(q: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, the last one
+    as a prefix, and FTS5 operators in the input are taken literally
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in q.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+class BookIndex:
+    """
+    Full-text index of every record the scrapers have produced.
+
+    Records are stored per source and key (ISBN-13 where there is one) in
+    SQLite at BOOK_INDEX_PATH, with an FTS5 index over title, author,
+    summary and BISAC kept in step by triggers. Loading is incremental: a
+    record only updates the fields it has, so a projected or summary-less
+    scrape never blanks out what an earlier scrape found. rebuild()
+    regenerates the FTS index from the stored records.
+
+    Scrapes index through submit(), which hands the records to a single
+    writer thread, so inserts and commits never run on the event loop and
+    land in the order they were submitted.
+    """
+
+    def __init__(self, path: Optional[str] = BOOK_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self.searches = 0
+        self.failures = 0
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS books ("
+                " id INTEGER PRIMARY KEY, source TEXT NOT NULL, key TEXT NOT NULL, isbn TEXT,"
+                " title TEXT, author TEXT, summary TEXT, bisac TEXT, data TEXT NOT NULL, updated_at REAL NOT NULL,"
+                " UNIQUE (source, key));"
+                "CREATE INDEX IF NOT EXISTS books_isbn ON books (isbn);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+                " title, author, summary, bisac, content='books', content_rowid='id', tokenize='unicode61 remove_diacritics 2');"
+                "CREATE TRIGGER IF NOT EXISTS books_ai AFTER INSERT ON books BEGIN"
+                " INSERT INTO books_fts (rowid, title, author, summary, bisac)"
+                " VALUES (new.id, new.title, new.author, new.summary, new.bisac); END;"
+                "CREATE TRIGGER IF NOT EXISTS books_ad AFTER DELETE ON books BEGIN"
+                " INSERT INTO books_fts (books_fts, rowid, title, author, summary, bisac)"
+                " VALUES ('delete', old.id, old.title, old.author, old.summary, old.bisac); END;"
+                "CREATE TRIGGER IF NOT EXISTS books_au AFTER UPDATE ON books BEGIN"
+                " INSERT INTO books_fts (books_fts, rowid, title, author, summary, bisac)"
+                " VALUES ('delete', old.id, old.title, old.author, old.summary, old.bisac);"
+                " INSERT INTO books_fts (rowid, title, author, summary, bisac)"
+                " VALUES (new.id, new.title, new.author, new.summary, new.bisac); END;"
+            )
+        return self._db
+
+    def add(self, source: str, records: List[Dict[str, Any]]) -> int:
+        """
+        Index scraped records
+
+        Args:
+            source (str): One of SOURCES
+            records (list): Book dicts as returned by the scraper
+
+        Returns:
+            int: Number of records inserted or changed
+        """
+        changed = 0
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            for record in records:
+                key = record_key(record)
+                if key is None or record.get("stub"):
+                    continue
+                row = db.execute("SELECT data FROM books WHERE source = ? AND key = ?", (source, key)).fetchone()
+                data = json.loads(row[0]) if row else {}
+                merged = {**data, **{field: value for field, value in record.items()
+                                     if value not in (None, "", []) and field not in RESPONSE_FLAGS}}
+                if row and merged == data:
+                    continue
+                values = (
+                    normalize_isbn(merged.get("isbn") or ""),
+                    merged.get("title") or "",
+                    merged.get("author") or "",
+                    as_text(merged.get("summary")),
+                    as_text(merged.get("bisac")),
+                    json.dumps(merged),
+                    now,
+                )
+                if row:
+                    db.execute(
+                        "UPDATE books SET isbn = ?, title = ?, author = ?, summary = ?, bisac = ?, data = ?, updated_at = ?"
+                        " WHERE source = ? AND key = ?",
+                        (*values, source, key),
+                    )
+                else:
+                    db.execute(
+                        "INSERT INTO books (isbn, title, author, summary, bisac, data, updated_at, source, key)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*values, source, key),
+                    )
+                changed += 1
+            db.commit()
+        return changed
+
+    def _add_logged(self, source: str, records: List[Dict[str, Any]]) -> int:
+        try:
+            return self.add(source, records)
+        except Exception as e:
+            logger.warning(f"Indexing {len(records)} {source} records failed: {e}")
+            self.failures += 1
+            return 0
+
+    def submit(self, source: str, records: List[Dict[str, Any]]) -> Future:
+        """
+        Index records in the writer thread, without waiting for it
+
+        Args:
+            source (str): One of SOURCES
+            records (list): Book dicts, not changed by the caller afterwards
+
+        Returns:
+            Future: Resolves to the number of records inserted or changed
+            (0 if indexing failed)
+        """
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="book-index")
+        return self._writer.submit(self._add_logged, source, records)
+
+    def search(self, q: str, limit: int = 20, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find indexed books
+
+        Args:
+            q (str): Words to match in title, author, summary or BISAC, or an ISBN
+            limit (int): Maximum number of results
+            source (str): Only return records from this source
+
+        Returns:
+            list: Best matches first, each with source, isbn, title, author,
+            the stored record and a highlighted snippet
+        """
+        isbn = normalize_isbn(q.strip())
+        source_filter = " AND books.source = ?" if source else ""
+        params: List[Any] = [source] if source else []
+        with self._lock:
+            db = self._connect()
+            self.searches += 1
+            if isbn:
+                rows = db.execute(
+                    "SELECT source, isbn, title, author, data, '' FROM books"
+                    f" WHERE isbn = ?{source_filter} ORDER BY updated_at DESC LIMIT ?",
+                    [isbn, *params, limit],
+                ).fetchall()
+            else:
+                query = fts_query(q)
+                if not query:
+                    return []
+                rows = db.execute(
+                    "SELECT books.source, books.isbn, books.title, books.author, books.data,"
+                    " snippet(books_fts, -1, '[', ']', '...', 12)"
+                    " FROM books_fts JOIN books ON books.id = books_fts.rowid"
+                    f" WHERE books_fts MATCH ?{source_filter} ORDER BY bm25(books_fts, 10.0, 5.0, 1.0, 2.0) LIMIT ?",
+                    [query, *params, limit],
+                ).fetchall()
+        return [
+            {"source": row[0], "isbn": row[1], "title": row[2], "author": row[3], "record": json.loads(row[4]), "snippet": row[5]}
+            for row in rows
+        ]
+
+    def rebuild(self) -> int:
+        """
+        Regenerate the full-text index from the stored records
+
+        Returns:
+            int: Number of records indexed
+        """
+        started = time.perf_counter()
+        with self._lock:
+            db = self._connect()
+            db.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+            db.execute("INSERT INTO books_fts (books_fts) VALUES ('optimize')")
+            db.commit()
+            count = db.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        logger.info(f"Rebuilt book index of {count} records in {time.perf_counter() - started:.2f}s")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Indexed records per source, search count and failed writes"""
+        with self._lock:
+            rows = self._connect().execute("SELECT source, COUNT(*) FROM books GROUP BY source").fetchall()
+        return {"records": dict(rows), "searches": self.searches, "failures": self.failures}
+
+    def close(self):
+        """Finish the submitted writes and close the database"""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+book_index = BookIndex()
+
+def index_records(source: str, records: List[Dict[str, Any]]):
+    """
+    Queue scraped records for the book index; indexing never blocks or fails a scrape
+
+    The records are copied, since callers go on to change them (covers are
+    localized, Hachette batches are cleared).
+    """
+    if not records:
+        return
+    book_index.submit(source, [dict(record) for record in records])
@@ -0,0 +1,412 @@
+"""
+Persistent Chromium pool with recycling and leak detection.
+
+Instead of launching and closing a browser for every call, scrapers lease a
+fresh context from a small pool of long-lived browsers:
+
+    pool = await get_browser_pool()
+    async with pool.context("edelweiss", isbn) as context:
+        page = await context.new_page()
+        ...
+
+Each browser tracks the pages it has served and the RSS of its process tree.
+When either crosses its threshold the browser is drained (no new leases),
+a replacement is launched, and the old one is closed once its last lease is
+released. Contexts are always closed by the pool on release. A periodic
+audit reports and closes leaks: contexts open without a lease (e.g. created
+with browser.new_page() outside the pool), together with their pages, and
+leases that were never released - held longer than BROWSER_MAX_LEASE_SECONDS
+or owned by a task that has already finished.
+
+Configuration (environment):
+    BROWSER_POOL_SIZE           browsers kept running (default 2)
+    BROWSER_MAX_CONTEXTS        concurrent leases per browser (default 4)
+    BROWSER_MAX_PAGES           pages served before recycling (default 200)
+    BROWSER_MAX_RSS_MB          process tree RSS before recycling (default 1024)
+    BROWSER_AUDIT_INTERVAL      seconds between background audits (default 30)
+    BROWSER_ACQUIRE_TIMEOUT     seconds to wait for a free context (default 120)
+    BROWSER_MAX_LEASE_SECONDS   lease age reported as leaked (default 900)
+
+When contexts are scarce, scheduler.py decides which waiter gets the next
+free one (interactive before bulk before background, tenants sharing
+fairly).
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+from playwright.async_api import async_playwright
+
+from har_archive import new_context
+from process_memory import marker_tree_rss_bytes
+from scheduler import scheduler
+from deadline import timeout_ms
+
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_CONTEXTS = int(os.environ.get("BROWSER_MAX_CONTEXTS", "4"))
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", "200"))
+BROWSER_MAX_RSS_MB = int(os.environ.get("BROWSER_MAX_RSS_MB", "1024"))
+BROWSER_AUDIT_INTERVAL = float(os.environ.get("BROWSER_AUDIT_INTERVAL", "30"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.environ.get("BROWSER_ACQUIRE_TIMEOUT", "120"))
+BROWSER_MAX_LEASE_SECONDS = float(os.environ.get("BROWSER_MAX_LEASE_SECONDS", "900"))
+
+class Lease:
+    """Who holds a pooled context and since when"""
+
+    def __init__(self, site: str, tenant: str):
+        self.site = site
+        self.tenant = tenant
+        self.started_at = time.time()
+        self.task = asyncio.current_task()
+        self.closing = False
+
+    def is_abandoned(self) -> bool:
+        """True if the lease outlived its limit or its owning task has finished"""
+        if self.closing:
+            return False
+        if time.time() - self.started_at > BROWSER_MAX_LEASE_SECONDS:
+            return True
+        return self.task is not None and self.task.done()
+
+class PooledBrowser:
+    """A pooled Chromium instance and its usage counters"""
+
+    def __init__(self, browser, marker: str):
+        self.id = marker.rsplit("=", 1)[-1]
+        self.browser = browser
+        self.marker = marker
+        self.created_at = time.time()
+        self.pages_served = 0
+        self.leases: Dict[Any, Lease] = {}  # context -> lease
+        self.pending = 0  # contexts being created for a lease
+        self.draining = False
+        self.closed = False
+        self.last_rss_bytes = 0
+
+    def rss_bytes(self) -> int:
+        """RSS of this browser's process tree, found via its launch marker"""
+        self.last_rss_bytes = marker_tree_rss_bytes(self.marker)
+        return self.last_rss_bytes
+
+    def has_capacity(self) -> bool:
+        return not self.draining and not self.closed and len(self.leases) + self.pending < BROWSER_MAX_CONTEXTS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "pages_served": self.pages_served,
+            "active_contexts": len(self.leases),
+            "rss_mb": round(self.last_rss_bytes / (1024 * 1024), 1),
+            "draining": self.draining,
+            "age_s": round(time.time() - self.created_at),
+        }
+
+class BrowserPool:
+    """Pool of long-lived browsers handing out short-lived contexts"""
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES,
+                 max_rss_mb: int = BROWSER_MAX_RSS_MB):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.browsers = []
+        self.recycled = 0
+        self.leaked_contexts = 0
+        self.leaked_pages = 0
+        self.waiting = 0
+        self._playwright = None
+        self._condition = asyncio.Condition()
+        self._audit_task = None
+        self._lease_owner: Dict[Any, PooledBrowser] = {}
+
+    async def start(self):
+        """Start Playwright and launch the pool's browsers"""
+        self._playwright = await async_playwright().start()
+        for _ in range(self.size):
+            self.browsers.append(await self._launch())
+        self._audit_task = asyncio.create_task(self._audit_loop())
+        logger.info(f"Browser pool started with {self.size} browser(s)")
+        return self
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        if self._audit_task:
+            self._audit_task.cancel()
+        for pooled in list(self.browsers):
+            await self._close(pooled)
+        self.browsers = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self) -> PooledBrowser:
+        # The marker switch is ignored by Chromium but lets us find its processes in /proc
+        marker = f"--scraper-pool-id={uuid.uuid4().hex[:12]}"
+        browser = await self._playwright.chromium.launch(headless=True, args=[marker])
+        pooled = PooledBrowser(browser, marker)
+        browser.on("disconnected", lambda _: asyncio.ensure_future(self._on_disconnected(pooled)))
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser):
+        if pooled.closed:
+            return
+        pooled.closed = True
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser {pooled.id}: {str(e)}")
+
+    async def _on_disconnected(self, pooled: PooledBrowser):
+        if pooled.closed:
+            return
+        logger.warning(f"Browser {pooled.id} disconnected unexpectedly, replacing it")
+        pooled.closed = True
+        async with self._condition:
+            if pooled in self.browsers:
+                self.browsers.remove(pooled)
+        await self._top_up()
+
+    async def _top_up(self):
+        """Launch browsers until the pool is back at its configured size"""
+        while len([b for b in self.browsers if not b.draining and not b.closed]) < self.size:
+            try:
+                replacement = await self._launch()
+            except Exception as e:
+                # The audit loop retries; until then acquire() times out instead of hanging
+                logger.error(f"Failed to launch a replacement browser: {str(e)}")
+                return
+            async with self._condition:
+                self.browsers.append(replacement)
+                self._condition.notify_all()
+
+    async def acquire(self, site: str, key: str = "session", **kwargs):
+        """
+        Lease a new context from the least loaded browser, waiting for capacity
+
+        Args:
+            site (str): Site name (used for HAR archives and leak reports)
+            key (str): Session key, e.g. the ISBN or catalog query
+            **kwargs: Passed through to browser.new_context()
+
+        Returns:
+            BrowserContext: A fresh context; hand it back with release()
+
+        Raises:
+            TimeoutError: If no context frees up within BROWSER_ACQUIRE_TIMEOUT
+                (or before the request's deadline, see deadline.py)
+        """
+        ticket = scheduler.enter()
+        wait_seconds = timeout_ms(BROWSER_ACQUIRE_TIMEOUT * 1000) / 1000
+        async with self._condition:
+            self.waiting += 1
+            granted = False
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: scheduler.may_take(ticket, self._free_contexts(), self._capacity())),
+                    timeout=wait_seconds,
+                )
+                granted = True
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"No browser context available for {site} within {wait_seconds:g}s")
+            finally:
+                self.waiting -= 1
+                if granted:
+                    scheduler.granted(ticket)
+                else:
+                    scheduler.abandoned(ticket)
+                # Whoever is next in line may be able to go now
+                self._condition.notify_all()
+            pooled = min((b for b in self.browsers if b.has_capacity()), key=lambda b: len(b.leases) + b.pending)
+            # Reserve the slot before creating the context so concurrent acquires see it
+            pooled.pending += 1
+
+        try:
+            context = await new_context(pooled.browser, site, key, **kwargs)
+        except BaseException:
+            async with self._condition:
+                pooled.pending -= 1
+                scheduler.released(ticket.tenant)
+                self._condition.notify_all()
+            raise
+
+        pooled.pending -= 1
+        pooled.leases[context] = Lease(site, ticket.tenant)
+        self._lease_owner[context] = pooled
+        context.on("page", lambda _: self._count_page(pooled))
+        return context
+
+    def _free_contexts(self) -> int:
+        return sum(BROWSER_MAX_CONTEXTS - len(b.leases) - b.pending for b in self.browsers if b.has_capacity())
+
+    def _capacity(self) -> int:
+        return sum(BROWSER_MAX_CONTEXTS for b in self.browsers if not b.draining and not b.closed)
+
+    def capacity_for(self, priority: str) -> int:
+        """Contexts work of a priority class can hold at once, see PriorityScheduler.capacity_for"""
+        return scheduler.capacity_for(priority, self._capacity())
+
+    def _count_page(self, pooled: PooledBrowser):
+        pooled.pages_served += 1
+
+    async def release(self, context):
+        """
+        Close a leased context and recycle its browser if it crossed a threshold
+
+        Args:
+            context: A context returned by acquire()
+        """
+        pooled = self._lease_owner.pop(context, None)
+        if pooled is None:
+            logger.warning("Released a context that was not leased from the pool")
+            return
+
+        # Keep the lease until the context is closed so a concurrent audit
+        # does not mistake it for an unleased context
+        lease = pooled.leases.get(context)
+        if lease:
+            lease.closing = True
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing {lease.site if lease else 'unknown'} context: {str(e)}")
+        pooled.leases.pop(context, None)
+        if lease:
+            scheduler.released(lease.tenant)
+
+        await self._check_thresholds(pooled)
+        async with self._condition:
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def context(self, site: str, key: str = "session", **kwargs):
+        """Lease a context for the duration of an `async with` block"""
+        context = await self.acquire(site, key, **kwargs)
+        try:
+            yield context
+        finally:
+            await self.release(context)
+
+    async def _check_thresholds(self, pooled: PooledBrowser):
+        if pooled.closed:
+            return
+        if not pooled.draining:
+            # Measuring RSS reads /proc for every process on the host, so each
+            # release does it once on the default executor rather than on the
+            # loop. That is a few milliseconds per lease, well below the page
+            # loads a lease is used for.
+            rss = await asyncio.get_running_loop().run_in_executor(None, pooled.rss_bytes)
+            # Another release may have started draining this browser while we measured
+            if not pooled.draining and (pooled.pages_served >= self.max_pages or rss >= self.max_rss_bytes):
+                logger.info(f"Recycling browser {pooled.id}: {pooled.pages_served} pages served, "
+                            f"{rss / (1024 * 1024):.0f} MB RSS")
+                try:
+                    replacement = await self._launch()
+                except Exception as e:
+                    # Keep serving from the old browser rather than shrinking the pool
+                    logger.error(f"Failed to launch a replacement for browser {pooled.id}: {str(e)}")
+                    return
+                pooled.draining = True
+                self.recycled += 1
+                async with self._condition:
+                    self.browsers.append(replacement)
+                    self._condition.notify_all()
+
+        # A draining browser is closed once its last lease has been released
+        if pooled.draining and not pooled.leases and not pooled.pending:
+            async with self._condition:
+                if pooled in self.browsers:
+                    self.browsers.remove(pooled)
+            await self._close(pooled)
+
+    async def audit(self):
+        """
+        Close and count leaks:
+
+        - leases never released: held longer than BROWSER_MAX_LEASE_SECONDS or
+          owned by a task that has already finished
+        - contexts open without a lease, e.g. created with browser.new_page()
+          outside the pool
+
+        Open pages of leaked contexts are counted as leaked pages. Also applies
+        the recycling thresholds to idle browsers and relaunches browsers the
+        pool failed to replace.
+        """
+        for pooled in list(self.browsers):
+            if pooled.closed:
+                continue
+            for context, lease in list(pooled.leases.items()):
+                if not lease.is_abandoned():
+                    continue
+                pages = [p for p in context.pages if not p.is_closed()]
+                self.leaked_contexts += 1
+                self.leaked_pages += len(pages)
+                logger.warning(f"Leaked {lease.site} lease held for {time.time() - lease.started_at:.0f}s "
+                               f"with {len(pages)} open page(s), releasing it")
+                await self.release(context)
+
+            # Contexts being created are not leased yet; audit this browser next time
+            if pooled.pending:
+                continue
+            for context in list(pooled.browser.contexts):
+                if context in pooled.leases:
+                    continue
+                pages = [p for p in context.pages if not p.is_closed()]
+                self.leaked_contexts += 1
+                self.leaked_pages += len(pages)
+                logger.warning(f"Leaked context with {len(pages)} open page(s) on browser {pooled.id}, closing it")
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._check_thresholds(pooled)
+        await self._top_up()
+
+    async def _audit_loop(self):
+        while True:
+            await asyncio.sleep(BROWSER_AUDIT_INTERVAL)
+            try:
+                await self.audit()
+            except Exception as e:
+                logger.warning(f"Browser pool audit failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and recycling counters"""
+        active = sum(len(b.leases) + b.pending for b in self.browsers)
+        return {
+            "browsers": [b.stats() for b in self.browsers],
+            "capacity": sum(BROWSER_MAX_CONTEXTS for b in self.browsers if not b.draining),
+            "active_contexts": active,
+            "waiting": self.waiting,
+            "recycled": self.recycled,
+            "leaked_contexts": self.leaked_contexts,
+            "leaked_pages": self.leaked_pages,
+        }
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = asyncio.Lock()
+
+async def get_browser_pool() -> BrowserPool:
+    """Return the process-wide pool, starting it on first use"""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await BrowserPool().start()
+    return _pool
+
+def current_browser_pool() -> Optional[BrowserPool]:
+    """Return the process-wide pool without starting it"""
+    return _pool
+
+async def close_browser_pool():
+    """Stop the process-wide pool if it was started"""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.stop()
+            _pool = None
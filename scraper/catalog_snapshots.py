@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOTS_PATH = os.environ.get(
+    "CATALOG_SNAPSHOTS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog_snapshots.sqlite3"),
+)
+
+# A title counts as changed when one of these differs between snapshots
+TRACKED_FIELDS = ("price", "format", "publication_date")
+
+def book_hash(book: Dict[str, Any]) -> str:
+    """Content hash of the tracked fields of one catalog entry"""
+    tracked = {field: book.get(field) for field in TRACKED_FIELDS}
+    return hashlib.sha256(json.dumps(tracked, sort_keys=True).encode()).hexdigest()
+
+class CatalogSnapshots:
+    """
+    Versioned snapshots of scraped Hachette catalogs.
+
+    Every scrape of a catalog is stored as a new snapshot holding each
+    title and a content hash of its tracked fields (price, format,
+    publication date), so two snapshots can be compared by hash without
+    looking at unchanged entries. Stored in SQLite at CATALOG_SNAPSHOTS_PATH.
+    """
+
+    def __init__(self, path: Optional[str] = CATALOG_SNAPSHOTS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, catalog TEXT NOT NULL, taken_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS snapshots_catalog ON snapshots (catalog, taken_at);"
+                "CREATE TABLE IF NOT EXISTS snapshot_books ("
+                " snapshot_id INTEGER NOT NULL, isbn TEXT NOT NULL, content_hash TEXT NOT NULL, data TEXT NOT NULL,"
+                " PRIMARY KEY (snapshot_id, isbn));"
+            )
+        return self._db
+
+    def save(self, catalog: str, books: List[Dict[str, Any]]) -> int:
+        """
+        Store a scrape of a catalog as a new snapshot
+
+        Args:
+            catalog (str): Catalog query, e.g. "January 2026 HNZ"
+            books (list): Book dicts as returned by the scraper
+
+        Returns:
+            int: The snapshot id
+        """
+        with self._lock:
+            db = self._connect()
+            cursor = db.execute("INSERT INTO snapshots (catalog, taken_at) VALUES (?, ?)", (catalog, time.time()))
+            snapshot_id = cursor.lastrowid
+            db.executemany(
+                "INSERT OR REPLACE INTO snapshot_books (snapshot_id, isbn, content_hash, data) VALUES (?, ?, ?, ?)",
+                [(snapshot_id, book["isbn"], book_hash(book), json.dumps(book)) for book in books if book.get("isbn")],
+            )
+            db.commit()
+        logger.info(f"Saved snapshot {snapshot_id} of {catalog} with {len(books)} titles")
+        return snapshot_id
+
+    def get(self, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        """Snapshot metadata (id, catalog, taken_at), or None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, catalog, taken_at FROM snapshots WHERE id = ?", (snapshot_id,)
+            ).fetchone()
+        return {"id": row[0], "catalog": row[1], "taken_at": row[2]} if row else None
+
+    def latest(self, catalog: str, before_id: Optional[int] = None, taken_before: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Most recent snapshot of a catalog
+
+        Args:
+            catalog (str): Catalog query
+            before_id (int): Only consider snapshots older than this one
+            taken_before (float): Only consider snapshots taken at or before this Unix time
+
+        Returns:
+            dict: Snapshot metadata, or None if there is none
+        """
+        sql = "SELECT id, catalog, taken_at FROM snapshots WHERE catalog = ?"
+        params: List[Any] = [catalog]
+        if before_id is not None:
+            sql += " AND id < ?"
+            params.append(before_id)
+        if taken_before is not None:
+            sql += " AND taken_at <= ?"
+            params.append(taken_before)
+        with self._lock:
+            row = self._connect().execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return {"id": row[0], "catalog": row[1], "taken_at": row[2]} if row else None
+
+    def _hashes(self, snapshot_id: int) -> Dict[str, str]:
+        rows = self._connect().execute(
+            "SELECT isbn, content_hash FROM snapshot_books WHERE snapshot_id = ?", (snapshot_id,)
+        ).fetchall()
+        return dict(rows)
+
+    def _books(self, snapshot_id: int, isbns: List[str]) -> Dict[str, Dict[str, Any]]:
+        books = {}
+        for start in range(0, len(isbns), 500):
+            chunk = isbns[start:start + 500]
+            rows = self._connect().execute(
+                f"SELECT isbn, data FROM snapshot_books WHERE snapshot_id = ? AND isbn IN ({','.join('?' * len(chunk))})",
+                [snapshot_id, *chunk],
+            ).fetchall()
+            books.update({isbn: json.loads(data) for isbn, data in rows})
+        return books
+
+    def diff(self, old_id: Optional[int], new_id: int) -> Dict[str, Any]:
+        """
+        Titles added, removed or changed between two snapshots
+
+        Only titles whose hash differs are loaded, so unchanged entries are
+        never parsed.
+
+        Args:
+            old_id (int): Baseline snapshot, None to treat every title as added
+            new_id (int): Newer snapshot
+
+        Returns:
+            dict: added and removed book lists, changed entries with the
+            old and new value of every tracked field that differs, and the
+            number of unchanged titles
+        """
+        with self._lock:
+            new_hashes = self._hashes(new_id)
+            old_hashes = self._hashes(old_id) if old_id is not None else {}
+            added = [isbn for isbn in new_hashes if isbn not in old_hashes]
+            removed = [isbn for isbn in old_hashes if isbn not in new_hashes]
+            changed = [isbn for isbn in new_hashes if isbn in old_hashes and old_hashes[isbn] != new_hashes[isbn]]
+            new_books = self._books(new_id, added + changed)
+            old_books = self._books(old_id, removed + changed) if old_id is not None else {}
+
+        changes = []
+        for isbn in changed:
+            old, new = old_books[isbn], new_books[isbn]
+            changes.append({
+                "isbn": isbn,
+                "title": new.get("title"),
+                "changes": {
+                    field: {"old": old.get(field), "new": new.get(field)}
+                    for field in TRACKED_FIELDS if old.get(field) != new.get(field)
+                },
+            })
+        return {
+            "added": [new_books[isbn] for isbn in added],
+            "removed": [old_books[isbn] for isbn in removed],
+            "changed": changes,
+            "unchanged": len(new_hashes) - len(added) - len(changed),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+catalog_snapshots = CatalogSnapshots()
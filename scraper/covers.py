@@ -0,0 +1,304 @@
+import os
+import io
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+import httpx
+
+try:
+    from PIL import Image
+except ImportError:  # Thumbnails are skipped without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Download covers and rewrite cover URLs in responses to /covers/{hash}
+COVER_CACHE_ENABLED = os.environ.get("COVER_CACHE_ENABLED", "0") == "1"
+COVER_CACHE_DIR = os.environ.get(
+    "COVER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "covers"),
+)
+# Covers and thumbnails beyond this many bytes evict the least recently used
+COVER_CACHE_MAX_BYTES = int(os.environ.get("COVER_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+# Downloads in flight at once (also the HTTP connection pool size)
+COVER_FETCH_CONCURRENCY = int(os.environ.get("COVER_FETCH_CONCURRENCY", "8"))
+# Longest side of a thumbnail, in pixels
+COVER_THUMBNAIL_SIZE = int(os.environ.get("COVER_THUMBNAIL_SIZE", "200"))
+COVER_THUMBNAIL_WORKERS = int(os.environ.get("COVER_THUMBNAIL_WORKERS", "2"))
+# Prefix of the rewritten URLs, e.g. "http://scraper:8000" (default: relative)
+COVER_PUBLIC_URL = os.environ.get("COVER_PUBLIC_URL", "").rstrip("/")
+
+# Keys holding cover URLs: Edelweiss books use "cover", Hachette books "cover_url"
+COVER_KEYS = ("cover", "cover_url")
+
+def sniff_media_type(data: bytes) -> Optional[str]:
+    """Image media type from the first bytes of a file, None if not an image"""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def make_thumbnail(data: bytes, size: int = COVER_THUMBNAIL_SIZE) -> bytes:
+    """JPEG thumbnail whose longest side is at most size pixels"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        output = io.BytesIO()
+        image.convert("RGB").save(output, "JPEG", quality=85, optimize=True)
+        return output.getvalue()
+
+class CoverCache:
+    """
+    Local copies of remote cover images.
+
+    Covers are downloaded concurrently through one pooled HTTP client and
+    stored in COVER_CACHE_DIR under the SHA-256 of their content, so the
+    same image reached through different URLs is stored once. A JPEG
+    thumbnail is made next to each cover in a worker pool. Beyond
+    COVER_CACHE_MAX_BYTES the least recently used covers are deleted.
+
+    Hashing and thumbnails run in the worker pool and file access in a
+    single disk thread, so writes and deletes happen in the order they were
+    issued. The entries, URL map and counters are only touched on the event
+    loop.
+    """
+
+    def __init__(self, directory: str = COVER_CACHE_DIR, max_bytes: int = COVER_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # content hash -> (bytes on disk, media type), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_url: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._disk: Optional[ThreadPoolExecutor] = None
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.fetched = 0
+        self.failed = 0
+        self.evicted = 0
+
+    def path(self, content_hash: str, thumbnail: bool = False) -> str:
+        return os.path.join(self.directory, content_hash + (".thumb.jpg" if thumbnail else ""))
+
+    async def _in_workers(self, func, *args):
+        if self._workers is None:
+            self._workers = ThreadPoolExecutor(max_workers=COVER_THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+        return await asyncio.get_running_loop().run_in_executor(self._workers, func, *args)
+
+    async def _on_disk(self, func, *args):
+        if self._disk is None:
+            self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="covers-disk")
+        return await asyncio.get_running_loop().run_in_executor(self._disk, func, *args)
+
+    def _scan(self) -> List[tuple]:
+        """(hash, bytes on disk, media type) of every stored cover, oldest access first"""
+        os.makedirs(self.directory, exist_ok=True)
+        names = [name for name in os.listdir(self.directory) if len(name) == 64]
+        names.sort(key=lambda name: os.path.getatime(self.path(name)))
+        found = []
+        for name in names:
+            with open(self.path(name), "rb") as f:
+                media_type = sniff_media_type(f.read(12))
+            size = os.path.getsize(self.path(name))
+            if os.path.exists(self.path(name, thumbnail=True)):
+                size += os.path.getsize(self.path(name, thumbnail=True))
+            found.append((name, size, media_type))
+        return found
+
+    async def load(self):
+        """Pick up covers stored by earlier runs (once)"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for name, size, media_type in await self._on_disk(self._scan):
+                self._entries[name] = (size, media_type)
+            self._loaded = True
+
+    async def get(self, content_hash: str, thumbnail: bool = False):
+        """
+        Find a stored cover
+
+        Args:
+            content_hash (str): Hash from a /covers/{hash} URL
+            thumbnail (bool): Get the thumbnail instead of the original
+
+        Returns:
+            tuple: (file path, media type), or None if it is not stored
+        """
+        await self.load()
+        entry = self._entries.get(content_hash)
+        if entry is None:
+            return None
+        self._entries.move_to_end(content_hash)
+        if thumbnail:
+            path = self.path(content_hash, thumbnail=True)
+            return (path, "image/jpeg") if await self._on_disk(os.path.exists, path) else None
+        return self.path(content_hash), entry[1]
+
+    def _prepare(self, url: str, data: bytes):
+        """Hash a downloaded cover and make its thumbnail"""
+        thumbnail = None
+        if Image is not None:
+            try:
+                thumbnail = make_thumbnail(data)
+            except Exception as e:
+                logger.warning(f"Thumbnail of {url} failed: {e}")
+        return hashlib.sha256(data).hexdigest(), thumbnail
+
+    def _write(self, content_hash: str, data: bytes, thumbnail: Optional[bytes]):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(content_hash), "wb") as f:
+            f.write(data)
+        if thumbnail:
+            with open(self.path(content_hash, thumbnail=True), "wb") as f:
+                f.write(thumbnail)
+
+    def _delete(self, content_hashes: List[str]):
+        for content_hash in content_hashes:
+            for path in (self.path(content_hash), self.path(content_hash, thumbnail=True)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    async def _store(self, content_hash: str, data: bytes, media_type: str, thumbnail: Optional[bytes]) -> str:
+        await self.load()
+        if content_hash not in self._entries:
+            # Queued behind any delete of the same hash, so the files survive
+            await self._on_disk(self._write, content_hash, data, thumbnail)
+            self._entries.setdefault(content_hash, (len(data) + len(thumbnail or b""), media_type))
+        self._entries.move_to_end(content_hash)
+        await self._evict()
+        return content_hash
+
+    async def _evict(self):
+        total = sum(size for size, _ in self._entries.values())
+        evicted = []
+        while total > self.max_bytes and len(self._entries) > 1:
+            content_hash, (size, _) = self._entries.popitem(last=False)
+            evicted.append(content_hash)
+            total -= size
+        if not evicted:
+            return
+        gone = set(evicted)
+        self._by_url = {url: h for url, h in self._by_url.items() if h not in gone}
+        self.evicted += len(evicted)
+        await self._on_disk(self._delete, evicted)
+
+    async def _download(self, url: str) -> Optional[str]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=15.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=COVER_FETCH_CONCURRENCY),
+            )
+            self._semaphore = asyncio.Semaphore(COVER_FETCH_CONCURRENCY)
+        async with self._semaphore:
+            response = await self._client.get(url)
+        response.raise_for_status()
+        data = response.content
+        media_type = sniff_media_type(data)
+        if media_type is None:
+            raise ValueError(f"not an image ({response.headers.get('content-type')})")
+
+        content_hash, thumbnail = await self._in_workers(self._prepare, url, data)
+        return await self._store(content_hash, data, media_type, thumbnail)
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """
+        Get the content hash of a cover, downloading it unless it is stored
+
+        Concurrent calls for the same URL share one download.
+
+        Args:
+            url (str): Remote cover URL
+
+        Returns:
+            str: The content hash, or None if the cover could not be fetched
+        """
+        content_hash = self._by_url.get(url)
+        if content_hash and await self.get(content_hash):
+            self.hits += 1
+            return content_hash
+        if url in self._inflight:
+            return await self._inflight[url]
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            content_hash = await self._download(url)
+            self.fetched += 1
+            # Stores that finished meanwhile may already have evicted it
+            if content_hash in self._entries:
+                self._by_url[url] = content_hash
+            else:
+                content_hash = None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"Cover {url} not fetched: {e}")
+            self.failed += 1
+            content_hash = None
+        finally:
+            del self._inflight[url]
+        future.set_result(content_hash)
+        return content_hash
+
+    async def localize(self, books: List[Dict[str, Any]]):
+        """
+        Point the cover URLs of books at /covers/{hash}
+
+        Every distinct URL is fetched once, all of them concurrently.
+        Covers that cannot be fetched keep their remote URL.
+
+        Args:
+            books (List[Dict]): Book dicts, updated in place
+        """
+        urls = {book[key] for book in books for key in COVER_KEYS
+                if isinstance(book.get(key), str) and book[key].startswith("http")}
+        if not urls:
+            return
+        hashes = dict(zip(urls, await asyncio.gather(*(self.fetch(url) for url in urls))))
+        for book in books:
+            for key in COVER_KEYS:
+                content_hash = hashes.get(book.get(key))
+                if content_hash:
+                    book[key] = f"{COVER_PUBLIC_URL}/covers/{content_hash}"
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored covers, bytes on disk and download counters (covers of earlier runs once loaded)"""
+        return {
+            "enabled": COVER_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": sum(entry[0] for entry in self._entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "evicted": self.evicted,
+            "thumbnails": Image is not None,
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for executor in (self._workers, self._disk):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._workers = self._disk = None
+
+cover_cache = CoverCache()
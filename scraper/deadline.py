@@ -0,0 +1,152 @@
+"""
+Request deadlines.
+
+Callers that give up after a fixed time (n8n's HTTP Request node) pass
+deadline_ms, and every stage of the scrape works within what is left of
+it:
+
+    - fixed per-operation timeouts (page loads, selector waits, settle
+      delays) are capped by the remaining time, see timeout_ms()
+    - optional steps (summaries, BISAC popovers, catch-all fallback
+      selectors) are skipped once less than DEADLINE_OPTIONAL_STEP_MS is
+      left, see can_afford(); records missing them are flagged "incomplete"
+    - work that has not started when the deadline passes is not started,
+      see expired()
+
+so the caller gets partial results in time instead of nothing at all.
+DEADLINE_RESERVE_MS of every deadline is kept back for building and
+sending the response.
+
+The deadline of the current request is carried in a context variable,
+set by DeadlineMiddleware from the deadline_ms query parameter (or the
+X-Deadline-Ms header) and inherited by every task the request starts.
+Without one, everything runs with its fixed timeouts.
+
+Configuration (environment):
+    DEADLINE_RESERVE_MS         kept back from each deadline for the response (default 1000)
+    DEADLINE_OPTIONAL_STEP_MS   time an optional step needs to be started (default 5000)
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Set
+
+from starlette.datastructures import Headers, QueryParams
+
+DEADLINE_RESERVE_MS = float(os.environ.get("DEADLINE_RESERVE_MS", "1000"))
+DEADLINE_OPTIONAL_STEP_MS = float(os.environ.get("DEADLINE_OPTIONAL_STEP_MS", "5000"))
+
+class Deadline:
+    """When the current work has to be done by, and what it skipped to get there"""
+
+    def __init__(self, ends_at: Optional[float], parent: Optional["Deadline"] = None):
+        self.ends_at = ends_at
+        self.parent = parent
+        self.skipped: Set[str] = set()
+
+    def remaining_ms(self) -> Optional[float]:
+        """Milliseconds left, None without a deadline"""
+        if self.ends_at is None:
+            return None
+        return (self.ends_at - time.monotonic()) * 1000
+
+    def skip(self, step: str):
+        """Record a step left out for lack of time (also on enclosing deadlines)"""
+        self.skipped.add(step)
+        if self.parent:
+            self.parent.skip(step)
+
+    @property
+    def cut_short(self) -> bool:
+        return bool(self.skipped)
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("scrape_deadline", default=None)
+
+@contextmanager
+def deadline(deadline_ms: Optional[float] = None):
+    """
+    Run the enclosed work (and the tasks it starts) within deadline_ms
+
+    An enclosing deadline still applies, so without deadline_ms this just
+    opens a scope whose skipped steps can be checked on their own, e.g.
+    per catalog of a batch.
+
+    Yields:
+        Deadline: Check its cut_short after the work
+    """
+    parent = current_deadline.get()
+    ends_at = parent.ends_at if parent else None
+    if deadline_ms is not None:
+        own = time.monotonic() + (deadline_ms - DEADLINE_RESERVE_MS) / 1000
+        ends_at = own if ends_at is None else min(ends_at, own)
+    scope = Deadline(ends_at, parent)
+    token = current_deadline.set(scope)
+    try:
+        yield scope
+    finally:
+        current_deadline.reset(token)
+
+def remaining_ms() -> Optional[float]:
+    """Milliseconds left of the current deadline, None without one"""
+    scope = current_deadline.get()
+    return scope.remaining_ms() if scope else None
+
+def timeout_ms(default_ms: float) -> float:
+    """
+    Timeout for one operation: its usual timeout, capped by the time left
+
+    Never below 1 ms, since Playwright reads a timeout of 0 as no timeout.
+    """
+    remaining = remaining_ms()
+    if remaining is None:
+        return default_ms
+    return max(1.0, min(default_ms, remaining))
+
+def expired() -> bool:
+    """True once the current deadline has passed"""
+    remaining = remaining_ms()
+    return remaining is not None and remaining <= 0
+
+def can_afford(step_ms: float = DEADLINE_OPTIONAL_STEP_MS) -> bool:
+    """True if there is time to start an optional step taking up to step_ms"""
+    remaining = remaining_ms()
+    return remaining is None or remaining >= step_ms
+
+def skip_step(step: str):
+    """Record that an optional step was left out for lack of time"""
+    scope = current_deadline.get()
+    if scope:
+        scope.skip(step)
+
+def cut_short() -> bool:
+    """True if the current deadline scope left anything out"""
+    scope = current_deadline.get()
+    return bool(scope and scope.cut_short)
+
+class DeadlineMiddleware:
+    """
+    Starts the deadline of every HTTP request that asks for one, with the
+    deadline_ms query parameter or X-Deadline-Ms header. The clock starts
+    when the request arrives, so time spent waiting for a browser context
+    counts against it too. Values that are not positive numbers are
+    ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = (QueryParams(scope.get("query_string", b"")).get("deadline_ms")
+                 or Headers(scope=scope).get("x-deadline-ms"))
+        try:
+            deadline_ms = float(value) if value else None
+        except ValueError:
+            deadline_ms = None
+        if deadline_ms is not None and deadline_ms <= 0:
+            deadline_ms = None
+        with deadline(deadline_ms):
+            await self.app(scope, receive, send)
@@ -1,11 +1,18 @@
 import asyncio
 import logging
+import os
 from typing import List, Dict, Any
 from pydantic import BaseModel
-from playwright.async_api import async_playwright
+from browser_pool import get_browser_pool
+from selector_registry import query_all_first, resolve_first
+from book_index import index_records
+from postgres_sink import postgres_sink
+from deadline import deadline, timeout_ms, expired
 
 logger = logging.getLogger(__name__)
 
+FANTASTIC_FICTION_URL = os.environ.get("FANTASTIC_FICTION_URL", "https://www.fantasticfiction.com")
+
 class AuthorSearchRequest(BaseModel):
     author_name: str
     search_type: str = "author"
@@ -15,6 +22,7 @@ class AuthorSearchResponse(BaseModel):
     message: str
     books: List[Dict[str, Any]]
     total_books: int
+    incomplete: bool = False  # The request's deadline_ms cut the search short
 
 async def search_fantastic_fiction(author_name: str, search_type: str = "author") -> AuthorSearchResponse:
     """
@@ -27,17 +35,21 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
     Returns:
         AuthorSearchResponse: JSON response with found books
     """
+    with deadline() as budget:
+        return await _search_fantastic_fiction(author_name, search_type, budget)
+
+async def _search_fantastic_fiction(author_name, search_type, budget):
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        pool = await get_browser_pool()
+        async with pool.context("fantastic_fiction", f"{search_type}-{author_name}") as context:
+            page = await context.new_page()
             
             # Navigate to Fantastic Fiction search page
-            search_url = f"https://www.fantasticfiction.com/search/?q={author_name.replace(' ', '+')}"
-            await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+            search_url = f"{FANTASTIC_FICTION_URL}/search/?q={author_name.replace(' ', '+')}"
+            await page.goto(search_url, wait_until="domcontentloaded", timeout=timeout_ms(30000))
             
             # Wait for search results to load
-            await page.wait_for_timeout(2000)
+            await page.wait_for_timeout(timeout_ms(2000))
             
             # Look for search results
             books = []
@@ -46,21 +58,16 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
             book_selectors = [
                 '.search-result',
                 '.book-result',
-                '.result',
+                '.result'
+            ]
+            book_fallbacks = [
                 'div[class*="book"]',
                 'div[class*="result"]'
             ]
             
-            book_elements = []
-            for selector in book_selectors:
-                try:
-                    elements = await page.query_selector_all(selector)
-                    if elements:
-                        book_elements = elements
-                        logger.info(f"Found {len(elements)} book elements with selector: {selector}")
-                        break
-                except:
-                    continue
+            book_elements, selector = await query_all_first(page, "fantastic_fiction", "book", book_selectors, book_fallbacks)
+            if book_elements:
+                logger.info(f"Found {len(book_elements)} book elements with selector: {selector}")
             
             # If no specific book elements found, try to find any links that might be books
             if not book_elements:
@@ -74,32 +81,17 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
             
             # Extract book information
             for i, element in enumerate(book_elements[:10]):  # Limit to first 10 results
+                if expired():
+                    budget.skip("results")
+                    break
                 try:
                     # Try to extract title
-                    title = None
-                    title_selectors = ['h3', 'h4', '.title', '.book-title', 'a']
-                    for selector in title_selectors:
-                        try:
-                            title_elem = await element.query_selector(selector)
-                            if title_elem:
-                                title = await title_elem.text_content()
-                                if title and title.strip():
-                                    break
-                        except:
-                            continue
+                    title_selectors = ['h3', 'h4', '.title', '.book-title']
+                    _, _, title = await resolve_first(element, "fantastic_fiction", "title", title_selectors, ['a'], longer_than=0)
                     
                     # Try to extract author
-                    author = None
                     author_selectors = ['.author', '.book-author', 'span[class*="author"]']
-                    for selector in author_selectors:
-                        try:
-                            author_elem = await element.query_selector(selector)
-                            if author_elem:
-                                author = await author_elem.text_content()
-                                if author and author.strip():
-                                    break
-                        except:
-                            continue
+                    _, _, author = await resolve_first(element, "fantastic_fiction", "author", author_selectors, longer_than=0)
                     
                     # Try to extract link
                     link = None
@@ -108,7 +100,7 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
                         if link_elem:
                             link = await link_elem.get_attribute('href')
                             if link and not link.startswith('http'):
-                                link = f"https://www.fantasticfiction.com{link}"
+                                link = f"{FANTASTIC_FICTION_URL}{link}"
                     except:
                         pass
                     
@@ -127,13 +119,14 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
                     logger.warning(f"Error extracting book {i+1}: {str(e)}")
                     continue
             
-            await browser.close()
-            
+            index_records("fantastic_fiction", books)
+            postgres_sink.submit("fantastic_fiction", books)
             return AuthorSearchResponse(
                 success=True,
                 message=f"Found {len(books)} books for author '{author_name}'",
                 books=books,
-                total_books=len(books)
+                total_books=len(books),
+                incomplete=budget.cut_short
             )
             
     except Exception as e:
@@ -142,5 +135,7 @@ async def search_fantastic_fiction(author_name: str, search_type: str = "author"
             success=False,
             message=f"Search failed: {str(e)}",
             books=[],
-            total_books=0
+            total_books=0,
+            # Most likely a page load cut off by the deadline
+            incomplete=budget.cut_short or expired()
         )
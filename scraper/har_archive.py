@@ -0,0 +1,72 @@
+"""
+HAR record-and-replay for deterministic scraping runs.
+
+Set SCRAPER_HAR_MODE to choose how browser contexts talk to the network:
+
+    off     (default) live sites
+    record  live sites, saving every session to SCRAPER_HAR_DIR/<site>/<key>.har
+    replay  served entirely from the saved archives; anything not recorded is aborted
+
+Example:
+    SCRAPER_HAR_MODE=record python main.py 9781869712341
+    SCRAPER_HAR_MODE=replay python main.py 9781869712341   # no outbound network
+"""
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+HAR_MODE = os.environ.get("SCRAPER_HAR_MODE", "off").lower()
+HAR_DIR = os.environ.get("SCRAPER_HAR_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "har"))
+
+HAR_MODES = ("off", "record", "replay")
+
+if HAR_MODE not in HAR_MODES:
+    raise ValueError(f"SCRAPER_HAR_MODE must be one of: {', '.join(HAR_MODES)}")
+
+def archive_path(site: str, key: str) -> str:
+    """
+    Path of the archive for one session
+
+    Args:
+        site (str): Site name, e.g. "edelweiss", "hachette", "fantastic_fiction"
+        key (str): What the session looked up (ISBN, catalog query, author)
+
+    Returns:
+        str: Path to the .har file
+    """
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", key.strip()).strip("-").lower() or "session"
+    return os.path.join(HAR_DIR, site, f"{slug}.har")
+
+async def new_context(browser, site: str, key: str = "session", **kwargs):
+    """
+    Create a browser context that records to or replays from a HAR archive
+    depending on SCRAPER_HAR_MODE. The archive is written when the context
+    is closed, so callers must close the context (not just the browser).
+
+    Args:
+        browser: Playwright browser
+        site (str): Site name used to group archives
+        key (str): Session key, e.g. the ISBN or catalog query
+        **kwargs: Passed through to browser.new_context()
+
+    Returns:
+        BrowserContext: The configured context
+    """
+    context = await browser.new_context(**kwargs)
+
+    if HAR_MODE == "record":
+        path = archive_path(site, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await context.route_from_har(path, update=True, update_content="embed", update_mode="full")
+        logger.info(f"Recording {site} session to {path}")
+    elif HAR_MODE == "replay":
+        path = archive_path(site, key)
+        if not os.path.exists(path):
+            await context.close()
+            raise FileNotFoundError(f"No recorded {site} session for '{key}' at {path}")
+        await context.route_from_har(path, not_found="abort")
+        logger.info(f"Replaying {site} session from {path}")
+
+    return context
@@ -0,0 +1,67 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+def isbn13_check_digit(first12: str) -> str:
+    """Check digit of an ISBN-13 given its first 12 digits"""
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+def is_valid_isbn10(isbn: str) -> bool:
+    """True for 10 characters (digits, X as the last) with a correct mod-11 checksum"""
+    if not re.fullmatch(r"\d{9}[\dX]", isbn):
+        return False
+    total = sum((10 - i) * (10 if c == "X" else int(c)) for i, c in enumerate(isbn))
+    return total % 11 == 0
+
+def is_valid_isbn13(isbn: str) -> bool:
+    """True for 13 digits with a 978/979 prefix and a correct checksum"""
+    return bool(re.fullmatch(r"97[89]\d{10}", isbn)) and isbn13_check_digit(isbn[:12]) == isbn[12]
+
+def normalize_isbn(raw: str) -> Optional[str]:
+    """
+    Canonicalize an ISBN to ISBN-13
+
+    Accepts ISBN-10 and ISBN-13 with or without hyphens, spaces or an
+    "ISBN" prefix.
+
+    Args:
+        raw (str): ISBN as given by the caller
+
+    Returns:
+        str: The ISBN-13, or None if the input is not a valid ISBN
+    """
+    if not raw:
+        return None
+    compact = re.sub(r"[\s\-]", "", str(raw).upper())
+    compact = re.sub(r"^ISBN(?:-?1[03])?:?", "", compact)
+    if is_valid_isbn13(compact):
+        return compact
+    if is_valid_isbn10(compact):
+        first12 = "978" + compact[:9]
+        return first12 + isbn13_check_digit(first12)
+    return None
+
+def dedupe_isbns(raw_isbns: List[str]) -> Tuple[List[str], Dict[str, str], List[str]]:
+    """
+    Normalize a list of ISBNs before any browser work
+
+    Args:
+        raw_isbns (List[str]): ISBNs as given by the caller
+
+    Returns:
+        tuple: (unique ISBN-13s in first-seen order,
+                ISBN-13 by stripped input,
+                stripped inputs that are not valid ISBNs)
+    """
+    unique, by_input, invalid = [], {}, []
+    for raw in raw_isbns:
+        key = str(raw).strip()
+        isbn = normalize_isbn(key)
+        if isbn is None:
+            if key not in invalid:
+                invalid.append(key)
+            continue
+        by_input[key] = isbn
+        if isbn not in unique:
+            unique.append(isbn)
+    return unique, by_input, invalid
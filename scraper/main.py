@@ -1,16 +1,55 @@
 import asyncio
 import json
 import logging
+import os
 import re
+import csv
+import io
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
-from playwright.async_api import async_playwright
+from typing import List, Dict, Any, Optional
 from fantastic_fiction_scraper import search_fantastic_fiction, AuthorSearchRequest, AuthorSearchResponse
+from browser_pool import get_browser_pool, close_browser_pool, current_browser_pool
+from sessions import session_store
+from selector_registry import selector_registry, resolve_first
+from summary_cache import summary_cache
+from metrics import field_metrics
+from product_index import product_index, index_key
+from isbn import normalize_isbn, dedupe_isbns
+from catalog_snapshots import catalog_snapshots
+from covers import cover_cache, COVER_CACHE_ENABLED
+from book_index import book_index, index_records, SOURCES
+from postgres_sink import postgres_sink
+from scheduler import scheduler, scheduling, current_priority, SchedulingMiddleware, INTERACTIVE, BULK, BACKGROUND
+from deadline import deadline, DeadlineMiddleware, timeout_ms, expired, can_afford, skip_step, cut_short
+from response_encoding import ORJSONResponse, CompressionMiddleware
+import orjson
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Site entry points (overridable so the scrapers can run against local fixtures)
+EDELWEISS_URL = os.environ.get("EDELWEISS_URL", "https://www.edelweiss.plus/")
+HACHETTE_LOGIN_URL = os.environ.get("HACHETTE_LOGIN_URL", "https://ati.hachette.co.nz/login")
+# Log in to every site at startup so the first requests reuse warm sessions
+WARM_UP_ON_STARTUP = os.environ.get("WARM_UP_ON_STARTUP", "1") == "1"
+# How often (seconds) the background task checks for sessions about to expire
+SESSION_REFRESH_INTERVAL = int(os.environ.get("SESSION_REFRESH_INTERVAL", "300"))
+# Pages per search that extract summaries at the same time
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", "3"))
+# Hachette catalogs scraped at the same time by /hachette/scrape-batch
+HACHETTE_CATALOG_CONCURRENCY = int(os.environ.get("HACHETTE_CATALOG_CONCURRENCY", "3"))
+# ISBNs per Edelweiss keyword search in /scrape-multiple (1 = one search each)
+EDELWEISS_SEARCH_BATCH_SIZE = int(os.environ.get("EDELWEISS_SEARCH_BATCH_SIZE", "1"))
+# Edelweiss lookups and Fantastic Fiction author searches running at once in /hachette/enrich
+ENRICH_EDELWEISS_CONCURRENCY = int(os.environ.get("ENRICH_EDELWEISS_CONCURRENCY", "3"))
+ENRICH_AUTHOR_CONCURRENCY = int(os.environ.get("ENRICH_AUTHOR_CONCURRENCY", "2"))
+# Playwright's own default, for the waits that never set a timeout of their own
+PLAYWRIGHT_TIMEOUT_MS = 30000
+
 def clean_string(text):
     """Clean string by removing newlines and extra whitespace"""
     if text is None:
@@ -38,12 +77,12 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
         
         # Wait for login section to be visible first
         print("Waiting for login section...")
-        await page.wait_for_selector('section.login, .login-form, form#login-form', timeout=10000)
+        await page.wait_for_selector('section.login, .login-form, form#login-form', timeout=timeout_ms(10000))
         print("Login section found!")
         
         # Then wait for the email input specifically
         print("Waiting for email input...")
-        await page.wait_for_selector('input[name="email"]', timeout=5000)
+        await page.wait_for_selector('input[name="email"]', timeout=timeout_ms(5000))
         print("Email input found!")
         
         # Find email input field
@@ -55,15 +94,9 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
             'input[id*="email" i]'
         ]
         
-        email_input = None
-        for selector in email_selectors:
-            try:
-                email_input = await page.query_selector(selector)
-                if email_input:
-                    print(f"Found email input with selector: {selector}")
-                    break
-            except:
-                continue
+        email_input, selector, _ = await resolve_first(page, "edelweiss", "login_email", email_selectors)
+        if email_input:
+            print(f"Found email input with selector: {selector}")
         
         if not email_input:
             print("Email input field not found")
@@ -71,7 +104,7 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
         
         # Fill email
         await email_input.fill(email)
-        await page.wait_for_timeout(500)
+        await page.wait_for_timeout(timeout_ms(500))
         
         # Find password input field
         password_selectors = [
@@ -82,15 +115,9 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
             'input[id*="password" i]'
         ]
         
-        password_input = None
-        for selector in password_selectors:
-            try:
-                password_input = await page.query_selector(selector)
-                if password_input:
-                    print(f"Found password input with selector: {selector}")
-                    break
-            except:
-                continue
+        password_input, selector, _ = await resolve_first(page, "edelweiss", "login_password", password_selectors)
+        if password_input:
+            print(f"Found password input with selector: {selector}")
         
         if not password_input:
             print("Password input field not found")
@@ -98,7 +125,7 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
         
         # Fill password
         await password_input.fill(password)
-        await page.wait_for_timeout(500)
+        await page.wait_for_timeout(timeout_ms(500))
         
         # Find and click login button
         login_selectors = [
@@ -110,16 +137,9 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
             'button:has-text("Sign in")'
         ]
         
-        login_button = None
-        for selector in login_selectors:
-            try:
-                login_button = await page.query_selector(selector)
-                if login_button:
-                    button_text = await login_button.text_content()
-                    print(f"Found login button with selector: {selector}, text: '{button_text}'")
-                    break
-            except:
-                continue
+        login_button, selector, button_text = await resolve_first(page, "edelweiss", "login_button", login_selectors)
+        if login_button:
+            print(f"Found login button with selector: {selector}, text: '{button_text}'")
         
         if not login_button:
             print("Login button not found")
@@ -131,18 +151,18 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
         
         # Wait for login to complete - look for dashboard or search elements
         try:
-            await page.wait_for_selector('input[name="keywords"], .dashboard, [class*="dashboard"]', timeout=15000)
+            await page.wait_for_selector('input[name="keywords"], .dashboard, [class*="dashboard"]', timeout=timeout_ms(15000))
             print("Login successful - dashboard loaded")
             return True
         except:
             # If we don't find dashboard elements, try navigating to dashboard
             print("Navigating to dashboard after login...")
-            await page.goto("https://www.edelweiss.plus/#dashboard", wait_until="domcontentloaded", timeout=10000)
-            await page.wait_for_timeout(2000)
+            await page.goto(f"{EDELWEISS_URL}#dashboard", wait_until="domcontentloaded", timeout=timeout_ms(10000))
+            await page.wait_for_timeout(timeout_ms(2000))
             
             # Check if we can find search elements now
             try:
-                await page.wait_for_selector('input[name="keywords"]', timeout=5000)
+                await page.wait_for_selector('input[name="keywords"]', timeout=timeout_ms(5000))
                 print("Dashboard loaded successfully")
                 return True
             except:
@@ -153,6 +173,92 @@ async def login_to_edelweiss(page, email="hello@webbased.ai", password="WNFrs9Zx
         print(f"Login error: {str(e)}")
         return False
 
+# Comprehensive summary selectors - targeting the correct structure
+SUMMARY_SELECTORS = [
+    # Most specific - exact path from the actual HTML structure
+    'div[role="tabpanel"][id*="title-references-tabpanel"] div.MuiBox-root.css-old1by div p',
+    'div[role="tabpanel"][id*="title-references-tabpanel"] div.MuiBox-root div p',
+    'div[role="tabpanel"][id*="title-references-tabpanel"] div p',
+
+    # Look for the specific tabpanel that's visible (not hidden)
+    'div[role="tabpanel"]:not([hidden]) div.MuiBox-root.css-old1by div p',
+    'div[role="tabpanel"]:not([hidden]) div.MuiBox-root div p',
+    'div[role="tabpanel"]:not([hidden]) div p',
+
+    # Look for any tabpanel content
+    'div[role="tabpanel"]:not([hidden]) *',
+    'div[role="tabpanel"] *',
+
+    # Look for MuiBox content in main content area
+    '.mainContent___KncIm div.MuiBox-root.css-old1by div p',
+    '.mainContent___KncIm div.MuiBox-root div p',
+    '.mainContent___KncIm div p',
+
+    # Look for content in right panel
+    '.rightPanel___Cl_TH .mainContent___KncIm *',
+    '.mainContent___KncIm *',
+
+    # Look for any paragraph with substantial text in the right areas
+    '.rightPanel___Cl_TH p',
+    '.mainContent___KncIm p',
+
+    # Look for content that might be revealed by Content button
+    'div[class*="content"] p',
+    'div[class*="summary"] p',
+    'div[class*="description"] p',
+    'div[class*="expandable"] p',
+    'div[class*="collapsible"] p',
+
+    # General content selectors
+    '[class*="content"] *',
+    '[class*="description"] *',
+    '[class*="summary"] *'
+]
+# Catch-alls are never promoted ahead of the specific selectors
+SUMMARY_FALLBACKS = [
+    # Look for any substantial text content
+    'p',
+    'div p'
+]
+
+# Picks the block that looks most like a book summary when no selector
+# matched. Each visible block is scored on its own text (direct text plus
+# inline children, so ancestors do not win by containing it), discounted
+# by the share of link text and boosted by summary vocabulary. Blocks of
+# 200 characters or less, or without any summary word, are ignored.
+SUMMARY_DENSITY_JS = """
+() => {
+    const inline = new Set(['A', 'B', 'I', 'EM', 'STRONG', 'SPAN', 'SMALL', 'U', 'SUB', 'SUP', 'Q', 'CITE', 'BR']);
+    const indicators = ['novel', 'story', 'character', 'author', 'book', 'published', 'review', 'critic'];
+    let best = null;
+    let bestScore = 0;
+    for (const el of document.body.querySelectorAll('p, div, section, article, span, td, li, blockquote')) {
+        let own = '';
+        for (const node of el.childNodes) {
+            if (node.nodeType === Node.TEXT_NODE || (node.nodeType === Node.ELEMENT_NODE && inline.has(node.tagName))) {
+                own += node.textContent;
+            }
+        }
+        own = own.trim();
+        if (own.length <= 200) continue;
+        const lower = own.toLowerCase();
+        const vocabulary = indicators.filter(word => lower.includes(word)).length;
+        if (!vocabulary) continue;
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0 || getComputedStyle(el).visibility === 'hidden') continue;
+        const linkText = Array.from(el.querySelectorAll('a')).reduce((n, a) => n + a.textContent.length, 0);
+        const sentences = (own.match(/[.!?](\\s|$)/g) || []).length;
+        const score = own.length * (1 - Math.min(1, linkText / own.length)) * (1 + 0.2 * vocabulary + 0.1 * sentences);
+        // Ties go to the later, deeper element
+        if (score >= bestScore) {
+            best = el;
+            bestScore = score;
+        }
+    }
+    return best ? best.textContent : null;
+}
+"""
+
 async def extract_summary_from_title_click(page, book_element):
     """
     Click on book title and extract summary from side panel
@@ -209,16 +315,15 @@ async def extract_summary_from_title_click(page, book_element):
         
         # Step 1: Wait for any side panel/modal to appear
         try:
-            await page.wait_for_selector('[class*="Panel"], [class*="Modal"], [class*="Drawer"], [class*="Sidebar"]', timeout=8000)
+            await page.wait_for_selector('[class*="Panel"], [class*="Modal"], [class*="Drawer"], [class*="Sidebar"]', timeout=timeout_ms(8000))
             print("Side panel container detected")
         except:
             print("No side panel container found, trying alternative selectors...")
         
         # Step 2: Wait for animation to complete
-        await page.wait_for_timeout(3000)
+        await page.wait_for_timeout(timeout_ms(3000))
         
         # Step 3: Look for specific side panel indicators
-        side_panel_found = False
         side_panel_selectors = [
             '.rightPanel___Cl_TH',
             '.mainContent___KncIm', 
@@ -230,17 +335,10 @@ async def extract_summary_from_title_click(page, book_element):
             '[class*="modal"]'
         ]
         
-        for selector in side_panel_selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    print(f"Found side panel with selector: {selector}")
-                    side_panel_found = True
-                    break
-            except:
-                continue
-        
-        if not side_panel_found:
+        side_panel, selector, _ = await resolve_first(page, "edelweiss", "side_panel", side_panel_selectors)
+        if side_panel:
+            print(f"Found side panel with selector: {selector}")
+        else:
             print("No side panel found with any selector")
         
         # Step 4: Try clicking the "Content" button if available
@@ -249,7 +347,7 @@ async def extract_summary_from_title_click(page, book_element):
             if content_button:
                 print("Found Content button, clicking it to expand summary...")
                 await content_button.click()
-                await page.wait_for_timeout(2000)  # Wait for content to expand
+                await page.wait_for_timeout(timeout_ms(2000))  # Wait for content to expand
                 print("Content button clicked")
             else:
                 print("Content button not found")
@@ -257,128 +355,35 @@ async def extract_summary_from_title_click(page, book_element):
             print(f"Error clicking Content button: {str(e)}")
         
         # Step 5: Additional wait for content to load
-        await page.wait_for_timeout(2000)
+        await page.wait_for_timeout(timeout_ms(2000))
         
         # Look for summary content in side panel with comprehensive approach
         print("Searching for summary content...")
         
-        # First, let's see what's actually on the page
-        try:
-            all_elements = await page.query_selector_all('*')
-            print(f"Total elements on page: {len(all_elements)}")
-        except:
-            pass
-        
-        # Comprehensive summary selectors - targeting the correct structure
-        summary_selectors = [
-            # Most specific - exact path from the actual HTML structure
-            'div[role="tabpanel"][id*="title-references-tabpanel"] div.MuiBox-root.css-old1by div p',
-            'div[role="tabpanel"][id*="title-references-tabpanel"] div.MuiBox-root div p',
-            'div[role="tabpanel"][id*="title-references-tabpanel"] div p',
-            
-            # Look for the specific tabpanel that's visible (not hidden)
-            'div[role="tabpanel"]:not([hidden]) div.MuiBox-root.css-old1by div p',
-            'div[role="tabpanel"]:not([hidden]) div.MuiBox-root div p',
-            'div[role="tabpanel"]:not([hidden]) div p',
-            
-            # Look for any tabpanel content
-            'div[role="tabpanel"]:not([hidden]) *',
-            'div[role="tabpanel"] *',
-            
-            # Look for MuiBox content in main content area
-            '.mainContent___KncIm div.MuiBox-root.css-old1by div p',
-            '.mainContent___KncIm div.MuiBox-root div p',
-            '.mainContent___KncIm div p',
-            
-            # Look for content in right panel
-            '.rightPanel___Cl_TH .mainContent___KncIm *',
-            '.mainContent___KncIm *',
-            
-            # Look for any paragraph with substantial text in the right areas
-            '.rightPanel___Cl_TH p',
-            '.mainContent___KncIm p',
-            
-            # Look for content that might be revealed by Content button
-            'div[class*="content"] p',
-            'div[class*="summary"] p',
-            'div[class*="description"] p',
-            'div[class*="expandable"] p',
-            'div[class*="collapsible"] p',
-            
-            # General content selectors
-            '[class*="content"] *',
-            '[class*="description"] *',
-            '[class*="summary"] *',
-            
-            # Look for any substantial text content
-            'p',
-            'div p'
-        ]
-        
-        summary_text = None
-        for i, selector in enumerate(summary_selectors):
-            try:
-                elements = await page.query_selector_all(selector)
-                print(f"Selector {i+1} '{selector}': Found {len(elements)} elements")
-                
-                for j, element in enumerate(elements):
-                    try:
-                        # Check if element is visible (not hidden)
-                        is_visible = await element.is_visible()
-                        if not is_visible:
-                            continue
-                            
-                        text = await element.text_content()
-                        if text and len(text.strip()) > 100:  # Look for substantial content
-                            print(f"  Element {j+1} (visible): {text[:100]}...")
-                            
-                            # Additional check: make sure it looks like a book summary
-                            # (contains book-related keywords and is not just UI text)
-                            ui_keywords = ['narrow your results', 'type here to find', 'click', 'button', 'tab', 'menu']
-                            if not any(keyword in text.lower() for keyword in ui_keywords):
-                                if not summary_text:  # Take the first substantial content found
-                                    summary_text = text
-                                    print(f"  ✓ Using this as summary content")
-                    except:
-                        continue
-                        
-                if summary_text:
-                    print(f"Found summary with selector: {selector}")
-                    break
-            except Exception as e:
-                print(f"  Error with selector {i+1}: {str(e)}")
-                continue
+        # Resolve the whole list in one in-page call: the first visible
+        # element with substantial text that is not just UI text
+        # (navigation hints, buttons, tabs) is the summary
+        ui_keywords = ['narrow your results', 'type here to find', 'click', 'button', 'tab', 'menu']
+        _, summary_selector, summary_text = await resolve_first(
+            page, "edelweiss", "summary", SUMMARY_SELECTORS, SUMMARY_FALLBACKS,
+            visible=True, longer_than=100, exclude_text=ui_keywords
+        )
         
         if summary_text:
+            print(f"Found summary with selector: {summary_selector}")
             summary_text = clean_string(summary_text)
             print(f"Extracted summary: {summary_text[:100]}...")
             return summary_text
         else:
             print("No summary found with specific selectors, trying fallback search...")
             
-            # Fallback: Search entire page for content that looks like a book summary
+            # Fallback: score every text block on the page in one call
             try:
-                all_elements = await page.query_selector_all('*')
-                print(f"Fallback search through {len(all_elements)} elements...")
-                
-                for i, element in enumerate(all_elements):
-                    try:
-                        text = await element.text_content()
-                        if text and len(text.strip()) > 200:  # Look for longer content
-                            # Check if it looks like a book summary (contains common book summary words)
-                            summary_indicators = ['novel', 'story', 'character', 'author', 'book', 'published', 'review', 'critic']
-                            if any(indicator in text.lower() for indicator in summary_indicators):
-                                print(f"Found potential summary in element {i}: {text[:100]}...")
-                                summary_text = text
-                                break
-                    except:
-                        continue
-                        
+                summary_text = await page.evaluate(SUMMARY_DENSITY_JS)
                 if summary_text:
                     summary_text = clean_string(summary_text)
                     print(f"Fallback summary found: {summary_text[:100]}...")
                     return summary_text
-                    
             except Exception as e:
                 print(f"Fallback search error: {str(e)}")
             
@@ -389,7 +394,123 @@ async def extract_summary_from_title_click(page, book_element):
         print(f"Error extracting summary: {str(e)}")
         return None
 
-app = FastAPI(title="Multi-Scraper API", version="1.0.0")
+async def warm_edelweiss_session(pool):
+    """
+    Login to Edelweiss in a throwaway context and keep its session
+
+    Returns:
+        bool: True if a session was saved
+    """
+    async with pool.context("edelweiss", "warm-up") as context:
+        page = await context.new_page()
+        await page.goto(EDELWEISS_URL, wait_until="domcontentloaded", timeout=timeout_ms(60000))
+        if not await login_to_edelweiss(page):
+            return False
+        session_store.save("edelweiss", await context.storage_state(), page.url)
+        return True
+
+async def warm_hachette_session(pool):
+    """
+    Login to Hachette in a throwaway context and keep its session
+
+    Returns:
+        bool: True if a session was saved
+    """
+    async with pool.context("hachette", "warm-up") as context:
+        page = await context.new_page()
+        if not await login_to_hachette(page):
+            return False
+        session_store.save("hachette", await context.storage_state(), page.url)
+        return True
+
+WARM_SESSIONS = {
+    "edelweiss": warm_edelweiss_session,
+    "hachette": warm_hachette_session,
+}
+
+# Filled in by the startup warm-up, reported by /readyz
+warm_up_state = {"done": False, "errors": {}}
+
+async def refresh_sessions(margin_seconds=0):
+    """
+    Log in again to every site whose session is missing or expires within
+    `margin_seconds`
+
+    Args:
+        margin_seconds (float): Refresh sessions this close to expiry
+    """
+    pool = await get_browser_pool()
+    for site, warm in WARM_SESSIONS.items():
+        if not session_store.expires_within(site, margin_seconds):
+            continue
+        try:
+            if await warm(pool):
+                warm_up_state["errors"].pop(site, None)
+            else:
+                warm_up_state["errors"][site] = "login failed"
+        except Exception as e:
+            logger.warning(f"Warming {site} session failed: {e}")
+            warm_up_state["errors"][site] = str(e)
+
+async def keep_sessions_warm():
+    """Launch the pool, log in to every site, then refresh sessions before they expire"""
+    try:
+        await refresh_sessions()
+    except Exception as e:
+        logger.error(f"Startup warm-up failed: {e}")
+        warm_up_state["errors"]["pool"] = str(e)
+    warm_up_state["done"] = True
+    while True:
+        await asyncio.sleep(SESSION_REFRESH_INTERVAL)
+        try:
+            await refresh_sessions(margin_seconds=2 * SESSION_REFRESH_INTERVAL)
+        except Exception as e:
+            logger.warning(f"Session refresh failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the browser pool and site sessions up and load the stored covers,
+    and on shutdown close the pool, persist the learned selector statistics
+    and close the product index, catalog snapshots, book index and cover
+    downloader. Scrape results are written to Postgres in between when
+    POSTGRES_SINK_DSN is set.
+    """
+    # Session upkeep only takes browser contexts no request is waiting for
+    with scheduling(BACKGROUND, "sessions"):
+        warm_task = asyncio.create_task(keep_sessions_warm()) if WARM_UP_ON_STARTUP else None
+    await postgres_sink.start()
+    if COVER_CACHE_ENABLED:
+        await cover_cache.load()
+    yield
+    if warm_task:
+        warm_task.cancel()
+        try:
+            await warm_task
+        except asyncio.CancelledError:
+            pass
+    await close_browser_pool()
+    selector_registry.save()
+    product_index.close()
+    catalog_snapshots.close()
+    # Waits for the index writes still queued
+    await asyncio.to_thread(book_index.close)
+    await cover_cache.close()
+    await postgres_sink.stop()
+
+app = FastAPI(title="Multi-Scraper API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+# gzip/brotli for responses over COMPRESSION_MIN_SIZE bytes, as the client accepts
+app.add_middleware(CompressionMiddleware)
+# deadline_ms on any request bounds every stage of its scrape (see deadline.py)
+app.add_middleware(DeadlineMiddleware)
+# Single lookups get browser contexts before batches and catalogs (see scheduler.py)
+app.add_middleware(SchedulingMiddleware, route_priorities={
+    "/scrape": INTERACTIVE,
+    "/edelweiss/summary": INTERACTIVE,
+    "/fantastic-fiction": INTERACTIVE,
+    "/scrape-multiple": BULK,
+    "/hachette": BULK,
+})
 
 class ISBNRequest(BaseModel):
     isbn: str
@@ -408,611 +529,1865 @@ class BookData(BaseModel):
     cover_url: str
     summary: str = None  # Add summary field for Edelweiss data
 
+class HachetteBatchRequest(BaseModel):
+    catalogs: List[str]
+
 class ScraperResponse(BaseModel):
     success: bool
     message: str
     books: List[BookData]
     total_books: int
+    incomplete: bool = False  # The request's deadline_ms cut the catalog short
 
-async def scrape_isbns(isbns: List[str], login_required=True):
-    results_by_isbn = {}
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        for isbn in isbns:
-            context = await browser.new_context()
-            page = await context.new_page()
-
-            # Retry logic for page loading
-            max_retries = 3
-            retry_count = 0
-            success = False
-            
-            while retry_count < max_retries and not success:
-                try:
-                    # Navigate to the main page first to get to login
-                    await page.goto("https://www.edelweiss.plus/", wait_until="domcontentloaded", timeout=60000)
-                    await page.wait_for_timeout(2000)  # Give page time to fully load
-                    success = True
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        await page.wait_for_timeout(2000 * retry_count)  # Exponential backoff
-                        logger.warning(f"Retry {retry_count} for ISBN {isbn}: {str(e)}")
-                    else:
-                        logger.error(f"Failed to load page after {max_retries} retries for ISBN {isbn}: {str(e)}")
-                        raise e
-
-            # Login if required
-            if login_required:
-                login_success = await login_to_edelweiss(page)
-                if not login_success:
-                    results_by_isbn[isbn.strip()] = {
-                        "status": "login_failed",
-                        "message": f"Failed to login to Edelweiss for ISBN {isbn.strip()}",
-                        "books": []
-                    }
-                    await context.close()
-                    continue
+def scraper_payload(success: bool, message: str, books_data: List[Dict[str, Any]], incomplete: bool = False):
+    """
+    ScraperResponse as a plain dict, for ORJSONResponse
 
-            try:
-                await page.fill('input[name="keywords"]', '')
-                await page.wait_for_timeout(1000)
-                await page.fill('input[name="keywords"]', str(isbn))
-                await page.wait_for_timeout(500)
-                await page.keyboard.press("Enter")
-                await page.wait_for_load_state("networkidle")
+    Catalog-sized responses skip validating every book into BookData; the
+    scrapers already produce BookData's fields as strings.
+    """
+    books = [{**book, "summary": book.get("summary")} for book in books_data]
+    return {"success": success, "message": message, "books": books, "total_books": len(books), "incomplete": incomplete}
 
-                try:
-                    await page.wait_for_selector('div.productRowBody___XM7bE', timeout=15000)
-                except:
-                    results_by_isbn[isbn.strip()] = {
-                        "status": "no_data_found",
-                        "message": f"No results found on Edelweiss for ISBN {isbn.strip()}",
-                        "books": []
-                    }
-                    await context.close()
-                    continue
-
-                books_data = []
-                book_elements = await page.query_selector_all('div.productRowBody___XM7bE')
-
-                for book in book_elements:
-                    title_elem = await book.query_selector('p[class*="titleName"]')
-                    subtitle_elem = await book.query_selector('span[class*="subTitleName"]')
-                    author_elem = await book.query_selector('div[class*="contributors"]')
-                    cover_elem = await book.query_selector('img[alt^="Cover for"]')
-
-                    isbn_elem = await book.evaluate("""b => {
-                        const spans = Array.from(b.querySelectorAll('div.dotDot span'));
-                        const found = spans.find(s => /\\d{10,13}/.test(s.innerText));
-                        return found ? found.innerText : null;
-                    }""")
-
-                    pub_info = await book.evaluate("""b => {
-                        const divs = Array.from(b.querySelectorAll('div.dotDot'));
-                        const found = divs.find(d => d.innerText.includes('Pub Date'));
-                        return found ? found.innerText : null;
-                    }""")
-
-                    format_price = await book.evaluate("""b => {
-                        const divs = Array.from(b.querySelectorAll('div.dotDot'));
-                        const found = divs.find(d => /\\$/.test(d.innerText) || /Trade/.test(d.innerText));
-                        return found ? found.innerText : null;
-                    }""")
-
-                    discount_code = await book.evaluate("""b => {
-                        const divs = Array.from(b.querySelectorAll('div'));
-                        const found = divs.find(d => d.innerText.includes('Discount Code'));
-                        return found ? found.innerText : null;
-                    }""")
-
-                    related_products = await book.evaluate("""b => b.querySelector('.related-products-container button')?.innerText || null""")
-                    pages = await book.evaluate("""b => Array.from(b.querySelectorAll('.biblioTwo___bgyhS div')).map(d => d.innerText).find(t => /\\d+\\s+pages/.test(t)) || null""")
-                    dimensions = await book.evaluate("""b => {
-                        const divs = Array.from(b.querySelectorAll('.biblioTwoItemContainer___QeMy0 div'));
-                        return divs[0] ? divs[0].innerText : null;
-                    }""")
-                    status = await book.evaluate("""b => {
-                        const divs = Array.from(b.querySelectorAll('div.dotDot'));
-                        const found = divs.find(d => d.innerText.includes('Status:'));
-                        return found || null;
-                    }""")
-                    sales_rights = await book.evaluate("""b => {
-                        const buttons = Array.from(b.querySelectorAll('.biblioTwo___bgyhS button'));
-                        const found = buttons.find(btn => btn.innerText.includes('View'));
-                        return found ? found.innerText : null;
-                    }""")
-                    honors = await book.evaluate("""b => Array.from(b.querySelectorAll('.dotDot.flex img')).map(img => img.alt)""")
-                    community = await book.evaluate("""b => Array.from(b.querySelectorAll('.communityItemsRow___utLCU button')).map(btn => btn.innerText)""")
-
-                    bisac_button = await book.query_selector('button:has-text("BISAC")')
-                    bisac_categories = None
-                    if bisac_button:
-                        try:
-                            if await bisac_button.is_enabled():
-                                await bisac_button.click()
-                                popover = await page.wait_for_selector('div.MuiPopover-paper', timeout=3000)
-                                bisac_categories = await popover.evaluate("""
-                                    pop => Array.from(pop.querySelectorAll('li'))
-                                            .slice(1)
-                                            .map(li => li.innerText.trim())
-                                """)
-                        except:
-                            pass
-
-                    # Extract summary by clicking on title (only if login was successful)
-                    summary = None
-                    if login_required:
-                        summary = await extract_summary_from_title_click(page, book)
-
-                    books_data.append({
-                        "title": clean_string(await title_elem.text_content() if title_elem else None),
-                        "subtitle": clean_string(await subtitle_elem.text_content() if subtitle_elem else None),
-                        "author": clean_string(await author_elem.text_content() if author_elem else None),
-                        "isbn": clean_string(isbn_elem),
-                        "cover": clean_string(await cover_elem.get_attribute('src') if cover_elem else None),
-                        "pubInfo": clean_string(pub_info),
-                        "formatPrice": clean_string(format_price),
-                        "discountCode": clean_string(discount_code),
-                        "bisac": [clean_string(cat) for cat in bisac_categories] if bisac_categories else None,
-                        "relatedProducts": clean_string(related_products),
-                        "pages": clean_string(pages),
-                        "dimensions": clean_string(dimensions),
-                        "status": clean_string(status),
-                        "salesRights": clean_string(sales_rights),
-                        "honors": [clean_string(honor) for honor in honors] if honors else [],
-                        "community": [clean_string(item) for item in community] if community else [],
-                        "summary": summary
-                    })
-
-                results_by_isbn[isbn.strip()] = {
-                    "status": "data_found",
-                    "message": f"Found {len(books_data)} book(s) for ISBN {isbn.strip()}",
-                    "books": books_data
-                }
+async def search_edelweiss(page, keywords: str):
+    """
+    Run a search on a logged-in Edelweiss page
 
-            except Exception as e:
-                results_by_isbn[isbn.strip()] = {
-                    "status": "error",
-                    "message": str(e),
-                    "books": []
-                }
+    Args:
+        page: Playwright page showing the Edelweiss dashboard
+        keywords (str): ISBN or keywords to search for
 
-            await context.close()
+    Returns:
+        list: Result row elements, empty if there were no results
+    """
+    await page.fill('input[name="keywords"]', '')
+    await page.wait_for_timeout(timeout_ms(1000))
+    await page.fill('input[name="keywords"]', str(keywords))
+    await page.wait_for_timeout(timeout_ms(500))
+    await page.keyboard.press("Enter")
+    await page.wait_for_load_state("networkidle", timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
 
-        await browser.close()
-    return results_by_isbn
+    try:
+        await page.wait_for_selector('div.productRowBody___XM7bE', timeout=timeout_ms(15000))
+    except:
+        return []
+    return await page.query_selector_all('div.productRowBody___XM7bE')
 
-# Hachette Scraper Functions
-async def navigate_and_login_hachette(url="https://ati.hachette.co.nz/login", customer_number="46628", catalog_query="January 2026 HNZ"):
+async def open_indexed_title(page, isbn: str):
     """
-    Navigate to Hachette login page, enter customer number, and login.
-    
+    Navigate straight to the stored title URL of an ISBN (see product_index)
+
     Args:
-        url (str): The login URL
-        customer_number (str): The customer number to enter
-        catalog_query (str): The catalog to search for (e.g., "January 2026 HNZ", "December 2025 HCB")
-    
+        page: Playwright page on Edelweiss (logged in if needed)
+        isbn (str): ISBN to open
+
     Returns:
-        List[Dict]: List of book data dictionaries
+        ElementHandle: The title's result row, or None if the ISBN is not
+        indexed or its URL is stale (the entry is then dropped)
     """
-    async with async_playwright() as p:
-        # Launch browser (you can change 'chromium' to 'firefox' or 'webkit')
-        browser = await p.chromium.launch(headless=True)  # Set to True for headless mode
-        page = await browser.new_page()
-        
-        try:
-            print(f"Navigating to: {url}")
-            await page.goto(url)
-            
-            # Wait for the page to load
-            await page.wait_for_load_state('networkidle')
-            
-            # Get the page title
-            title = await page.title()
-            print(f"\nPage Title: {title}")
-            
-            # Print initial page content
-            content = await page.text_content('body')
-            print(f"\nInitial Page Content:")
-            print("=" * 50)
-            print(content)
-            print("=" * 50)
-            
-            # Look for customer number input field
-            print(f"\nLooking for customer number input field...")
-            
-            # Try different possible selectors for the input field
-            input_selectors = [
-                'input[type="text"]',
-                'input[name*="customer"]',
-                'input[name*="number"]',
-                'input[id*="customer"]',
-                'input[id*="number"]',
-                'input[placeholder*="customer"]',
-                'input[placeholder*="number"]',
-                'input'
-            ]
-            
-            input_field = None
-            for selector in input_selectors:
-                try:
-                    input_field = await page.query_selector(selector)
-                    if input_field:
-                        print(f"Found input field with selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if input_field:
-                print(f"Entering customer number: {customer_number}")
-                await input_field.fill(customer_number)
-                
-                # Look for login/submit button
-                print("Looking for login button...")
-                button_selectors = [
-                    'button[type="submit"]',
-                    'input[type="submit"]',
-                    'button:has-text("Log in")',
-                    'button:has-text("Login")',
-                    'button:has-text("Submit")',
-                    'button'
-                ]
-                
-                login_button = None
-                for selector in button_selectors:
-                    try:
-                        login_button = await page.query_selector(selector)
-                        if login_button:
-                            button_text = await login_button.text_content()
-                            print(f"Found button with selector: {selector}, text: '{button_text}'")
-                            break
-                    except:
-                        continue
-                
-                if login_button:
-                    print("Clicking login button...")
-                    await login_button.click()
-                    
-                    # Wait for navigation or page change
-                    await page.wait_for_load_state('networkidle')
-                    
-                    # Print updated page content
-                    new_title = await page.title()
-                    print(f"\nNew Page Title: {new_title}")
-                    
-                    new_content = await page.text_content('body')
-                    print(f"\nUpdated Page Content:")
-                    print("=" * 50)
-                    print(new_content)
-                    print("=" * 50)
-                    
-                    # Look for the specified catalog link
-                    print(f"\nLooking for '{catalog_query}' link...")
-                    
-                    # Try different selectors to find the link
-                    link_selectors = [
-                        f'a:has-text("{catalog_query}")',
-                        f'a:has-text("{catalog_query.split()[0]}. {catalog_query}")',  # e.g., "01. January 2026 HNZ"
-                        f'a[href*="{catalog_query.split()[-1]}"]',  # e.g., "HNZ" or "HCB"
-                        'a'
-                    ]
-                    
-                    catalog_link = None
-                    for selector in link_selectors:
-                        try:
-                            links = await page.query_selector_all(selector)
-                            for link in links:
-                                link_text = await link.text_content()
-                                if link_text and catalog_query in link_text:
-                                    catalog_link = link
-                                    print(f"Found catalog link with text: '{link_text.strip()}'")
-                                    break
-                            if catalog_link:
-                                break
-                        except:
-                            continue
-                    
-                    if catalog_link:
-                        print(f"Clicking on {catalog_query} link...")
-                        await catalog_link.click()
-                        
-                        # Wait for the page to fully load and navigate to catalog
-                        await page.wait_for_load_state('networkidle')
-                        await asyncio.sleep(3)  # Additional wait to ensure page is fully loaded
-                        
-                        # Extract catalog type from query (e.g., "HNZ", "HCB")
-                        catalog_type = catalog_query.split()[-1]
-                        
-                        # Wait for the URL to change to catalog or check if we're on the right page
-                        try:
-                            await page.wait_for_function(f"() => window.location.href.includes('{catalog_type}') || document.title.includes('{catalog_type}')", timeout=10000)
-                        except:
-                            print(f"Waiting for {catalog_type} page to load...")
-                            await asyncio.sleep(2)
-                        
-                        # Get the new page content
-                        catalog_title = await page.title()
-                        catalog_url = page.url
-                        print(f"\n{catalog_type} Page Title: {catalog_title}")
-                        print(f"{catalog_type} Page URL: {catalog_url}")
-                        
-                        # Only extract if we're actually on the catalog page
-                        if catalog_type in catalog_title or catalog_type in catalog_url:
-                            catalog_content = await page.text_content('body')
-                            print(f"\n{catalog_type} Page Content (first 500 chars):")
-                            print("=" * 50)
-                            print(catalog_content[:500])
-                            print("=" * 50)
-                            
-                            # Extract book catalog entries from HTML li elements
-                            print(f"\nExtracting book catalog entries from {catalog_type} HTML...")
-                            
-                            # Find all li elements that contain book information
-                            li_elements = await page.query_selector_all('li')
-                            book_entries = []
-                            seen_isbns = set()  # To avoid duplicates
-                            
-                            for li in li_elements:
-                                # Check if this li contains a book entry (has an h3 title and ISBN)
-                                title_element = await li.query_selector('h3')
-                                if title_element:
-                                    title = await title_element.text_content()
-                                    title = title.strip() if title else ""
-                                    
-                                    # Get author
-                                    author_element = await li.query_selector('p.author')
-                                    author = await author_element.text_content()
-                                    author = author.strip() if author else ""
-                                    
-                                    # Get details (ISBN, price, format, date)
-                                    details_element = await li.query_selector('p.details')
-                                    details = await details_element.text_content()
-                                    details = details.strip() if details else ""
-                                    
-                                    # Get cover image URL
-                                    img_element = await li.query_selector('img')
-                                    cover_url = ""
-                                    if img_element:
-                                        cover_url = await img_element.get_attribute('src')
-                                        if cover_url and not cover_url.startswith('http'):
-                                            cover_url = 'https:' + cover_url
-                                    
-                                    # Parse details to extract ISBN, price, format, date
-                                    isbn_match = re.search(r'978\d{10}|979\d{10}', details)
-                                    price_match = re.search(r'\$\d+\.\d+', details)
-                                    
-                                    if title and isbn_match and price_match:
-                                        isbn = isbn_match.group()
-                                        
-                                        # Skip if we've already seen this ISBN (avoid duplicates)
-                                        if isbn in seen_isbns:
-                                            continue
-                                        seen_isbns.add(isbn)
-                                        
-                                        # Extract format and date
-                                        format_match = re.search(r'(Paperback|Hardback)(?:\s*-\s*[A-Z]\s*Format)?', details)
-                                        date_match = re.search(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}', details)
-                                        
-                                        book_data = {
-                                            "title": title,
-                                            "author": author,
-                                            "isbn": isbn,
-                                            "price": price_match.group(),
-                                            "format": format_match.group() if format_match else "",
-                                            "publication_date": date_match.group() if date_match else "",
-                                            "cover_url": cover_url,
-                                            "details": details
-                                        }
-                                        
-                                        book_entries.append(book_data)
-                                        print(f"Found book: {title} by {author}")
-                            
-                            # Convert to JSON format (without details field)
-                            # Remove details field from each book entry for JSON output
-                            books_without_details = []
-                            for book in book_entries:
-                                book_copy = {k: v for k, v in book.items() if k != 'details'}
-                                books_without_details.append(book_copy)
-                            
-                            if book_entries:
-                                print(f"\nSuccessfully found {len(book_entries)} unique book(s)")
-                                print(f"\nFirst few books:")
-                                for i, book in enumerate(book_entries[:3]):
-                                    print(f"{i+1}. {book['title']} by {book['author']} - {book['price']}")
-                                
-                                # Comment out CSV generation temporarily
-                                # import csv
-                                # csv_filename = "hachette_hnz_january_2026_all_books.csv"
-                                # with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                                #     fieldnames = ['title', 'author', 'isbn', 'price', 'format', 'publication_date', 'cover_url']
-                                #     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                                #     writer.writeheader()
-                                #     for book in book_entries:
-                                #         # Create a copy without the details field
-                                #         book_copy = {k: v for k, v in book.items() if k != 'details'}
-                                #         writer.writerow(book_copy)
-                                
-                                # Return the book data instead of saving to files
-                                return books_without_details
-                            else:
-                                print("No book entries found!")
-                                return []
-                        else:
-                            print(f"Not on {catalog_type} catalog page - skipping extraction")
-                            return []
-                    else:
-                        print(f"{catalog_query} link not found!")
-                        # Print all links for debugging
-                        all_links = await page.query_selector_all('a')
-                        print(f"Found {len(all_links)} total links:")
-                        for i, link in enumerate(all_links[:20]):  # Show first 20 links
-                            link_text = await link.text_content()
-                            if link_text:
-                                print(f"  Link {i+1}: '{link_text.strip()}'")
-                        return []
-                else:
-                    print("Login button not found!")
-                    return []
-            else:
-                print("Customer number input field not found!")
-                # Print all input fields for debugging
-                inputs = await page.query_selector_all('input')
-                print(f"Found {len(inputs)} input fields:")
-                for i, inp in enumerate(inputs):
-                    input_type = await inp.get_attribute('type')
-                    input_name = await inp.get_attribute('name')
-                    input_id = await inp.get_attribute('id')
-                    input_placeholder = await inp.get_attribute('placeholder')
-                    print(f"  Input {i+1}: type='{input_type}', name='{input_name}', id='{input_id}', placeholder='{input_placeholder}'")
-                return []
-            
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return []
-        
-        finally:
-            # Close browser immediately for Docker
-            await browser.close()
+    url = product_index.get(isbn)
+    if not url:
+        return None
+    print(f"Opening indexed title URL for ISBN {isbn.strip()}: {url}")
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms(60000))
+        await page.wait_for_selector('div.productRowBody___XM7bE', timeout=timeout_ms(5000))
+        for book in await page.query_selector_all('div.productRowBody___XM7bE'):
+            if index_key(await book.evaluate(ROW_ISBN_JS)) == index_key(isbn):
+                return book
+    except Exception as e:
+        print(f"Indexed title URL failed for ISBN {isbn.strip()}: {str(e)}")
+    product_index.invalidate(isbn)
+    return None
 
-async def test_single_isbn(isbn: str, login_required: bool = True):
+def remember_title_url(page, isbn: str):
+    """After a title click, store the title URL Edelweiss navigated to"""
+    if isbn and "sku=" in page.url:
+        product_index.put(isbn, page.url)
+
+async def open_edelweiss_search(context, isbn: str, login_required=True, has_session=False, use_index=False):
     """
-    Test function to scrape a single ISBN with detailed output
-    
+    Open Edelweiss in a new page, login if needed and search for an ISBN
+
     Args:
-        isbn: ISBN to test
-        login_required: Whether to login to Edelweiss
-    
+        context: Browser context leased from the pool
+        isbn (str): ISBN (or keywords) to search for
+        login_required (bool): Whether to login (needed for summaries)
+        has_session (bool): Whether the context was restored from a warm session
+        use_index (bool): Open the indexed title URL instead of searching,
+            when there is one. Only the title's own row comes back, so use
+            it when other editions and related titles are not wanted.
+
     Returns:
-        dict: Detailed results for the ISBN
+        tuple: (page, result row elements, failure result dict or None)
     """
-    print(f"\n{'='*60}")
-    print(f"TESTING SINGLE ISBN: {isbn}")
-    print(f"LOGIN REQUIRED: {login_required}")
-    print(f"{'='*60}")
-    
-    results = await scrape_isbns([isbn], login_required=login_required)
+    page = await context.new_page()
+
+    # Retry logic for page loading
+    max_retries = 3
+    retry_count = 0
+    success = False
     
-    if isbn in results:
-        result = results[isbn]
-        print(f"\nSTATUS: {result['status']}")
-        print(f"MESSAGE: {result['message']}")
+    while retry_count < max_retries and not success:
+        try:
+            # Navigate to the main page first to get to login
+            await page.goto(EDELWEISS_URL, wait_until="domcontentloaded", timeout=timeout_ms(60000))
+            await page.wait_for_timeout(timeout_ms(2000))  # Give page time to fully load
+            success = True
+        except Exception as e:
+            retry_count += 1
+            if retry_count < max_retries and not expired():
+                await page.wait_for_timeout(timeout_ms(2000 * retry_count))  # Exponential backoff
+                logger.warning(f"Retry {retry_count} for ISBN {isbn}: {str(e)}")
+            else:
+                logger.error(f"Failed to load page after {max_retries} retries for ISBN {isbn}: {str(e)}")
+                raise e
+
+    # Login if required, unless the restored session is still logged in
+    if login_required:
+        logged_in = False
+        if has_session:
+            try:
+                await page.wait_for_selector('input[name="keywords"]', timeout=timeout_ms(5000))
+                logged_in = True
+            except:
+                session_store.invalidate("edelweiss")
         
-        if result['books']:
-            print(f"\nFOUND {len(result['books'])} BOOK(S):")
-            for i, book in enumerate(result['books'], 1):
-                print(f"\n--- BOOK {i} ---")
-                print(f"Title: {book.get('title', 'N/A')}")
-                print(f"Subtitle: {book.get('subtitle', 'N/A')}")
-                print(f"Author: {book.get('author', 'N/A')}")
-                print(f"ISBN: {book.get('isbn', 'N/A')}")
-                print(f"Cover: {book.get('cover', 'N/A')}")
-                print(f"Publication Info: {book.get('pubInfo', 'N/A')}")
-                print(f"Format/Price: {book.get('formatPrice', 'N/A')}")
-                print(f"Discount Code: {book.get('discountCode', 'N/A')}")
-                print(f"BISAC: {book.get('bisac', 'N/A')}")
-                print(f"Pages: {book.get('pages', 'N/A')}")
-                print(f"Dimensions: {book.get('dimensions', 'N/A')}")
-                print(f"Status: {book.get('status', 'N/A')}")
-                print(f"Sales Rights: {book.get('salesRights', 'N/A')}")
-                print(f"Honors: {book.get('honors', 'N/A')}")
-                print(f"Community: {book.get('community', 'N/A')}")
-                print(f"Summary: {book.get('summary', 'N/A')}")
-                if book.get('summary'):
-                    print(f"Summary Length: {len(book['summary'])} characters")
-        else:
-            print("\nNO BOOKS FOUND")
-    else:
-        print(f"\nERROR: No results found for ISBN {isbn}")
-    
-    print(f"\n{'='*60}")
-    return results
+        if not logged_in:
+            login_success = await login_to_edelweiss(page)
+            if not login_success:
+                return page, [], {
+                    "status": "login_failed",
+                    "message": f"Failed to login to Edelweiss for ISBN {isbn.strip()}",
+                    "books": []
+                }
+            session_store.save("edelweiss", await context.storage_state(), page.url)
 
-@app.post("/scrape")
-async def scrape_single(request: ISBNRequest, login: bool = True):
-    return await scrape_isbns([request.isbn], login_required=login)
+    try:
+        # Go straight to a title seen before, searching only if that fails
+        book = await open_indexed_title(page, isbn) if use_index else None
+        if book:
+            return page, [book], None
 
-@app.post("/scrape-multiple")
-async def scrape_multiple(request: ISBNsRequest, login: bool = True):
-    return await scrape_isbns(request.isbns, login_required=login)
+        book_elements = await search_edelweiss(page, isbn)
+        if not book_elements:
+            return page, [], {
+                "status": "no_data_found",
+                "message": f"No results found on Edelweiss for ISBN {isbn.strip()}",
+                "books": []
+            }
+        return page, book_elements, None
 
-# Hachette HNZ API Endpoints
-@app.get("/", response_model=ScraperResponse)
-async def root():
-    """Root endpoint with basic info"""
-    return ScraperResponse(
-        success=True,
-        message="Multi-Scraper API is running. Use /hachette/scrape?query=January%202026%20HNZ for Hachette (supports HNZ, HCB catalogs), /scrape for Edelweiss, or /fantastic-fiction/search?author_name=David%20Baldacci for Fantastic Fiction.",
-        books=[],
-        total_books=0
-    )
+    except Exception as e:
+        return page, [], {
+            "status": "error",
+            "message": str(e),
+            "books": []
+        }
 
-@app.get("/hachette/scrape", response_model=ScraperResponse)
-async def scrape_hachette_books(query: str = "January 2026 HNZ"):
+ROW_ISBN_JS = """b => {
+    const spans = Array.from(b.querySelectorAll('div.dotDot span'));
+    const found = spans.find(s => /\\d{10,13}/.test(s.innerText));
+    return found ? found.innerText : null;
+}"""
+
+# Every key of an Edelweiss book, in response order
+BOOK_FIELDS = [
+    "title", "subtitle", "author", "isbn", "cover", "pubInfo", "formatPrice", "discountCode", "bisac",
+    "relatedProducts", "pages", "dimensions", "status", "salesRights", "honors", "community", "summary",
+]
+
+# In-page extraction of the cheap fields, one evaluate per field
+BOOK_FIELD_JS = {
+    "pubInfo": """b => {
+        const divs = Array.from(b.querySelectorAll('div.dotDot'));
+        const found = divs.find(d => d.innerText.includes('Pub Date'));
+        return found ? found.innerText : null;
+    }""",
+    "formatPrice": """b => {
+        const divs = Array.from(b.querySelectorAll('div.dotDot'));
+        const found = divs.find(d => /\\$/.test(d.innerText) || /Trade/.test(d.innerText));
+        return found ? found.innerText : null;
+    }""",
+    "discountCode": """b => {
+        const divs = Array.from(b.querySelectorAll('div'));
+        const found = divs.find(d => d.innerText.includes('Discount Code'));
+        return found ? found.innerText : null;
+    }""",
+    "relatedProducts": """b => b.querySelector('.related-products-container button')?.innerText || null""",
+    "pages": """b => Array.from(b.querySelectorAll('.biblioTwo___bgyhS div')).map(d => d.innerText).find(t => /\\d+\\s+pages/.test(t)) || null""",
+    "dimensions": """b => {
+        const divs = Array.from(b.querySelectorAll('.biblioTwoItemContainer___QeMy0 div'));
+        return divs[0] ? divs[0].innerText : null;
+    }""",
+    "status": """b => {
+        const divs = Array.from(b.querySelectorAll('div.dotDot'));
+        const found = divs.find(d => d.innerText.includes('Status:'));
+        return found || null;
+    }""",
+    "salesRights": """b => {
+        const buttons = Array.from(b.querySelectorAll('.biblioTwo___bgyhS button'));
+        const found = buttons.find(btn => btn.innerText.includes('View'));
+        return found ? found.innerText : null;
+    }""",
+    "honors": """b => Array.from(b.querySelectorAll('.dotDot.flex img')).map(img => img.alt)""",
+    "community": """b => Array.from(b.querySelectorAll('.communityItemsRow___utLCU button')).map(btn => btn.innerText)""",
+}
+
+# Fields read from a child element: selector and what to read from it
+BOOK_FIELD_ELEMENTS = {
+    "title": ('p[class*="titleName"]', None),
+    "subtitle": ('span[class*="subTitleName"]', None),
+    "author": ('div[class*="contributors"]', None),
+    "cover": ('img[alt^="Cover for"]', "src"),
+}
+
+async def extract_bisac(page, book):
+    """Open the row's BISAC popover and read the categories"""
+    bisac_button = await book.query_selector('button:has-text("BISAC")')
+    if not bisac_button:
+        return None
+    try:
+        if await bisac_button.is_enabled():
+            await bisac_button.click()
+            popover = await page.wait_for_selector('div.MuiPopover-paper', timeout=timeout_ms(3000))
+            return await popover.evaluate("""
+                pop => Array.from(pop.querySelectorAll('li'))
+                        .slice(1)
+                        .map(li => li.innerText.trim())
+            """)
+    except:
+        pass
+    return None
+
+async def extract_book(page, book, fields=None):
     """
-    Scrape books from Hachette catalog
-    
+    Extract one Edelweiss result row. The summary is left empty; see
+    fill_summaries().
+
     Args:
-        query (str): The catalog query (e.g., "January 2026 HNZ", "December 2025 HCB", "February 2026 HNZ")
-    
+        page: Playwright page showing the results
+        book: The productRowBody element of the row
+        fields (set): Fields to extract, None for all. Fields not asked for
+            are not extracted at all (no BISAC popover without "bisac"), but
+            the ISBN is always read since rows are matched by it.
+
     Returns:
-        ScraperResponse: JSON response with book data
+        dict: Book data with every key of BOOK_FIELDS; skipped fields are
+        None. "incomplete" is set when the request's deadline left no time
+        for the BISAC popover.
     """
-    try:
-        # Validate query format (should contain month, year, and catalog type)
-        query_parts = query.split()
-        if len(query_parts) < 3:
-            raise HTTPException(
-                status_code=400, 
-                detail="Query must be in format: 'Month Year CatalogType' (e.g., 'January 2026 HNZ', 'December 2025 HCB')"
-            )
-        
-        # Extract catalog type for validation
-        catalog_type = query_parts[-1]
-        if catalog_type not in ['HNZ', 'HCB']:  # Add more catalog types as needed
-            raise HTTPException(
-                status_code=400, 
-                detail="Catalog type must be one of: HNZ, HCB"
-            )
-        
-        # Hardcoded Hachette login page and customer number
-        url = "https://ati.hachette.co.nz/login"
-        customer_number = "46628"
-        
-        # Run the scraper with the provided query
-        books_data = await navigate_and_login_hachette(url, customer_number, query)
-        
-        # Convert to BookData objects
-        books = [BookData(**book) for book in books_data]
-        
-        return ScraperResponse(
-            success=True,
-            message=f"Successfully scraped {len(books)} books from Hachette {catalog_type} catalog",
-            books=books,
-            total_books=len(books)
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Scraping failed: {str(e)}"
-        )
+    data = dict.fromkeys(BOOK_FIELDS)
+    wanted = lambda field: fields is None or field in fields
 
-# Fantastic Fiction API Endpoints
-@app.post("/fantastic-fiction/search", response_model=AuthorSearchResponse)
-async def search_fantastic_fiction_author(request: AuthorSearchRequest):
+    with field_metrics.timer("isbn"):
+        data["isbn"] = clean_string(await book.evaluate(ROW_ISBN_JS))
+
+    for field, (selector, attribute) in BOOK_FIELD_ELEMENTS.items():
+        if wanted(field):
+            with field_metrics.timer(field):
+                element = await book.query_selector(selector)
+                if element:
+                    value = await element.get_attribute(attribute) if attribute else await element.text_content()
+                    data[field] = clean_string(value)
+
+    for field, script in BOOK_FIELD_JS.items():
+        if wanted(field):
+            with field_metrics.timer(field):
+                value = await book.evaluate(script)
+            if field in ("honors", "community"):
+                data[field] = [clean_string(item) for item in value] if value else []
+            else:
+                data[field] = clean_string(value)
+
+    if wanted("bisac") and not can_afford():
+        # No time left for the popover
+        skip_step("bisac")
+        data["incomplete"] = True
+    elif wanted("bisac"):
+        with field_metrics.timer("bisac"):
+            bisac_categories = await extract_bisac(page, book)
+        data["bisac"] = [clean_string(cat) for cat in bisac_categories] if bisac_categories else None
+
+    return data
+
+async def extract_summaries_in_tabs(context, keywords: str, isbns: List[str]):
     """
-    Search for an author on Fantastic Fiction website
-    
+    Extract the summaries of several rows of one search at the same time
+
+    Each row gets its own page in the logged-in context, which replays the
+    search and clicks the row's title. At most SUMMARY_CONCURRENCY pages
+    are open at once. Rows still waiting for a page when the request's
+    deadline gets close are skipped.
+
     Args:
-        request (AuthorSearchRequest): Request containing author name and search type
-    
+        context: Logged-in browser context
+        keywords (str): The search that returned the rows
+        isbns (List[str]): ISBNs of the rows to extract
+
     Returns:
-        AuthorSearchResponse: JSON response with found books
+        Dict[str, str]: Summary (or None) by ISBN; skipped ISBNs are left out
     """
-    try:
+    semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+    skipped = object()
+
+    async def extract_one(isbn):
+        async with semaphore:
+            if not can_afford():
+                skip_step("summary")
+                return skipped
+            with field_metrics.timer("summary"):
+                page = await context.new_page()
+                try:
+                    await page.goto(EDELWEISS_URL, wait_until="domcontentloaded", timeout=timeout_ms(60000))
+                    await page.wait_for_selector('input[name="keywords"]', timeout=timeout_ms(15000))
+                    book = await open_indexed_title(page, isbn)
+                    if not book:
+                        for row in await search_edelweiss(page, keywords):
+                            if clean_string(await row.evaluate(ROW_ISBN_JS)) == isbn:
+                                book = row
+                                break
+                    if not book:
+                        print(f"Row for ISBN {isbn} not found in summary tab")
+                        return None
+                    summary = await extract_summary_from_title_click(page, book)
+                    remember_title_url(page, isbn)
+                    return summary
+                except Exception as e:
+                    print(f"Error extracting summary for ISBN {isbn} in tab: {str(e)}")
+                    return None
+                finally:
+                    await page.close()
+
+    summaries = await asyncio.gather(*(extract_one(isbn) for isbn in isbns))
+    return {isbn: summary for isbn, summary in zip(isbns, summaries) if summary is not skipped}
+
+async def fill_summaries(context, page, keywords: str, book_elements, books_data):
+    """
+    Fill in the summary of every extracted row, from the cache where
+    possible. With more than one row to extract, the rows fan out across
+    tabs (extract_summaries_in_tabs); a single row is clicked on the
+    results page itself. Rows the request's deadline leaves no time for
+    keep an empty summary and are flagged "incomplete".
+
+    Args:
+        context: Logged-in browser context
+        page: The page showing the results
+        keywords (str): The search that returned the rows
+        book_elements (list): Result row elements
+        books_data (list): Extracted rows, in the same order, updated in place
+    """
+    missing = []
+    for book, data in zip(book_elements, books_data):
+        cached, data["summary"] = summary_cache.lookup(data["isbn"]) if data["isbn"] else (False, None)
+        if not cached:
+            missing.append((book, data))
+
+    # Rows without an ISBN cannot be found again in another tab
+    use_tabs = SUMMARY_CONCURRENCY > 1 and sum(1 for _, data in missing if data["isbn"]) > 1
+    in_tabs = [(book, data) for book, data in missing if use_tabs and data["isbn"]]
+    on_page = [(book, data) for book, data in missing if not (use_tabs and data["isbn"])]
+
+    extracted = []
+    if in_tabs:
+        summaries = await extract_summaries_in_tabs(context, keywords, [data["isbn"] for _, data in in_tabs])
+        for _, data in in_tabs:
+            if data["isbn"] in summaries:
+                data["summary"] = summaries[data["isbn"]]
+                extracted.append(data)
+    for book, data in on_page:
+        if not can_afford():
+            skip_step("summary")
+            break
+        with field_metrics.timer("summary"):
+            data["summary"] = await extract_summary_from_title_click(page, book)
+        remember_title_url(page, data["isbn"])
+        extracted.append(data)
+
+    for data in extracted:
+        summary_cache.put(data["isbn"], data["summary"])
+    extracted_ids = {id(data) for data in extracted}
+    for _, data in missing:
+        if id(data) not in extracted_ids:
+            data["incomplete"] = True
+
+def incomplete_flag(record):
+    """{"incomplete": True} for records missing a field the deadline left no time for, else {}"""
+    return {"incomplete": True} if record.get("incomplete") else {}
+
+async def extract_books(context, page, keywords: str, book_elements, login_required=True, include_summary=False, fields=None):
+    """
+    Extract result rows, fill in their summaries and project them to `fields`
+
+    Args:
+        context: Browser context of the page
+        page: The page showing the results
+        keywords (str): The search that returned the rows
+        book_elements (list): Result row elements to extract
+        login_required (bool): Whether the page is logged in (summaries need it)
+        include_summary (bool): Whether to extract summaries
+        fields (set): Book keys to return, None for all of them. Requesting
+            "summary" implies include_summary.
+
+    Returns:
+        List[Dict]: Book data, in row order. Rows missing the summary or
+        BISAC for lack of time before the request's deadline carry
+        "incomplete": True.
+    """
+    if fields is not None:
+        include_summary = "summary" in fields
+    requested = set(fields) if fields is not None else set(BOOK_FIELDS)
+    if not include_summary:
+        requested.discard("summary")
+
+    books_data = []
+    for book in book_elements:
+        books_data.append(await extract_book(page, book, fields))
+
+    # Summaries need the side panel, which only opens when logged in
+    if include_summary and login_required:
+        await fill_summaries(context, page, keywords, book_elements, books_data)
+
+    for field in BOOK_FIELDS:
+        if field not in requested:
+            for _ in books_data:
+                field_metrics.record_skipped(field)
+    if fields is not None:
+        books_data = [
+            {**{field: data[field] for field in BOOK_FIELDS if field in fields}, **incomplete_flag(data)}
+            for data in books_data
+        ]
+    return books_data
+
+async def scrape_isbn(context, isbn: str, login_required=True, has_session=False, include_summary=False, fields=None, exact=False):
+    """
+    Search Edelweiss for one ISBN and extract every result row
+
+    Args:
+        context: Browser context leased from the pool
+        isbn (str): ISBN to search for
+        login_required (bool): Whether to login
+        has_session (bool): Whether the context was restored from a warm session
+        include_summary (bool): Whether to extract summaries (needs login)
+        fields (set): Book keys to return, None for all of them. Requesting
+            "summary" implies include_summary.
+        exact (bool): Fully extract only the row whose ISBN matches the
+            query; other rows (editions, related titles) come back as stubs
+            with just title and isbn. Falls back to extracting every row
+            when none matches. Titles in the product index are opened
+            directly, skipping the search.
+
+    Returns:
+        dict: Result with status, message and books
+    """
+    page, book_elements, failure = await open_edelweiss_search(context, isbn, login_required, has_session, use_index=exact)
+    if failure:
+        return failure
+
+    try:
+        stubs = []
+        if exact:
+            matching, others = [], []
+            for book in book_elements:
+                row_isbn = index_key(await book.evaluate(ROW_ISBN_JS))
+                if row_isbn and row_isbn == index_key(isbn):
+                    matching.append(book)
+                else:
+                    others.append(book)
+            if matching:
+                book_elements = matching
+                for book in others:
+                    stub = await extract_book(page, book, {"title"})
+                    stubs.append({"title": stub["title"], "isbn": stub["isbn"], "stub": True})
+            else:
+                print(f"No result row matches ISBN {isbn.strip()} exactly, extracting all rows")
+
+        books_data = await extract_books(context, page, isbn, book_elements, login_required, include_summary, fields)
+        for field in BOOK_FIELDS:
+            if field not in ("title", "isbn"):
+                for _ in stubs:
+                    field_metrics.record_skipped(field)
+        books_data += stubs
+
+        return {
+            "status": "data_found",
+            "message": f"Found {len(books_data)} book(s) for ISBN {isbn.strip()}",
+            "books": books_data
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "books": []
+        }
+
+async def scrape_isbn_batch(context, isbns: List[str], login_required=True, has_session=False, include_summary=False, fields=None):
+    """
+    Search Edelweiss for several ISBNs in one keyword search and map the
+    returned rows back to the ISBN they belong to
+
+    Only each ISBN's own rows are kept; other editions and related titles
+    cannot be attributed to one ISBN of the batch and are dropped.
+
+    Args:
+        context: Browser context leased from the pool
+        isbns (List[str]): ISBNs to search for together
+        login_required (bool): Whether to login
+        has_session (bool): Whether the context was restored from a warm session
+        include_summary (bool): Whether to extract summaries (needs login)
+        fields (set): Book keys to return, None for all of them
+
+    Returns:
+        Dict[str, dict]: Result per ISBN whose row came back. ISBNs missing
+        from the dict need a single lookup.
+    """
+    keywords = " ".join(isbn.strip() for isbn in isbns)
+    page, book_elements, failure = await open_edelweiss_search(context, keywords, login_required, has_session)
+    if failure and failure["status"] == "login_failed":
+        return {
+            isbn.strip(): {
+                "status": "login_failed",
+                "message": f"Failed to login to Edelweiss for ISBN {isbn.strip()}",
+                "books": []
+            }
+            for isbn in isbns
+        }
+    if failure:
+        print(f"Batched search for {len(isbns)} ISBNs found nothing: {failure['message']}")
+        return {}
+
+    try:
+        wanted = {index_key(isbn): isbn.strip() for isbn in isbns}
+        owners, rows = [], []
+        for book in book_elements:
+            owner = wanted.get(index_key(await book.evaluate(ROW_ISBN_JS)))
+            if owner:
+                owners.append(owner)
+                rows.append(book)
+
+        books_data = await extract_books(context, page, keywords, rows, login_required, include_summary, fields)
+        books_by_isbn = {}
+        for owner, data in zip(owners, books_data):
+            books_by_isbn.setdefault(owner, []).append(data)
+        results = {
+            owner: {
+                "status": "data_found",
+                "message": f"Found {len(books)} book(s) for ISBN {owner}",
+                "books": books
+            }
+            for owner, books in books_by_isbn.items()
+        }
+        print(f"Batched search matched {len(results)} of {len(isbns)} ISBNs")
+        return results
+
+    except Exception as e:
+        print(f"Batched search failed, falling back to single lookups: {str(e)}")
+        return {}
+
+def deadline_result(isbn: str):
+    """Result of an ISBN the request's deadline left no time for"""
+    return {
+        "status": "deadline_exceeded",
+        "message": f"Deadline reached before ISBN {isbn} was scraped",
+        "books": [],
+        "incomplete": True
+    }
+
+async def scrape_isbns(isbns: List[str], login_required=True, include_summary=False, fields=None, exact=False,
+                       batch_size=EDELWEISS_SEARCH_BATCH_SIZE):
+    """
+    Scrape Edelweiss for a list of ISBNs
+
+    The ISBNs are canonicalized to ISBN-13 and de-duplicated first, so
+    hyphenated, ISBN-10 and repeated forms of one title cost a single
+    lookup; inputs that are not valid ISBNs are rejected without opening a
+    browser. With batch_size > 1 the ISBNs are searched in chunks of that
+    size (see scrape_isbn_batch) and only those left unmatched get a
+    search of their own.
+
+    Within a request deadline (see deadline.py), ISBNs not started before
+    it passes come back as "deadline_exceeded", and results with records
+    missing the summary or BISAC for lack of time are flagged
+    "incomplete", so the ISBNs that were scraped still reach the caller.
+
+    Returns:
+        Dict[str, dict]: Result per input ISBN (stripped), every input
+        form of a title sharing the same result
+    """
+    unique, isbn13_by_input, invalid = dedupe_isbns(isbns)
+    results_by_isbn = {}
+    pool = await get_browser_pool() if unique else None
+
+    pending = unique
+    if batch_size > 1:
+        for start in range(0, len(pending), batch_size):
+            if expired():
+                break
+            chunk = pending[start:start + batch_size]
+            session_options = session_store.context_options("edelweiss") if login_required else {}
+            try:
+                async with pool.context("edelweiss", f"batch-{chunk[0]}", **session_options) as context:
+                    results_by_isbn.update(await scrape_isbn_batch(
+                        context, chunk, login_required, has_session=bool(session_options),
+                        include_summary=include_summary, fields=fields
+                    ))
+            except FileNotFoundError as e:
+                print(f"Batched search unavailable: {str(e)}")
+            except Exception:
+                # A page load or context wait cut off by the deadline
+                if not expired():
+                    raise
+        pending = [isbn for isbn in pending if isbn not in results_by_isbn]
+
+    for isbn in pending:
+        if expired():
+            results_by_isbn[isbn] = deadline_result(isbn)
+            continue
+        session_options = session_store.context_options("edelweiss") if login_required else {}
+        try:
+            async with pool.context("edelweiss", isbn, **session_options) as context:
+                results_by_isbn[isbn] = await scrape_isbn(
+                    context, isbn, login_required, has_session=bool(session_options),
+                    include_summary=include_summary, fields=fields, exact=exact
+                )
+        except FileNotFoundError as e:
+            results_by_isbn[isbn] = {
+                "status": "error",
+                "message": str(e),
+                "books": []
+            }
+        except Exception:
+            # A page load or context wait cut off by the deadline fails this ISBN only
+            if not expired():
+                raise
+            results_by_isbn[isbn] = deadline_result(isbn)
+
+    for result in results_by_isbn.values():
+        if any(book.get("incomplete") for book in result["books"]):
+            result["incomplete"] = True
+
+    scraped_books = [book for result in results_by_isbn.values() for book in result["books"]]
+    index_records("edelweiss", scraped_books)
+    postgres_sink.submit("edelweiss", scraped_books)
+
+    # Fan the results back out to the forms the caller used
+    results_by_input = {raw: results_by_isbn[isbn13] for raw, isbn13 in isbn13_by_input.items()}
+    for raw in invalid:
+        results_by_input[raw] = {
+            "status": "invalid_isbn",
+            "message": f"'{raw}' is not a valid ISBN-10 or ISBN-13",
+            "books": []
+        }
+    return results_by_input
+
+async def fetch_summary(isbn: str):
+    """
+    Get the summary of one title, from the cache or from Edelweiss
+
+    Args:
+        isbn (str): ISBN of the title
+
+    Returns:
+        tuple: (summary or None, whether it came from the cache, failure result dict or None)
+    """
+    isbn = normalize_isbn(isbn) or isbn.strip()
+    cached, summary = summary_cache.lookup(isbn)
+    if cached:
+        return summary, True, None
+
+    pool = await get_browser_pool()
+    session_options = session_store.context_options("edelweiss")
+    async with pool.context("edelweiss", f"summary-{isbn}", **session_options) as context:
+        page, book_elements, failure = await open_edelweiss_search(context, isbn, True, bool(session_options), use_index=True)
+        if failure:
+            return None, False, failure
+
+        # Prefer the row for this exact ISBN over other editions
+        book = book_elements[0]
+        for element in book_elements:
+            if clean_string(await element.evaluate(ROW_ISBN_JS)) == isbn:
+                book = element
+                break
+        summary = await extract_summary_from_title_click(page, book)
+        remember_title_url(page, isbn)
+        summary_cache.put(isbn, summary)
+        return summary, False, None
+
+# Hachette Scraper Functions
+async def login_to_hachette(page, url=HACHETTE_LOGIN_URL, customer_number="46628"):
+    """
+    Navigate to the Hachette login page, enter the customer number and login
+
+    Args:
+        page: Playwright page object
+        url (str): The login URL
+        customer_number (str): The customer number to enter
+
+    Returns:
+        bool: True if the login was accepted, False otherwise
+    """
+    print(f"Navigating to: {url}")
+    await page.goto(url, timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+    
+    # Wait for the page to load
+    await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+    
+    # Get the page title
+    title = await page.title()
+    print(f"\nPage Title: {title}")
+    
+    # Print initial page content
+    content = await page.text_content('body')
+    print(f"\nInitial Page Content:")
+    print("=" * 50)
+    print(content)
+    print("=" * 50)
+    
+    # Look for customer number input field
+    print(f"\nLooking for customer number input field...")
+    
+    # Try different possible selectors for the input field
+    input_selectors = [
+        'input[type="text"]',
+        'input[name*="customer"]',
+        'input[name*="number"]',
+        'input[id*="customer"]',
+        'input[id*="number"]',
+        'input[placeholder*="customer"]',
+        'input[placeholder*="number"]'
+    ]
+    
+    input_field, selector, _ = await resolve_first(page, "hachette", "login_customer_number", input_selectors, ['input'])
+    if input_field:
+        print(f"Found input field with selector: {selector}")
+    
+    if not input_field:
+        print("Customer number input field not found!")
+        # Print all input fields for debugging
+        inputs = await page.query_selector_all('input')
+        print(f"Found {len(inputs)} input fields:")
+        for i, inp in enumerate(inputs):
+            input_type = await inp.get_attribute('type')
+            input_name = await inp.get_attribute('name')
+            input_id = await inp.get_attribute('id')
+            input_placeholder = await inp.get_attribute('placeholder')
+            print(f"  Input {i+1}: type='{input_type}', name='{input_name}', id='{input_id}', placeholder='{input_placeholder}'")
+        return False
+    
+    print(f"Entering customer number: {customer_number}")
+    await input_field.fill(customer_number)
+    
+    # Look for login/submit button
+    print("Looking for login button...")
+    button_selectors = [
+        'button[type="submit"]',
+        'input[type="submit"]',
+        'button:has-text("Log in")',
+        'button:has-text("Login")',
+        'button:has-text("Submit")'
+    ]
+    
+    login_button, selector, button_text = await resolve_first(page, "hachette", "login_button", button_selectors, ['button'])
+    if login_button:
+        print(f"Found button with selector: {selector}, text: '{button_text}'")
+    
+    if not login_button:
+        print("Login button not found!")
+        return False
+    
+    print("Clicking login button...")
+    await login_button.click()
+    
+    # Wait for navigation or page change
+    await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+    
+    # Print updated page content
+    new_title = await page.title()
+    print(f"\nNew Page Title: {new_title}")
+    
+    new_content = await page.text_content('body')
+    print(f"\nUpdated Page Content:")
+    print("=" * 50)
+    print(new_content)
+    print("=" * 50)
+    
+    # The form accepts any customer number, so only a catalog listing
+    # proves the login went through
+    if not await hachette_catalogs_listed(page):
+        print("Login rejected - no catalogs listed after submitting the customer number")
+        return False
+    return True
+
+async def hachette_catalogs_listed(page):
+    """
+    Check whether the page lists monthly catalogs (only shown when logged in)
+
+    Args:
+        page: Playwright page object
+
+    Returns:
+        bool: True if at least one catalog link (e.g. "January 2026 HNZ") is present
+    """
+    try:
+        return await page.evaluate("""() => Array.from(document.querySelectorAll('a'))
+            .some(a => /[A-Z][a-z]+ \\d{4} [A-Z]{3}/.test(a.innerText))""")
+    except:
+        return False
+
+async def find_hachette_catalog_link(page, catalog_query):
+    """
+    Find the link to a catalog on the Hachette catalogs page
+
+    Args:
+        page: Playwright page object (logged in)
+        catalog_query (str): The catalog to look for (e.g., "January 2026 HNZ")
+
+    Returns:
+        ElementHandle: The catalog link, or None if not found
+    """
+    print(f"\nLooking for '{catalog_query}' link...")
+    
+    # Try different selectors to find the link. The registry learns the
+    # templates, so the winner carries over between catalogs.
+    link_templates = [
+        'a:has-text("{query}")',
+        'a:has-text("{month}. {query}")',  # e.g., "01. January 2026 HNZ"
+        'a[href*="{catalog_type}"]',  # e.g., "HNZ" or "HCB"
+    ]
+    
+    link, _, link_text = await resolve_first(
+        page, "hachette", "catalog_link", link_templates, ['a'], contains_text=catalog_query,
+        template_args={"query": catalog_query, "month": catalog_query.split()[0], "catalog_type": catalog_query.split()[-1]}
+    )
+    if link:
+        print(f"Found catalog link with text: '{link_text.strip()}'")
+    return link
+
+async def open_hachette_catalog(page, catalog_link, catalog_query):
+    """
+    Open a catalog from the catalogs list
+
+    Args:
+        page: Playwright page object (logged in)
+        catalog_link: Link element returned by find_hachette_catalog_link
+        catalog_query (str): The catalog being scraped (e.g., "January 2026 HNZ")
+
+    Returns:
+        bool: True if the catalog page is showing
+    """
+    print(f"Clicking on {catalog_query} link...")
+    await catalog_link.click()
+    
+    # Wait for the page to fully load and navigate to catalog
+    await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+    await asyncio.sleep(timeout_ms(3000) / 1000)  # Additional wait to ensure page is fully loaded
+    
+    # Extract catalog type from query (e.g., "HNZ", "HCB")
+    catalog_type = catalog_query.split()[-1]
+    
+    # Wait for the URL to change to catalog or check if we're on the right page
+    try:
+        await page.wait_for_function(f"() => window.location.href.includes('{catalog_type}') || document.title.includes('{catalog_type}')", timeout=timeout_ms(10000))
+    except:
+        print(f"Waiting for {catalog_type} page to load...")
+        await asyncio.sleep(timeout_ms(2000) / 1000)
+    
+    # Get the new page content
+    catalog_title = await page.title()
+    catalog_url = page.url
+    print(f"\n{catalog_type} Page Title: {catalog_title}")
+    print(f"{catalog_type} Page URL: {catalog_url}")
+    
+    # Only extract if we're actually on the catalog page
+    if not (catalog_type in catalog_title or catalog_type in catalog_url):
+        print(f"Not on {catalog_type} catalog page - skipping extraction")
+        return False
+    return True
+
+HACHETTE_ENTRY_JS = """
+li => {
+    const text = selector => {
+        const el = li.querySelector(selector);
+        return el ? (el.textContent || '').trim() : null;
+    };
+    const title = text('h3');
+    if (title === null) return null;
+    const img = li.querySelector('img');
+    return {
+        title,
+        author: text('p.author') || '',
+        details: text('p.details') || '',
+        cover_url: img ? img.getAttribute('src') || '' : ''
+    };
+}
+"""
+
+async def iter_hachette_books(page):
+    """
+    Extract the book entries of an open catalog page one at a time
+
+    Each entry is yielded as soon as its li element is parsed and the
+    element handle is released straight away, so callers that stream the
+    entries never hold more than one of them.
+    Entries are written to the book index and Postgres sink 100 at a time.
+
+    Args:
+        page: Playwright page object showing a catalog
+
+    Yields:
+        Dict: Book data dictionary
+    """
+    # Find all li elements that contain book information
+    li_elements = await page.query_selector_all('li')
+    seen_isbns = set()  # To avoid duplicates
+    # Entries waiting to be written to the book index and Postgres sink
+    unrecorded = []
+
+    def record_books():
+        index_records("hachette", unrecorded)
+        postgres_sink.submit("hachette", unrecorded)
+        unrecorded.clear()
+
+    try:
+        async for book in parse_hachette_entries(li_elements, seen_isbns):
+            unrecorded.append(book)
+            if len(unrecorded) >= 100:
+                record_books()
+            yield book
+    finally:
+        record_books()
+
+async def parse_hachette_entries(li_elements, seen_isbns):
+    """
+    Parse catalog li elements into book dicts, skipping repeated ISBNs.
+    Stops early when the request's deadline passes.
+    """
+    for li in li_elements:
+        if expired():
+            skip_step("catalog entries")
+            return
+        # Title, author, details (ISBN, price, format, date) and cover in one round trip
+        try:
+            entry = await li.evaluate(HACHETTE_ENTRY_JS)
+        finally:
+            await li.dispose()
+        # Only li elements with an h3 title are book entries
+        if not entry:
+            continue
+        title, author, details = entry["title"], entry["author"], entry["details"]
+        cover_url = entry["cover_url"]
+        if cover_url and not cover_url.startswith('http'):
+            cover_url = 'https:' + cover_url
+        
+        # Parse details to extract ISBN, price, format, date
+        isbn_match = re.search(r'978\d{10}|979\d{10}', details)
+        price_match = re.search(r'\$\d+\.\d+', details)
+        
+        if title and isbn_match and price_match:
+            isbn = isbn_match.group()
+            
+            # Skip if we've already seen this ISBN (avoid duplicates)
+            if isbn in seen_isbns:
+                continue
+            seen_isbns.add(isbn)
+            
+            # Extract format and date
+            format_match = re.search(r'(Paperback|Hardback)(?:\s*-\s*[A-Z]\s*Format)?', details)
+            date_match = re.search(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}', details)
+            
+            print(f"Found book: {title} by {author}")
+            yield {
+                "title": title,
+                "author": author,
+                "isbn": isbn,
+                "price": price_match.group(),
+                "format": format_match.group() if format_match else "",
+                "publication_date": date_match.group() if date_match else "",
+                "cover_url": cover_url
+            }
+
+async def extract_hachette_books(page, catalog_link, catalog_query):
+    """
+    Open a catalog and extract its book entries
+
+    Args:
+        page: Playwright page object (logged in)
+        catalog_link: Link element returned by find_hachette_catalog_link
+        catalog_query (str): The catalog being scraped (e.g., "January 2026 HNZ")
+
+    Returns:
+        List[Dict]: List of book data dictionaries
+    """
+    if not await open_hachette_catalog(page, catalog_link, catalog_query):
+        return []
+    
+    print(f"\nExtracting book catalog entries from {catalog_query}...")
+    book_entries = [book async for book in iter_hachette_books(page)]
+    
+    if book_entries:
+        print(f"\nSuccessfully found {len(book_entries)} unique book(s)")
+        print("\nFirst few books:")
+        for i, book in enumerate(book_entries[:3]):
+            print(f"{i+1}. {book['title']} by {book['author']} - {book['price']}")
+    else:
+        print("No book entries found!")
+    return book_entries
+
+async def stream_hachette_books(url=HACHETTE_LOGIN_URL, customer_number="46628", catalog_query="January 2026 HNZ"):
+    """
+    Navigate to Hachette login page, enter customer number, and login, then
+    yield the entries of a catalog as they are extracted.
+    Reuses the warm Hachette session when there is one.
+    
+    Args:
+        url (str): The login URL
+        customer_number (str): The customer number to enter
+        catalog_query (str): The catalog to search for (e.g., "January 2026 HNZ", "December 2025 HCB")
+    
+    Yields:
+        Dict: Book data dictionary
+    """
+    pool = await get_browser_pool()
+    session = session_store.get("hachette")
+    
+    # The pool closes the context when the block exits
+    async with pool.context("hachette", catalog_query, **session_store.context_options("hachette")) as context:
+        page = await context.new_page()
+        try:
+            catalog_link = None
+            if session and session.url:
+                print("Reusing Hachette session...")
+                await page.goto(session.url, timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+                await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+                catalog_link = await find_hachette_catalog_link(page, catalog_query)
+                if not catalog_link:
+                    # The session may have expired, fall back to a fresh login
+                    session_store.invalidate("hachette")
+            
+            if not catalog_link:
+                if not await login_to_hachette(page, url, customer_number):
+                    return
+                catalog_link = await find_hachette_catalog_link(page, catalog_query)
+                if catalog_link:
+                    # Only keep sessions that reached the catalogs
+                    session_store.save("hachette", await context.storage_state(), page.url)
+            
+            if not catalog_link:
+                print(f"{catalog_query} link not found!")
+                # Print all links for debugging
+                all_links = await page.query_selector_all('a')
+                print(f"Found {len(all_links)} total links:")
+                for i, link in enumerate(all_links[:20]):  # Show first 20 links
+                    link_text = await link.text_content()
+                    if link_text:
+                        print(f"  Link {i+1}: '{link_text.strip()}'")
+                return
+            
+            if not await open_hachette_catalog(page, catalog_link, catalog_query):
+                return
+            async for book in iter_hachette_books(page):
+                yield book
+        finally:
+            await page.close()
+
+async def navigate_and_login_hachette(url=HACHETTE_LOGIN_URL, customer_number="46628", catalog_query="January 2026 HNZ"):
+    """
+    Navigate to Hachette login page, enter customer number, and login.
+    Reuses the warm Hachette session when there is one.
+    
+    Args:
+        url (str): The login URL
+        customer_number (str): The customer number to enter
+        catalog_query (str): The catalog to search for (e.g., "January 2026 HNZ", "December 2025 HCB")
+    
+    Returns:
+        List[Dict]: List of book data dictionaries
+    """
+    try:
+        books = [book async for book in stream_hachette_books(url, customer_number, catalog_query)]
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        if expired():
+            skip_step("catalog")
+        return []
+    print(f"\nSuccessfully found {len(books)} unique book(s)" if books else "No book entries found!")
+    return books
+
+async def open_hachette_session(context, url=HACHETTE_LOGIN_URL, customer_number="46628"):
+    """
+    Get a page of the context onto the Hachette catalog list, reusing the
+    warm session or logging in
+
+    Args:
+        context: Browser context (restored from the warm session if there is one)
+        url (str): The login URL
+        customer_number (str): The customer number to enter
+
+    Returns:
+        str: URL of the catalog list, or None if the login failed
+    """
+    page = await context.new_page()
+    try:
+        session = session_store.get("hachette")
+        if session and session.url:
+            print("Reusing Hachette session...")
+            await page.goto(session.url, timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+            await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+            if await hachette_catalogs_listed(page):
+                return page.url
+            session_store.invalidate("hachette")
+
+        # login_to_hachette only succeeds once catalogs are listed
+        if not await login_to_hachette(page, url, customer_number):
+            return None
+        session_store.save("hachette", await context.storage_state(), page.url)
+        return page.url
+    finally:
+        await page.close()
+
+async def scrape_hachette_catalog_in_tab(context, catalogs_url, catalog_query):
+    """
+    Scrape one catalog in a new page of a logged-in context
+
+    Returns:
+        List[Dict]: List of book data dictionaries
+
+    Raises:
+        LookupError: If the catalog is not listed
+    """
+    page = await context.new_page()
+    try:
+        await page.goto(catalogs_url, timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+        await page.wait_for_load_state('networkidle', timeout=timeout_ms(PLAYWRIGHT_TIMEOUT_MS))
+        catalog_link = await find_hachette_catalog_link(page, catalog_query)
+        if not catalog_link:
+            raise LookupError(f"{catalog_query} link not found")
+        return await extract_hachette_books(page, catalog_link, catalog_query)
+    finally:
+        await page.close()
+
+async def scrape_hachette_catalogs(catalog_queries: List[str], url=HACHETTE_LOGIN_URL, customer_number="46628"):
+    """
+    Scrape several Hachette catalogs with one login
+
+    The catalogs are scraped concurrently in separate pages of one
+    logged-in context, at most HACHETTE_CATALOG_CONCURRENCY at a time, and
+    yielded as each one finishes.
+
+    Args:
+        catalog_queries (List[str]): Catalogs (e.g., ["January 2026 HNZ", "January 2026 HCB"])
+        url (str): The login URL
+        customer_number (str): The customer number to enter
+
+    Yields:
+        tuple: (catalog query, list of book dicts, error message or None,
+        whether the request's deadline cut the catalog short)
+    """
+    pool = await get_browser_pool()
+    async with pool.context("hachette", "batch", **session_store.context_options("hachette")) as context:
+        catalogs_url = await open_hachette_session(context, url, customer_number)
+        if not catalogs_url:
+            for catalog_query in catalog_queries:
+                yield catalog_query, [], "Hachette login failed", False
+            return
+
+        semaphore = asyncio.Semaphore(HACHETTE_CATALOG_CONCURRENCY)
+
+        async def scrape_one(catalog_query):
+            async with semaphore:
+                with deadline() as budget:
+                    try:
+                        books = await scrape_hachette_catalog_in_tab(context, catalogs_url, catalog_query)
+                        return catalog_query, books, None, budget.cut_short
+                    except Exception as e:
+                        print(f"Error scraping {catalog_query}: {e}")
+                        return catalog_query, [], str(e), budget.cut_short or expired()
+
+        tasks = [asyncio.create_task(scrape_one(catalog_query)) for catalog_query in catalog_queries]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # The client may stop reading a stream early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+def author_key(author: str) -> str:
+    """Compare author names ignoring case and spacing"""
+    return " ".join((author or "").split()).casefold()
+
+async def enrich_hachette_catalog(catalog_query: str, include_summary=False, fields=None):
+    """
+    Enrich a Hachette catalog with Edelweiss details and Fantastic Fiction
+    author bibliographies
+
+    The stages run as a streaming pipeline: every title extracted from the
+    catalog is looked up on Edelweiss right away (exact ISBN match, at most
+    ENRICH_EDELWEISS_CONCURRENCY at a time), and its author is searched on
+    Fantastic Fiction once per distinct author (at most
+    ENRICH_AUTHOR_CONCURRENCY at a time). Warm sessions, the summary cache
+    and the product index are used as for any other lookup.
+
+    The Hachette scrape holds a browser context until the catalog is done,
+    so the lookups are capped to what the pool leaves this request beside
+    it, and never wait on the Hachette context. A pool too small to run a
+    lookup next to it gets the whole catalog first, and the lookups start
+    once the Hachette context is released.
+
+    Args:
+        catalog_query (str): The catalog (e.g., "January 2026 HNZ")
+        include_summary (bool): Extract Edelweiss summaries
+        fields (set): Edelweiss fields to extract (None for all)
+
+    Yields:
+        Dict: One record per title, in the order the titles finish, with
+        the "hachette" entry, the "edelweiss" result and the
+        "fantastic_fiction" result for its author
+    """
+    pool = await get_browser_pool()
+    capacity = pool.capacity_for(current_priority.get())
+    # Streaming needs the Hachette context plus one Edelweiss and one author lookup
+    streaming = capacity >= 3
+    lookups = capacity - 1 if streaming else capacity
+    edelweiss_concurrency = max(1, min(ENRICH_EDELWEISS_CONCURRENCY, lookups - 1))
+    author_concurrency = max(1, min(ENRICH_AUTHOR_CONCURRENCY, lookups - edelweiss_concurrency))
+
+    done = object()
+    records = asyncio.Queue()
+    edelweiss_slots = asyncio.Semaphore(edelweiss_concurrency)
+    author_slots = asyncio.Semaphore(author_concurrency)
+    author_searches = {}
+    title_tasks = []
+
+    async def search_author(author):
+        async with author_slots:
+            try:
+                result = await search_fantastic_fiction(author)
+                return {"success": result.success, "message": result.message, "books": result.books,
+                        "incomplete": result.incomplete}
+            except Exception as e:
+                return {"success": False, "message": f"Search failed: {str(e)}", "books": []}
+
+    def author_search(author):
+        # One search per author, shared by all of their titles
+        key = author_key(author)
+        if key not in author_searches:
+            author_searches[key] = asyncio.create_task(search_author(author))
+        return author_searches[key]
+
+    async def enrich(book):
+        author = author_search(book["author"]) if book["author"] else None
+        async with edelweiss_slots:
+            try:
+                results = await scrape_isbns([book["isbn"]], include_summary=include_summary, fields=fields, exact=True)
+                edelweiss = results[book["isbn"]]
+            except Exception as e:
+                edelweiss = {"status": "error", "message": str(e), "books": []}
+        fantastic_fiction = await asyncio.shield(author) if author else None
+        await records.put({
+            "isbn": book["isbn"],
+            "title": book["title"],
+            "author": book["author"],
+            "hachette": book,
+            "edelweiss": edelweiss,
+            "fantastic_fiction": fantastic_fiction,
+        })
+
+    async def produce():
+        try:
+            if streaming:
+                async for book in stream_hachette_books(catalog_query=catalog_query):
+                    title_tasks.append(asyncio.create_task(enrich(book)))
+            else:
+                print(f"Browser pool too small to enrich {catalog_query} while scraping it, scraping the catalog first")
+                books = [book async for book in stream_hachette_books(catalog_query=catalog_query)]
+                title_tasks.extend(asyncio.create_task(enrich(book)) for book in books)
+            await asyncio.gather(*title_tasks)
+        finally:
+            await records.put(done)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            record = await records.get()
+            if record is done:
+                break
+            yield record
+        # Surface a failed catalog scrape
+        await producer
+    finally:
+        # The client may stop reading a stream early
+        tasks = [producer, *title_tasks, *author_searches.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def test_single_isbn(isbn: str, login_required: bool = True):
+    """
+    Test function to scrape a single ISBN with detailed output
+    
+    Args:
+        isbn: ISBN to test
+        login_required: Whether to login to Edelweiss
+    
+    Returns:
+        dict: Detailed results for the ISBN
+    """
+    print(f"\n{'='*60}")
+    print(f"TESTING SINGLE ISBN: {isbn}")
+    print(f"LOGIN REQUIRED: {login_required}")
+    print(f"{'='*60}")
+    
+    results = await scrape_isbns([isbn], login_required=login_required, include_summary=login_required)
+    
+    if isbn in results:
+        result = results[isbn]
+        print(f"\nSTATUS: {result['status']}")
+        print(f"MESSAGE: {result['message']}")
+        
+        if result['books']:
+            print(f"\nFOUND {len(result['books'])} BOOK(S):")
+            for i, book in enumerate(result['books'], 1):
+                print(f"\n--- BOOK {i} ---")
+                print(f"Title: {book.get('title', 'N/A')}")
+                print(f"Subtitle: {book.get('subtitle', 'N/A')}")
+                print(f"Author: {book.get('author', 'N/A')}")
+                print(f"ISBN: {book.get('isbn', 'N/A')}")
+                print(f"Cover: {book.get('cover', 'N/A')}")
+                print(f"Publication Info: {book.get('pubInfo', 'N/A')}")
+                print(f"Format/Price: {book.get('formatPrice', 'N/A')}")
+                print(f"Discount Code: {book.get('discountCode', 'N/A')}")
+                print(f"BISAC: {book.get('bisac', 'N/A')}")
+                print(f"Pages: {book.get('pages', 'N/A')}")
+                print(f"Dimensions: {book.get('dimensions', 'N/A')}")
+                print(f"Status: {book.get('status', 'N/A')}")
+                print(f"Sales Rights: {book.get('salesRights', 'N/A')}")
+                print(f"Honors: {book.get('honors', 'N/A')}")
+                print(f"Community: {book.get('community', 'N/A')}")
+                print(f"Summary: {book.get('summary', 'N/A')}")
+                if book.get('summary'):
+                    print(f"Summary Length: {len(book['summary'])} characters")
+        else:
+            print("\nNO BOOKS FOUND")
+    else:
+        print(f"\nERROR: No results found for ISBN {isbn}")
+    
+    print(f"\n{'='*60}")
+    return results
+
+def parse_include(include: str):
+    """Split an include= query parameter ("summary,...") into a set"""
+    return {part.strip() for part in include.split(",") if part.strip()}
+
+def parse_fields(fields: Optional[str]):
+    """
+    Parse a fields= query parameter ("title,isbn,formatPrice")
+
+    Returns:
+        set: Requested book keys, or None when the parameter is absent
+    """
+    if fields is None:
+        return None
+    requested = parse_include(fields)
+    unknown = requested - set(BOOK_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}. Expected: {', '.join(BOOK_FIELDS)}"
+        )
+    return requested
+
+async def localize_covers(results):
+    """
+    With COVER_CACHE_ENABLED, point the covers of every result at /covers/{hash}
+
+    Args:
+        results (dict): ISBN results as returned by scrape_isbns
+
+    Returns:
+        dict: The same results
+    """
+    if COVER_CACHE_ENABLED:
+        await cover_cache.localize([book for result in results.values() for book in result["books"]])
+    return results
+
+@app.post("/scrape")
+async def scrape_single(request: ISBNRequest, login: bool = True, include: str = "", fields: Optional[str] = None,
+                        exact: bool = False, deadline_ms: Optional[int] = None):
+    """
+    Summaries cost a title click per row; they are only extracted with
+    include=summary, or when fields= lists "summary". With fields= only
+    those keys are extracted and returned. With exact=true only the row
+    for the requested ISBN is extracted in full.
+
+    With deadline_ms the response is sent within that many milliseconds:
+    timeouts shrink to the time left, summaries and BISAC are skipped when
+    it runs low (those records carry "incomplete": true) and ISBNs not
+    reached come back as "deadline_exceeded".
+    """
+    results = await scrape_isbns([request.isbn], login_required=login,
+                                 include_summary="summary" in parse_include(include), fields=parse_fields(fields),
+                                 exact=exact)
+    return ORJSONResponse(await localize_covers(results))
+
+@app.post("/scrape-multiple")
+async def scrape_multiple(request: ISBNsRequest, login: bool = True, include: str = "", fields: Optional[str] = None,
+                          exact: bool = False, batch_size: int = EDELWEISS_SEARCH_BATCH_SIZE,
+                          deadline_ms: Optional[int] = None):
+    """
+    With batch_size > 1 the ISBNs share keyword searches, batch_size at a
+    time; each ISBN then gets only its own rows, as with exact=true.
+    deadline_ms works as for /scrape.
+    """
+    results = await scrape_isbns(request.isbns, login_required=login,
+                                 include_summary="summary" in parse_include(include), fields=parse_fields(fields),
+                                 exact=exact, batch_size=batch_size)
+    return ORJSONResponse(await localize_covers(results))
+
+@app.get("/metrics")
+async def get_metrics():
+    """Per-field extraction cost, the time saved by fields= projection and product index use"""
+    return {
+        "edelweiss_fields": field_metrics.stats(),
+        "product_index": product_index.stats(),
+        "covers": cover_cache.stats(),
+        "book_index": book_index.stats(),
+        "postgres_sink": postgres_sink.stats(),
+        "scheduler": scheduler.stats(),
+    }
+
+@app.get("/edelweiss/summary/{isbn}")
+async def get_edelweiss_summary(isbn: str, deadline_ms: Optional[int] = None):
+    """
+    Summary of one title, served from the summary cache when possible.
+    Answers 504 if deadline_ms passes before the summary is found.
+    """
+    if normalize_isbn(isbn) is None:
+        raise HTTPException(status_code=400, detail=f"'{isbn.strip()}' is not a valid ISBN-10 or ISBN-13")
+    summary, cached, failure = await fetch_summary(isbn)
+    if failure and failure["status"] == "no_data_found":
+        raise HTTPException(status_code=404, detail=failure["message"])
+    if failure and expired():
+        raise HTTPException(status_code=504, detail=f"Deadline reached before the summary of ISBN {isbn.strip()} was found")
+    if failure:
+        raise HTTPException(status_code=502, detail=failure["message"])
+    if not summary and expired():
+        raise HTTPException(status_code=504, detail=f"Deadline reached before the summary of ISBN {isbn.strip()} was found")
+    if not summary:
+        raise HTTPException(status_code=404, detail=f"No summary found on Edelweiss for ISBN {isbn.strip()}")
+    return {"isbn": isbn.strip(), "summary": summary, "cached": cached}
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: the browser pool is running, the startup warm-up finished and
+    every site has a valid session. Answers 503 otherwise so load balancers
+    keep traffic away until the first requests can be served warm.
+    """
+    pool = current_browser_pool()
+    pool_stats = pool.stats() if pool else None
+    sessions = session_store.status()
+    checks = {
+        "browser_pool": bool(pool_stats and pool_stats["browsers"]),
+        "warm_up": warm_up_state["done"] or not WARM_UP_ON_STARTUP,
+        "sessions": not WARM_UP_ON_STARTUP or all(session_store.get(site) for site in WARM_SESSIONS),
+    }
+    body = {
+        "ready": all(checks.values()),
+        "checks": checks,
+        "browser_pool": pool_stats,
+        "queue_depth": pool_stats["waiting"] if pool_stats else 0,
+        "sessions": sessions,
+        "warm_up_errors": warm_up_state["errors"],
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/books/search")
+async def search_books(q: str, limit: int = 20, source: Optional[str] = None):
+    """
+    Search every record scraped so far, without opening a browser
+
+    Args:
+        q (str): Words to match in title, author, summary or BISAC (the last
+                 word as a prefix), or an ISBN
+        limit (int): Maximum number of results (1-100)
+        source (str): Only return records from edelweiss, hachette or fantastic_fiction
+
+    Returns:
+        dict: Best matches first
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    if source is not None and source not in SOURCES:
+        raise HTTPException(status_code=400, detail=f"source must be one of: {', '.join(SOURCES)}")
+    # In a thread, as it may wait for an index write to commit
+    results = await asyncio.to_thread(book_index.search, q, limit=max(1, min(limit, 100)), source=source)
+    return ORJSONResponse({"query": q, "total": len(results), "results": results})
+
+@app.post("/books/reindex")
+async def reindex_books():
+    """Rebuild the full-text index from the stored records"""
+    return {"records": await asyncio.to_thread(book_index.rebuild)}
+
+@app.get("/selectors/stats")
+async def selector_stats():
+    """Hit counts and rates of every fallback selector, per site and slot"""
+    return selector_registry.stats()
+
+# Hachette HNZ API Endpoints
+@app.get("/", response_model=ScraperResponse)
+async def root():
+    """Root endpoint with basic info"""
+    return ScraperResponse(
+        success=True,
+        message="Multi-Scraper API is running. Use /hachette/scrape?query=January%202026%20HNZ for Hachette (supports HNZ, HCB catalogs), /scrape for Edelweiss, or /fantastic-fiction/search?author_name=David%20Baldacci for Fantastic Fiction.",
+        books=[],
+        total_books=0
+    )
+
+def validate_catalog_query(query: str):
+    """
+    Check a catalog query is 'Month Year CatalogType'
+
+    Returns:
+        str: The catalog type (e.g., "HNZ")
+
+    Raises:
+        HTTPException: 400 if the query is malformed
+    """
+    # Validate query format (should contain month, year, and catalog type)
+    query_parts = query.split()
+    if len(query_parts) < 3:
+        raise HTTPException(
+            status_code=400, 
+            detail="Query must be in format: 'Month Year CatalogType' (e.g., 'January 2026 HNZ', 'December 2025 HCB')"
+        )
+    
+    # Extract catalog type for validation
+    catalog_type = query_parts[-1]
+    if catalog_type not in ['HNZ', 'HCB']:  # Add more catalog types as needed
+        raise HTTPException(
+            status_code=400, 
+            detail="Catalog type must be one of: HNZ, HCB"
+        )
+    return catalog_type
+
+def record_snapshot(query: str, books_data):
+    """
+    Store a catalog scrape as a new snapshot (see catalog_snapshots)
+
+    Empty results are not stored, since a failed scrape would otherwise
+    show up as every title being removed.
+
+    Returns:
+        int: The snapshot id, or None if nothing was stored
+    """
+    if not books_data:
+        return None
+    return catalog_snapshots.save(query, books_data)
+
+def snapshot_time(taken_at):
+    return datetime.fromtimestamp(taken_at, timezone.utc).isoformat()
+
+def find_baseline_snapshot(query: str, since: Optional[str], before_id: int):
+    """
+    Resolve the since parameter of /hachette/changes to a snapshot
+
+    Args:
+        query (str): The catalog query
+        since (str): A snapshot id, an ISO 8601 timestamp (the latest snapshot
+                     taken at or before it), or None for the previous snapshot
+        before_id (int): The snapshot being compared
+
+    Returns:
+        dict: Snapshot metadata, or None if the catalog has no earlier snapshot
+
+    Raises:
+        HTTPException: 400 if since is malformed, 404 if the snapshot id is unknown
+    """
+    if since is None:
+        return catalog_snapshots.latest(query, before_id=before_id)
+    if since.isdigit():
+        snapshot = catalog_snapshots.get(int(since))
+        if not snapshot or snapshot["catalog"] != query:
+            raise HTTPException(status_code=404, detail=f"No snapshot {since} of {query}")
+        return snapshot
+    try:
+        taken_before = datetime.fromisoformat(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be a snapshot id or an ISO 8601 timestamp")
+    if taken_before.tzinfo is None:
+        taken_before = taken_before.replace(tzinfo=timezone.utc)
+    return catalog_snapshots.latest(query, before_id=before_id, taken_before=taken_before.timestamp())
+
+@app.get("/hachette/scrape", response_model=ScraperResponse)
+async def scrape_hachette_books(query: str = "January 2026 HNZ", deadline_ms: Optional[int] = None):
+    """
+    Scrape books from Hachette catalog
+    
+    Args:
+        query (str): The catalog query (e.g., "January 2026 HNZ", "December 2025 HCB", "February 2026 HNZ")
+        deadline_ms (int): Return what was scraped within this many milliseconds,
+                           flagged "incomplete" if that is not the whole catalog
+    
+    Returns:
+        ScraperResponse: JSON response with book data
+    """
+    try:
+        catalog_type = validate_catalog_query(query)
+        
+        # Hachette login page and hardcoded customer number
+        url = HACHETTE_LOGIN_URL
+        customer_number = "46628"
+        
+        # Run the scraper with the provided query
+        books_data = await navigate_and_login_hachette(url, customer_number, query)
+        incomplete = cut_short()
+        # A partial catalog would show up in /hachette/changes as removed titles
+        if not incomplete:
+            record_snapshot(query, books_data)
+        if COVER_CACHE_ENABLED:
+            await cover_cache.localize(books_data)
+        
+        return ORJSONResponse(scraper_payload(
+            True, f"Successfully scraped {len(books_data)} books from Hachette {catalog_type} catalog", books_data,
+            incomplete
+        ))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Scraping failed: {str(e)}"
+        )
+
+@app.post("/hachette/scrape-batch")
+async def scrape_hachette_batch(request: HachetteBatchRequest, stream: bool = False, deadline_ms: Optional[int] = None):
+    """
+    Scrape several Hachette catalogs with one login
+
+    Returns one ScraperResponse per catalog, keyed by catalog. With
+    stream=true the responses are streamed as NDJSON, one line per catalog
+    (with a "catalog" key) in the order they finish. With deadline_ms,
+    catalogs cut short by the deadline are flagged "incomplete".
+    """
+    catalogs = list(dict.fromkeys(query.strip() for query in request.catalogs))
+    if not catalogs:
+        raise HTTPException(status_code=400, detail="catalogs must not be empty")
+    for query in catalogs:
+        validate_catalog_query(query)
+
+    async def catalog_response(query, books_data, error, incomplete):
+        if error is None:
+            if not incomplete:
+                record_snapshot(query, books_data)
+            if COVER_CACHE_ENABLED:
+                await cover_cache.localize(books_data)
+        return scraper_payload(
+            error is None, error or f"Successfully scraped {len(books_data)} books from Hachette {query} catalog", books_data,
+            incomplete
+        )
+
+    if stream:
+        async def ndjson():
+            async for query, books_data, error, incomplete in scrape_hachette_catalogs(catalogs):
+                response = await catalog_response(query, books_data, error, incomplete)
+                yield orjson.dumps({"catalog": query, **response}) + b"\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    results = {}
+    async for query, books_data, error, incomplete in scrape_hachette_catalogs(catalogs):
+        results[query] = await catalog_response(query, books_data, error, incomplete)
+    return ORJSONResponse({
+        "success": all(r["success"] for r in results.values()),
+        "catalogs": {query: results[query] for query in catalogs}
+    })
+
+@app.get("/hachette/changes")
+async def hachette_changes(query: str, since: Optional[str] = None, refresh: bool = True, deadline_ms: Optional[int] = None):
+    """
+    Titles of a Hachette catalog added, removed, or changed in price, format
+    or publication date since an earlier scrape
+
+    Args:
+        query (str): The catalog query (e.g., "January 2026 HNZ")
+        since (str): Snapshot id or ISO 8601 timestamp to compare against
+                     (default: the previous snapshot)
+        refresh (bool): Scrape the catalog now (default) or compare the
+                        latest stored snapshot
+        deadline_ms (int): Give up on the refresh after this many milliseconds
+
+    Returns:
+        dict: The compared snapshot ids, and the added, removed and changed titles
+    """
+    validate_catalog_query(query)
+
+    if refresh:
+        books_data = await navigate_and_login_hachette(HACHETTE_LOGIN_URL, "46628", query)
+        if cut_short():
+            # Titles not reached would be reported as removed
+            raise HTTPException(
+                status_code=504,
+                detail=f"Deadline reached before {query} was fully scraped; use refresh=false to compare stored snapshots"
+            )
+        snapshot_id = record_snapshot(query, books_data)
+        if snapshot_id is None:
+            raise HTTPException(status_code=502, detail=f"No titles scraped from {query}")
+        snapshot = catalog_snapshots.get(snapshot_id)
+    else:
+        snapshot = catalog_snapshots.latest(query)
+        if not snapshot:
+            raise HTTPException(status_code=404, detail=f"No snapshot of {query}")
+
+    baseline = find_baseline_snapshot(query, since, snapshot["id"])
+    changes = catalog_snapshots.diff(baseline["id"] if baseline else None, snapshot["id"])
+    return {
+        "success": True,
+        "catalog": query,
+        "snapshot": {"id": snapshot["id"], "taken_at": snapshot_time(snapshot["taken_at"])},
+        "since": {"id": baseline["id"], "taken_at": snapshot_time(baseline["taken_at"])} if baseline else None,
+        **changes,
+    }
+
+EXPORT_FIELDS = ['title', 'author', 'isbn', 'price', 'format', 'publication_date', 'cover_url']
+
+def csv_row(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+@app.get("/hachette/export")
+async def export_hachette_catalog(query: str = "January 2026 HNZ", format: str = "csv", deadline_ms: Optional[int] = None):
+    """
+    Stream a Hachette catalog as CSV or NDJSON
+
+    Rows are written as each title is extracted, so the first row arrives
+    as soon as the first title is parsed and the catalog is never held in
+    memory.
+
+    Args:
+        query (str): The catalog query (e.g., "January 2026 HNZ")
+        format (str): "csv" (with a header row) or "ndjson"
+        deadline_ms (int): End the stream after this many milliseconds
+
+    Returns:
+        StreamingResponse: One row per title
+    """
+    validate_catalog_query(query)
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+    books = stream_hachette_books(HACHETTE_LOGIN_URL, "46628", query)
+    # Wait for the first title so a failed login or missing catalog is still an error response
+    try:
+        first = await anext(books, None)
+    except Exception as e:
+        await books.aclose()
+        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+    if first is None:
+        raise HTTPException(status_code=502, detail=f"No titles scraped from {query}")
+
+    def encode(book):
+        if format == "csv":
+            return csv_row([book[field] for field in EXPORT_FIELDS])
+        return orjson.dumps(book) + b"\n"
+
+    async def rows():
+        try:
+            if format == "csv":
+                yield csv_row(EXPORT_FIELDS)
+            yield encode(first)
+            async for book in books:
+                yield encode(book)
+        except Exception as e:
+            # Headers are already sent, so a failure can only end the stream early
+            print(f"Export of {query} stopped: {e}")
+        finally:
+            await books.aclose()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = re.sub(r"\W+", "_", query).lower() + "." + format
+    return StreamingResponse(rows(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/hachette/enrich")
+async def enrich_hachette(query: str = "January 2026 HNZ", include: str = "", fields: Optional[str] = None,
+                          deadline_ms: Optional[int] = None):
+    """
+    Stream a Hachette catalog enriched with Edelweiss details and Fantastic
+    Fiction author searches, as NDJSON
+
+    Replaces one /scrape call per ISBN and one /fantastic-fiction/search call
+    per author: the lookups run concurrently on the server and each record is
+    written as soon as its title is complete. include, fields and
+    deadline_ms apply to the Edelweiss lookups as for /scrape; the stream
+    ends when the deadline passes.
+    """
+    validate_catalog_query(query)
+    records = enrich_hachette_catalog(query, include_summary="summary" in parse_include(include),
+                                      fields=parse_fields(fields))
+    # Wait for the first record so a failed login or missing catalog is still an error response
+    try:
+        first = await anext(records, None)
+    except Exception as e:
+        await records.aclose()
+        raise HTTPException(status_code=500, detail=f"Enrichment failed: {str(e)}")
+    if first is None:
+        raise HTTPException(status_code=502, detail=f"No titles scraped from {query}")
+
+    async def ndjson():
+        try:
+            yield orjson.dumps(first) + b"\n"
+            async for record in records:
+                yield orjson.dumps(record) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so a failure can only end the stream early
+            print(f"Enrichment of {query} stopped: {e}")
+        finally:
+            await records.aclose()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+async def stored_cover(content_hash: str, thumbnail: bool = False):
+    cover = await cover_cache.get(content_hash, thumbnail=thumbnail) if re.fullmatch(r"[0-9a-f]{64}", content_hash) else None
+    if not cover:
+        raise HTTPException(status_code=404, detail="Cover not found")
+    path, media_type = cover
+    # Content-addressed, so the file behind a URL never changes
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+@app.get("/covers/{content_hash}")
+async def get_cover(content_hash: str):
+    """Serve a cover stored by the cover cache (COVER_CACHE_ENABLED=1)"""
+    return await stored_cover(content_hash)
+
+@app.get("/covers/{content_hash}/thumbnail")
+async def get_cover_thumbnail(content_hash: str):
+    """Serve the JPEG thumbnail of a stored cover"""
+    return await stored_cover(content_hash, thumbnail=True)
+
+# Fantastic Fiction API Endpoints
+@app.post("/fantastic-fiction/search", response_model=AuthorSearchResponse)
+async def search_fantastic_fiction_author(request: AuthorSearchRequest, deadline_ms: Optional[int] = None):
+    """
+    Search for an author on Fantastic Fiction website
+    
+    Args:
+        request (AuthorSearchRequest): Request containing author name and search type
+        deadline_ms (int): Return the results found within this many milliseconds
+    
+    Returns:
+        AuthorSearchResponse: JSON response with found books
+    """
+    try:
         result = await search_fantastic_fiction(request.author_name, request.search_type)
         return result
         
@@ -1023,13 +2398,15 @@ async def search_fantastic_fiction_author(request: AuthorSearchRequest):
         )
 
 @app.get("/fantastic-fiction/search", response_model=AuthorSearchResponse)
-async def search_fantastic_fiction_author_get(author_name: str, search_type: str = "author"):
+async def search_fantastic_fiction_author_get(author_name: str, search_type: str = "author",
+                                              deadline_ms: Optional[int] = None):
     """
     Search for an author on Fantastic Fiction website (GET endpoint)
     
     Args:
         author_name (str): Name of the author to search for
         search_type (str): Type of search - "author", "book", or "series"
+        deadline_ms (int): Return the results found within this many milliseconds
     
     Returns:
         AuthorSearchResponse: JSON response with found books
@@ -1061,7 +2438,10 @@ async def main():
     if len(sys.argv) > 2:
         login_required = sys.argv[2].lower() in ['true', '1', 'yes', 'y']
     
-    await test_single_isbn(isbn, login_required)
+    try:
+        await test_single_isbn(isbn, login_required)
+    finally:
+        await close_browser_pool()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
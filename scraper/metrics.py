@@ -0,0 +1,62 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any
+
+class FieldMetrics:
+    """
+    Cost of extracting each book field, and the time saved by skipping it.
+
+    Every timed extraction updates the field's average cost. When a caller
+    projects a field away (fields=...), the field's current average is
+    counted as time saved, so the savings are estimates built from real
+    measurements of the same field.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # field -> {"extracted": int, "seconds": float, "skipped": int, "saved_seconds": float}
+        self._fields: Dict[str, Dict[str, float]] = {}
+
+    def _field(self, field: str) -> Dict[str, float]:
+        return self._fields.setdefault(field, {"extracted": 0, "seconds": 0.0, "skipped": 0, "saved_seconds": 0.0})
+
+    @contextmanager
+    def timer(self, field: str):
+        """Time one extraction of a field"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self._field(field)
+                entry["extracted"] += 1
+                entry["seconds"] += elapsed
+
+    def record_skipped(self, field: str):
+        """Count a field that was not extracted because it was not requested"""
+        with self._lock:
+            entry = self._field(field)
+            entry["skipped"] += 1
+            if entry["extracted"]:
+                entry["saved_seconds"] += entry["seconds"] / entry["extracted"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Average cost, skip counts and estimated time saved per field"""
+        with self._lock:
+            fields = {
+                field: {
+                    "extracted": int(entry["extracted"]),
+                    "avg_ms": round(entry["seconds"] / entry["extracted"] * 1000, 1) if entry["extracted"] else None,
+                    "skipped": int(entry["skipped"]),
+                    "saved_ms": round(entry["saved_seconds"] * 1000),
+                }
+                for field, entry in sorted(self._fields.items())
+            }
+        return {
+            "fields": fields,
+            "total_saved_ms": sum(f["saved_ms"] for f in fields.values()),
+        }
+
+field_metrics = FieldMetrics()
@@ -0,0 +1,116 @@
+import os
+import logging
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def read_rss_bytes(pid: int) -> int:
+    """
+    Read the resident set size of a single process from /proc
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        int: RSS in bytes, or 0 if the process is gone or /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+def _process_table(with_cmdline: bool = False):
+    """
+    One pass over /proc
+
+    Args:
+        with_cmdline (bool): Also read each process's command line
+
+    Returns:
+        tuple: ({pid: parent pid}, {pid: command line}); the second is empty
+        unless with_cmdline is set
+    """
+    parents, cmdlines = {}, {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return parents, cmdlines
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            # The command name may contain spaces, so split after the closing paren
+            fields = stat[stat.rindex(")") + 2:].split()
+            parents[int(entry)] = int(fields[1])
+            if with_cmdline:
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    cmdlines[int(entry)] = f.read().replace(b"\0", b" ").decode(errors="ignore")
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents, cmdlines
+
+def _descendants(roots: List[int], parents: Dict[int, int]) -> Set[int]:
+    """All descendants of the given roots according to a parent map"""
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+
+    found = set()
+    stack = list(roots)
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+    return found
+
+def descendant_pids(pid: int) -> List[int]:
+    """
+    List all descendants of a process (children, grandchildren, ...)
+
+    Args:
+        pid (int): Root process id
+
+    Returns:
+        List[int]: Descendant pids, not including the root itself
+    """
+    parents, _ = _process_table()
+    return sorted(_descendants([pid], parents))
+
+def tree_rss_bytes(pid: Optional[int] = None) -> int:
+    """
+    Sum the RSS of a process and all of its descendants.
+
+    For the scraper this covers the Playwright driver and every Chromium
+    process it launched, which is where almost all of the memory lives.
+
+    Args:
+        pid (int): Root process id, defaults to the current process
+
+    Returns:
+        int: Combined RSS in bytes
+    """
+    pid = pid or os.getpid()
+    return sum(read_rss_bytes(p) for p in [pid] + descendant_pids(pid))
+
+def marker_tree_rss_bytes(marker: str) -> int:
+    """
+    Sum the RSS of every process whose command line contains the marker,
+    plus all of their descendants, from a single pass over /proc. Each
+    process is counted once even if it sits under several matches.
+
+    Args:
+        marker (str): Substring to look for (e.g. a unique launch switch)
+
+    Returns:
+        int: Combined RSS in bytes
+    """
+    parents, cmdlines = _process_table(with_cmdline=True)
+    roots = [pid for pid, cmdline in cmdlines.items() if marker in cmdline]
+    pids = set(roots) | _descendants(roots, parents)
+    return sum(read_rss_bytes(p) for p in pids)
@@ -0,0 +1,103 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_INDEX_PATH = os.environ.get(
+    "PRODUCT_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "product_index.sqlite3"),
+)
+
+def index_key(isbn: str) -> str:
+    """Index ISBNs by their digits (and check character) only"""
+    return re.sub(r"[^0-9X]", "", (isbn or "").upper())
+
+class ProductIndex:
+    """
+    Remembers the Edelweiss title URL (e.g. https://www.edelweiss.plus/#sku=...)
+    of every ISBN whose title was opened, so repeat lookups can navigate
+    straight to the title instead of running a keyword search.
+
+    Stored in SQLite at PRODUCT_INDEX_PATH so it survives restarts. URLs
+    that no longer show the title are dropped with invalidate().
+    """
+
+    def __init__(self, path: Optional[str] = PRODUCT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                " isbn TEXT PRIMARY KEY, url TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, isbn: str) -> Optional[str]:
+        """
+        Get the stored title URL of an ISBN
+
+        Args:
+            isbn (str): ISBN in any form
+
+        Returns:
+            str: The URL, or None if the ISBN was never seen
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT url FROM products WHERE isbn = ?", (index_key(isbn),)).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, isbn: str, url: str):
+        """Store (or replace) the title URL of an ISBN"""
+        key = index_key(isbn)
+        if not key or not url:
+            return
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT INTO products (isbn, url, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(isbn) DO UPDATE SET url = excluded.url, updated_at = excluded.updated_at",
+                (key, url, time.time()),
+            )
+            db.commit()
+
+    def invalidate(self, isbn: str):
+        """Drop a URL that no longer shows the title"""
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM products WHERE isbn = ?", (index_key(isbn),))
+            db.commit()
+            self.stale += 1
+        logger.info(f"Dropped stale product URL for ISBN {isbn}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and lookup counters"""
+        with self._lock:
+            size = self._connect().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        return {"entries": size, "hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+product_index = ProductIndex()
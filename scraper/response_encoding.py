@@ -0,0 +1,159 @@
+import os
+import gzip
+import zlib
+from typing import Any, Optional
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:  # Only gzip is offered without brotli
+    brotli = None
+
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+# Brotli 4-5 compresses better than gzip 6 at a similar speed; 11 is far slower
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Already compressed, or not worth compressing
+UNCOMPRESSED_MEDIA_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson.
+
+    Endpoints with large payloads return this directly with plain dicts,
+    which skips both pydantic validation of the response model and
+    FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding (str): e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        str: "br" or "gzip" (the client's preference, brotli on a tie), or
+        None to send the response uncompressed
+    """
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_q = None, 0.0
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        candidates = supported if name == "*" else (name,)
+        for candidate in candidates:
+            if candidate in supported and q > 0 and (
+                q > best_q or (q == best_q and supported.index(candidate) < supported.index(best))
+            ):
+                best, best_q = candidate, q
+    return best
+
+class Compressor:
+    """Incremental gzip or brotli compressor"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so streamed rows reach the client right away"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush(zlib.Z_FINISH)
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body"""
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    """
+    gzip/brotli response compression negotiated from Accept-Encoding.
+
+    Complete bodies below COMPRESSION_MIN_SIZE bytes, images and responses
+    that already carry a Content-Encoding are sent as they are. Streaming
+    responses (NDJSON, CSV export) are compressed chunk by chunk with a
+    flush after each, so rows are not held back by the compressor.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                media_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or media_type.startswith(UNCOMPRESSED_MEDIA_PREFIXES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    passthrough = True
+                    return
+                del headers["Content-Length"]
+                compressor = Compressor(encoding)
+                await send(start_message)
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,187 @@
+"""
+Priority scheduling of browser contexts.
+
+Every pool.context() call is a scheduling point: when contexts are scarce
+the next free one goes to the waiter that comes first by
+
+    1. priority class: interactive, then bulk, then background
+    2. tenant: within a class, the tenant holding the fewest contexts
+    3. arrival order
+
+so a single /scrape is served before the rest of a running
+/scrape-multiple batch, and two tenants running bulk batches alternate
+instead of one draining the other. SCHEDULER_INTERACTIVE_RESERVED contexts
+are kept free for interactive work, so an urgent lookup does not have to
+wait for a bulk lease to finish.
+
+The priority and tenant of the current request are carried in context
+variables, set per HTTP request by SchedulingMiddleware (from the route,
+or the X-Priority and X-Tenant headers) or with scheduling() for work
+started outside a request, and inherited by every task the request starts.
+
+Configuration (environment):
+    SCHEDULER_INTERACTIVE_RESERVED  contexts only interactive work may take (default 1)
+"""
+import os
+import math
+import time
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+from starlette.datastructures import Headers
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+PRIORITY_CLASSES = (INTERACTIVE, BULK, BACKGROUND)
+
+SCHEDULER_INTERACTIVE_RESERVED = int(os.environ.get("SCHEDULER_INTERACTIVE_RESERVED", "1"))
+# Recent queue waits kept per class for the percentiles
+SCHEDULER_WAIT_SAMPLES = 1000
+
+current_priority: ContextVar[str] = ContextVar("scrape_priority", default=INTERACTIVE)
+current_tenant: ContextVar[str] = ContextVar("scrape_tenant", default="default")
+
+@contextmanager
+def scheduling(priority: str, tenant: Optional[str] = None):
+    """Run the enclosed work (and the tasks it starts) at a priority and as a tenant"""
+    priority_token = current_priority.set(priority)
+    tenant_token = current_tenant.set(tenant) if tenant else None
+    try:
+        yield
+    finally:
+        current_priority.reset(priority_token)
+        if tenant_token:
+            current_tenant.reset(tenant_token)
+
+class Ticket:
+    """A waiter for a browser context"""
+
+    def __init__(self, priority: str, tenant: str, seq: int):
+        self.priority = priority
+        self.rank = PRIORITY_CLASSES.index(priority)
+        self.tenant = tenant
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+
+class PriorityScheduler:
+    """Orders waiters for browser contexts and records how long they wait"""
+
+    def __init__(self, interactive_reserved: int = SCHEDULER_INTERACTIVE_RESERVED):
+        self.interactive_reserved = interactive_reserved
+        self._waiters = []
+        self._seq = itertools.count()
+        self._active: Dict[str, int] = {}
+        self._waits = {priority: deque(maxlen=SCHEDULER_WAIT_SAMPLES) for priority in PRIORITY_CLASSES}
+        self._granted = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._abandoned = dict.fromkeys(PRIORITY_CLASSES, 0)
+
+    def enter(self) -> Ticket:
+        """Queue the current task at the priority and tenant of its context"""
+        priority = current_priority.get()
+        ticket = Ticket(priority if priority in PRIORITY_CLASSES else INTERACTIVE, current_tenant.get(), next(self._seq))
+        self._waiters.append(ticket)
+        return ticket
+
+    def _order(self, ticket: Ticket):
+        return ticket.rank, self._active.get(ticket.tenant, 0), ticket.seq
+
+    def may_take(self, ticket: Ticket, free: int, capacity: int) -> bool:
+        """
+        True if the ticket is first in line and a context is free for its class
+
+        Args:
+            ticket (Ticket): The waiter asking
+            free (int): Contexts free right now
+            capacity (int): Contexts the pool can hold
+        """
+        if free <= 0 or min(self._waiters, key=self._order) is not ticket:
+            return False
+        if ticket.priority == INTERACTIVE:
+            return True
+        # Never reserve the whole pool
+        return free > min(self.interactive_reserved, capacity - 1)
+
+    def capacity_for(self, priority: str, capacity: int) -> int:
+        """
+        Contexts work of a priority class can hold at once in a pool of
+        `capacity`, with nothing else running (see may_take)
+        """
+        if priority == INTERACTIVE or capacity <= 0:
+            return max(0, capacity)
+        return capacity - min(self.interactive_reserved, capacity - 1)
+
+    def granted(self, ticket: Ticket):
+        """The ticket got a context"""
+        self._waiters.remove(ticket)
+        self._waits[ticket.priority].append(time.perf_counter() - ticket.enqueued_at)
+        self._granted[ticket.priority] += 1
+        self._active[ticket.tenant] = self._active.get(ticket.tenant, 0) + 1
+
+    def abandoned(self, ticket: Ticket):
+        """The ticket stopped waiting (timed out or cancelled)"""
+        self._waiters.remove(ticket)
+        self._abandoned[ticket.priority] += 1
+
+    def released(self, tenant: str):
+        """A context granted to the tenant was released"""
+        remaining = self._active.get(tenant, 0) - 1
+        if remaining > 0:
+            self._active[tenant] = remaining
+        else:
+            self._active.pop(tenant, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Waiting tickets and queue wait times per class, and contexts held per tenant"""
+        classes = {}
+        for priority in PRIORITY_CLASSES:
+            waits = sorted(wait * 1000 for wait in self._waits[priority])
+            classes[priority] = {
+                "waiting": sum(1 for ticket in self._waiters if ticket.priority == priority),
+                "granted": self._granted[priority],
+                "abandoned": self._abandoned[priority],
+                "avg_wait_ms": round(sum(waits) / len(waits), 1) if waits else None,
+                "p95_wait_ms": round(waits[max(0, math.ceil(0.95 * len(waits)) - 1)], 1) if waits else None,
+                "max_wait_ms": round(waits[-1], 1) if waits else None,
+            }
+        return {
+            "classes": classes,
+            "active_by_tenant": dict(self._active),
+            "interactive_reserved": self.interactive_reserved,
+        }
+
+scheduler = PriorityScheduler()
+
+class SchedulingMiddleware:
+    """
+    Sets the priority and tenant of every HTTP request.
+
+    The priority comes from the X-Priority header if it names a class,
+    otherwise from the longest matching path prefix in route_priorities,
+    otherwise default_priority. The tenant comes from the X-Tenant header.
+    """
+
+    def __init__(self, app, route_priorities: Dict[str, str], default_priority: str = INTERACTIVE):
+        self.app = app
+        self.route_priorities = sorted(route_priorities.items(), key=lambda item: -len(item[0]))
+        self.default_priority = default_priority
+
+    def priority_of(self, path: str, requested: Optional[str]) -> str:
+        if requested in PRIORITY_CLASSES:
+            return requested
+        for prefix, priority in self.route_priorities:
+            if path.startswith(prefix):
+                return priority
+        return self.default_priority
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        priority = self.priority_of(scope["path"], (headers.get("x-priority") or "").strip().lower())
+        with scheduling(priority, (headers.get("x-tenant") or "").strip() or None):
+            await self.app(scope, receive, send)
@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+from playwright.async_api import Page
+
+from deadline import can_afford, expired, skip_step
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_STATS_PATH = os.environ.get(
+    "SELECTOR_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "selector_stats.json"),
+)
+# Write learned hit counts to disk at most this often (seconds)
+SELECTOR_STATS_SAVE_INTERVAL = float(os.environ.get("SELECTOR_STATS_SAVE_INTERVAL", "30"))
+
+class SelectorRegistry:
+    """
+    Learns which selector of a fallback list actually matches.
+
+    Scrapers try lists of selectors for one "slot" (e.g. the Edelweiss
+    login email field) until one matches. The registry counts hits per
+    site, slot and selector and orders the list by hits, so the historical
+    winner is tried first and the usual case costs one lookup. Selectors
+    passed as `fallbacks` (catch-alls like 'input' or 'p') are never
+    promoted; they always run last, in their declared order.
+
+    Counts are kept in memory and written to SELECTOR_STATS_PATH as JSON.
+    """
+
+    def __init__(self, path: Optional[str] = SELECTOR_STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # site -> slot -> {"lookups": int, "misses": int, "hits": {selector: int}}
+        self._slots: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._dirty = False
+        self._saved_at = time.time()
+        self.load()
+
+    def _slot(self, site: str, slot: str) -> Dict[str, Any]:
+        return self._slots.setdefault(site, {}).setdefault(slot, {"lookups": 0, "misses": 0, "hits": {}})
+
+    def order(self, site: str, slot: str, selectors: Sequence[str], fallbacks: Sequence[str] = ()) -> List[str]:
+        """
+        Order selectors so the most frequent historical winner comes first
+
+        Args:
+            site (str): Site name, e.g. "edelweiss"
+            slot (str): What the selectors look for, e.g. "login_email"
+            selectors (list): Candidate selectors in their declared order
+            fallbacks (list): Catch-all selectors that always go last
+
+        Returns:
+            List[str]: Selectors to try, in order
+        """
+        with self._lock:
+            hits = self._slots.get(site, {}).get(slot, {}).get("hits", {})
+            # sorted() is stable, so ties keep the declared order
+            ordered = sorted(selectors, key=lambda s: -hits.get(s, 0))
+        return ordered + [s for s in fallbacks if s not in ordered]
+
+    def record_hit(self, site: str, slot: str, selector: str):
+        """Count a lookup that `selector` resolved"""
+        with self._lock:
+            entry = self._slot(site, slot)
+            entry["lookups"] += 1
+            entry["hits"][selector] = entry["hits"].get(selector, 0) + 1
+            self._dirty = True
+        self._maybe_save()
+
+    def record_miss(self, site: str, slot: str):
+        """Count a lookup that no selector resolved"""
+        with self._lock:
+            entry = self._slot(site, slot)
+            entry["lookups"] += 1
+            entry["misses"] += 1
+            self._dirty = True
+        self._maybe_save()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Lookups, misses and per-selector hit rates for every slot"""
+        with self._lock:
+            return {
+                site: {
+                    slot: {
+                        "lookups": entry["lookups"],
+                        "misses": entry["misses"],
+                        "selectors": [
+                            {
+                                "selector": selector,
+                                "hits": hits,
+                                "hit_rate": round(hits / entry["lookups"], 3) if entry["lookups"] else 0,
+                            }
+                            for selector, hits in sorted(entry["hits"].items(), key=lambda item: -item[1])
+                        ],
+                    }
+                    for slot, entry in slots.items()
+                }
+                for site, slots in self._slots.items()
+            }
+
+    def load(self):
+        """Read counts persisted by an earlier run, if any"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._slots = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable selector stats at {self.path}: {e}")
+
+    def save(self):
+        """Write the counts to disk if they changed since the last save"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._slots, indent=2, sort_keys=True)
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save selector stats to {self.path}: {e}")
+
+    def _maybe_save(self):
+        if time.time() - self._saved_at >= SELECTOR_STATS_SAVE_INTERVAL:
+            self.save()
+
+selector_registry = SelectorRegistry()
+
+def affordable_fallbacks(fallbacks: Sequence[str]) -> Sequence[str]:
+    """The catch-all selectors, or none when the deadline is too close for them"""
+    if fallbacks and not can_afford():
+        skip_step("fallback selectors")
+        return ()
+    return fallbacks
+
+async def query_all_first(root, site: str, slot: str, selectors: Sequence[str], fallbacks: Sequence[str] = ()) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return every element of the first selector that matches anything,
+    trying the learned winner first, and record which selector matched
+
+    Args:
+        root: Playwright page or element handle to search in
+        site (str): Site name
+        slot (str): Slot name
+        selectors (list): Candidate selectors
+        fallbacks (list): Catch-all selectors tried last, if the request's
+            deadline leaves time for them (see deadline.py)
+
+    Returns:
+        tuple: (list of element handles, matching selector or None)
+    """
+    fallbacks = affordable_fallbacks(fallbacks)
+    for i, selector in enumerate(selector_registry.order(site, slot, selectors, fallbacks)):
+        if i and expired():
+            skip_step("fallback selectors")
+            return [], None
+        try:
+            elements = await root.query_selector_all(selector)
+        except Exception:
+            continue
+        if elements:
+            selector_registry.record_hit(site, slot, selector)
+            return elements, selector
+    selector_registry.record_miss(site, slot)
+    return [], None
+
+# Resolves a fallback list inside the page. Understands Playwright's
+# `css:has-text("...")` on top of plain CSS, matching like Playwright does:
+# a case-insensitive substring of the text with whitespace collapsed.
+RESOLVE_FIRST_JS = """
+(root, [selectors, options]) => {
+    const hasText = /^(.*):has-text\\((["'])(.*)\\2\\)$/;
+    const normalize = text => (text || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const query = selector => {
+        const match = selector.match(hasText);
+        if (!match) return Array.from(root.querySelectorAll(selector));
+        const text = normalize(match[3]);
+        return Array.from(root.querySelectorAll(match[1] || '*'))
+            .filter(el => normalize(el.textContent).includes(text));
+    };
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    for (let index = 0; index < selectors.length; index++) {
+        let elements;
+        try {
+            elements = query(selectors[index]);
+        } catch (e) {
+            continue;  // invalid selector
+        }
+        for (const element of elements) {
+            if (options.visible && !isVisible(element)) continue;
+            const text = element.textContent || '';
+            if (options.longerThan !== null && text.trim().length <= options.longerThan) continue;
+            const lower = text.toLowerCase();
+            if (options.containsText && !text.includes(options.containsText)) continue;
+            if (options.excludeText.some(keyword => lower.includes(keyword))) continue;
+            return {element, index, text};
+        }
+    }
+    return {element: null, index: -1, text: null};
+}
+"""
+
+async def resolve_first(root, site: str, slot: str, selectors: Sequence[str], fallbacks: Sequence[str] = (),
+                        visible: bool = False, longer_than: Optional[int] = None, contains_text: Optional[str] = None,
+                        exclude_text: Sequence[str] = (), template_args: Optional[Dict[str, str]] = None) -> Tuple[Any, Optional[str], Optional[str]]:
+    """
+    Resolve a whole fallback list in a single in-page call
+
+    Selectors are tried in the learned order (see SelectorRegistry.order),
+    and within each selector every matching element is checked, all inside
+    the page. The first element passing every condition wins.
+
+    Args:
+        root: Playwright page or element handle to search in
+        site (str): Site name
+        slot (str): Slot name
+        selectors (list): Candidate selectors
+        fallbacks (list): Catch-all selectors tried last, if the request's
+            deadline leaves time for them
+        visible (bool): Skip elements that are not rendered
+        longer_than (int): Skip elements whose stripped text is not longer than this
+        contains_text (str): Skip elements whose text does not contain this
+        exclude_text (list): Skip elements whose text contains any of these (lowercase)
+        template_args (dict): If given, selectors are templates formatted with
+            these values; the registry learns the templates
+
+    Returns:
+        tuple: (element handle or None, matching selector or None, element text or None)
+    """
+    ordered = selector_registry.order(site, slot, selectors, affordable_fallbacks(fallbacks))
+    concrete = [s.format(**template_args) for s in ordered] if template_args else ordered
+    options = {
+        "visible": visible,
+        "longerThan": longer_than,
+        "containsText": contains_text,
+        "excludeText": [keyword.lower() for keyword in exclude_text],
+    }
+    if isinstance(root, Page):
+        handle = await root.evaluate_handle(f"args => ({RESOLVE_FIRST_JS})(document, args)", [concrete, options])
+    else:
+        handle = await root.evaluate_handle(f"(root, args) => ({RESOLVE_FIRST_JS})(root, args)", [concrete, options])
+
+    properties = await handle.get_properties()
+    index = await properties["index"].json_value()
+    if index < 0:
+        await handle.dispose()
+        selector_registry.record_miss(site, slot)
+        return None, None, None
+    selector_registry.record_hit(site, slot, ordered[index])
+    element = properties["element"].as_element()
+    text = await properties["text"].json_value()
+    # The element handle stays alive on its own; the result object is not needed
+    await handle.dispose()
+    return element, concrete[index], text
@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", "1800"))
+
+class SiteSession:
+    """Logged-in browser state for one site"""
+
+    def __init__(self, storage_state: Dict[str, Any], url: Optional[str] = None):
+        self.storage_state = storage_state
+        self.url = url
+        self.created_at = time.time()
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + SESSION_TTL_SECONDS
+
+    def is_valid(self) -> bool:
+        return time.time() < self.expires_at
+
+class SessionStore:
+    """
+    Keeps the storage state (cookies and local storage) of logged-in
+    sessions so new browser contexts can skip the login flow.
+
+    Sessions expire after SESSION_TTL_SECONDS and are invalidated as soon
+    as a scraper finds that a reused session is no longer logged in.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, SiteSession] = {}
+
+    def get(self, site: str) -> Optional[SiteSession]:
+        """
+        Get a valid session for a site
+
+        Args:
+            site (str): Site name, e.g. "edelweiss" or "hachette"
+
+        Returns:
+            SiteSession: The session, or None if missing or expired
+        """
+        session = self._sessions.get(site)
+        if session and session.is_valid():
+            return session
+        return None
+
+    def context_options(self, site: str) -> Dict[str, Any]:
+        """Keyword arguments for browser.new_context() that restore the session"""
+        session = self.get(site)
+        return {"storage_state": session.storage_state} if session else {}
+
+    def save(self, site: str, storage_state: Dict[str, Any], url: Optional[str] = None):
+        """
+        Store the state of a freshly logged-in context
+
+        Args:
+            site (str): Site name
+            storage_state (dict): Result of context.storage_state()
+            url (str): Page to return to when reusing the session
+        """
+        self._sessions[site] = SiteSession(storage_state, url)
+        logger.info(f"Saved {site} session, valid for {SESSION_TTL_SECONDS}s")
+
+    def invalidate(self, site: str):
+        """Drop a session that turned out to be logged out"""
+        if self._sessions.pop(site, None):
+            logger.info(f"Invalidated {site} session")
+
+    def expires_within(self, site: str, seconds: float) -> bool:
+        """True if the site has no valid session or it expires within `seconds`"""
+        session = self.get(site)
+        return session is None or session.expires_at - time.time() < seconds
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Validity and age of every stored session"""
+        now = time.time()
+        return {
+            site: {
+                "valid": session.is_valid(),
+                "age_s": round(now - session.created_at),
+                "expires_in_s": max(0, round(session.expires_at - now)),
+            }
+            for site, session in self._sessions.items()
+        }
+
+session_store = SessionStore()
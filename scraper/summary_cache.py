@@ -0,0 +1,92 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from isbn import normalize_isbn
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_TTL_SECONDS = int(os.environ.get("SUMMARY_CACHE_TTL_SECONDS", "86400"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+# Titles without a summary are looked up again sooner, in case one was added
+# or the lookup failed for a reason other than a missing summary
+SUMMARY_CACHE_NEGATIVE_TTL_SECONDS = int(os.environ.get("SUMMARY_CACHE_NEGATIVE_TTL_SECONDS", "900"))
+
+class SummaryCache:
+    """
+    Edelweiss summaries by ISBN.
+
+    Summaries cost a title click and several seconds of waiting, and they
+    rarely change, so every summary the scraper extracts is kept here for
+    SUMMARY_CACHE_TTL_SECONDS. Titles found without a summary are cached
+    too, for SUMMARY_CACHE_NEGATIVE_TTL_SECONDS. Entries are keyed by the
+    normalized ISBN-13, so any spelling of an ISBN finds the same entry.
+    The least recently used entries are evicted beyond
+    SUMMARY_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self, ttl_seconds: int = SUMMARY_CACHE_TTL_SECONDS, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+                 negative_ttl_seconds: int = SUMMARY_CACHE_NEGATIVE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(isbn: str) -> str:
+        return normalize_isbn(isbn) or isbn.strip()
+
+    def lookup(self, isbn: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a title, telling a cached "no summary" apart from a miss
+
+        Args:
+            isbn (str): ISBN of the title, in any spelling
+
+        Returns:
+            tuple: (whether the title is cached, its summary or None)
+        """
+        key = self._key(isbn)
+        entry = self._entries.get(key)
+        if entry:
+            stored_at, summary = entry
+            ttl = self.ttl_seconds if summary else self.negative_ttl_seconds
+            if time.time() - stored_at < ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, summary
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def get(self, isbn: str) -> Optional[str]:
+        """
+        Get a cached summary
+
+        Args:
+            isbn (str): ISBN of the title, in any spelling
+
+        Returns:
+            str: The summary, or None if missing, expired or cached as not found
+        """
+        return self.lookup(isbn)[1]
+
+    def put(self, isbn: str, summary: Optional[str]):
+        """Cache a summary; an empty one is cached as not found"""
+        if not isbn:
+            return
+        key = self._key(isbn)
+        self._entries[key] = (time.time(), summary or None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached summary"""
+        self._entries.clear()
+
+summary_cache = SummaryCache()
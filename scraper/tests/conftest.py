@@ -0,0 +1,22 @@
+"""
+Shared fixtures.
+"""
+import functools
+
+import pytest
+
+@functools.lru_cache(maxsize=None)
+def chromium_available():
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+@pytest.fixture
+def chromium():
+    """Skip tests that drive a real browser when Playwright Chromium is not installed"""
+    if not chromium_available():
+        pytest.skip("Playwright Chromium is not installed")
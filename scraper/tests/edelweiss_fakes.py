@@ -0,0 +1,92 @@
+"""
+Stand-ins for the Playwright objects the Edelweiss scraper drives, so its
+control flow can be tested without Chromium.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from main import ROW_ISBN_JS
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    async def text_content(self):
+        return self.text
+
+    async def get_attribute(self, name):
+        return self.text
+
+class FakeRow:
+    """A result row. Records which in-page scripts ran on it."""
+
+    def __init__(self, isbn, title=None):
+        self.isbn = isbn
+        self.title = title or f"Title {isbn}"
+        self.scripts = []
+
+    async def evaluate(self, script):
+        self.scripts.append(script)
+        return self.isbn if script == ROW_ISBN_JS else None
+
+    async def query_selector(self, selector):
+        return FakeElement(self.title) if "titleName" in selector else None
+
+    @property
+    def fully_extracted(self):
+        return any(script != ROW_ISBN_JS for script in self.scripts)
+
+class FakePage:
+    """A page whose row selector finds `rows`; goto fails for `broken_urls`"""
+
+    def __init__(self, context=None, rows=(), broken_urls=()):
+        self.context = context
+        self.rows = list(rows)
+        self.broken_urls = set(broken_urls)
+        self.url = "about:blank"
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        if url in self.broken_urls:
+            raise TimeoutError(f"Timeout loading {url}")
+        self.url = url
+
+    async def wait_for_selector(self, selector, **kwargs):
+        if "productRowBody" in selector and not self.rows:
+            raise TimeoutError(f"Timeout waiting for {selector}")
+
+    async def query_selector_all(self, selector):
+        return list(self.rows)
+
+    async def close(self):
+        self.closed = True
+        if self.context:
+            self.context.open_pages -= 1
+
+class FakeContext:
+    """A browser context counting how many of its pages are open at once"""
+
+    def __init__(self):
+        self.pages = []
+        self.open_pages = 0
+        self.peak_open_pages = 0
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        self.open_pages += 1
+        self.peak_open_pages = max(self.peak_open_pages, self.open_pages)
+        # Let other tabs run, as a real page load would
+        await asyncio.sleep(0)
+        return page
+
+class FakePool:
+    """Hands out fake contexts, recording the site and key of every lease"""
+
+    def __init__(self):
+        self.leases = []
+
+    @asynccontextmanager
+    async def context(self, site, key="session", **kwargs):
+        self.leases.append((site, key))
+        yield FakeContext()
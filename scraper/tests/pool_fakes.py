@@ -0,0 +1,44 @@
+"""
+Stand-ins for Playwright browsers and contexts, to run the browser pool
+without Chromium.
+"""
+from browser_pool import BrowserPool, PooledBrowser
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = []
+        self.closed = False
+        self.on_close = None
+
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        if self.on_close:
+            self.on_close(self)
+        self.closed = True
+        self.browser.contexts.remove(self)
+
+class FakeBrowser:
+    def __init__(self, fail_contexts=0):
+        self.contexts = []
+        self.fail_contexts = fail_contexts
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        if self.fail_contexts:
+            self.fail_contexts -= 1
+            raise RuntimeError("browser has been closed")
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+def make_pool(*browsers):
+    pool = BrowserPool(size=len(browsers))
+    for i, browser in enumerate(browsers):
+        pool.browsers.append(PooledBrowser(browser, f"--scraper-pool-id=fake{i}"))
+    return pool
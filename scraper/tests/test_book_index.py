@@ -0,0 +1,75 @@
+"""
+Full-text book index: incremental loading and search.
+"""
+import asyncio
+import time
+
+import book_index
+from book_index import BookIndex, index_records
+
+def test_search_matches_titles_authors_summaries_and_bisac():
+    index = BookIndex(":memory:")
+    index.add("edelweiss", [
+        {"isbn": "9781869712341", "title": "The River at Dusk", "author": "Mere Walker",
+         "summary": "Three generations return to the river.", "bisac": ["FICTION / Literary"]},
+        {"isbn": "9780306406157", "title": "Cold Harbour", "author": "Sam Ngata",
+         "summary": "A detective story.", "bisac": ["FICTION / Crime"]},
+    ])
+
+    assert [r["title"] for r in index.search("walker")] == ["The River at Dusk"]
+    assert [r["title"] for r in index.search("generations riv")] == ["The River at Dusk"]
+    assert [r["title"] for r in index.search("crime")] == ["Cold Harbour"]
+    assert [r["title"] for r in index.search("0-306-40615-2")] == ["Cold Harbour"]
+    # FTS5 syntax in the input is matched literally, not parsed
+    assert index.search('river" OR "harbour') == []
+
+def test_loading_is_incremental():
+    index = BookIndex(":memory:")
+    full = {"isbn": "9781869712341", "title": "The River at Dusk", "author": "Mere Walker", "summary": "A lament."}
+    assert index.add("edelweiss", [full]) == 1
+    assert index.add("edelweiss", [full]) == 0
+    # A scrape without summaries keeps the summary found earlier
+    assert index.add("edelweiss", [{**full, "summary": None, "pages": "352 pages"}]) == 1
+
+    [result] = index.search("lament")
+    assert result["record"]["pages"] == "352 pages"
+    assert index.rebuild() == 1
+    assert index.search("lament")[0]["isbn"] == "9781869712341"
+
+def test_indexing_from_the_event_loop_does_not_block_it(monkeypatch, tmp_path):
+    index = BookIndex(str(tmp_path / "book_index.sqlite3"))
+    monkeypatch.setattr(book_index, "book_index", index)
+    add = index.add
+
+    def slow_add(source, records):
+        time.sleep(0.3)
+        return add(source, records)
+
+    monkeypatch.setattr(index, "add", slow_add)
+    records = [{"isbn": "9781869712341", "title": "The River at Dusk", "author": "Mere Walker"}]
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        started = time.perf_counter()
+        index_records("hachette", records)
+        returned = time.perf_counter() - started
+        # The caller changes its records after handing them over
+        records[0]["title"] = "Changed"
+        await asyncio.sleep(0.2)
+        ticker.cancel()
+        return returned, ticks
+
+    returned, ticks = asyncio.run(run())
+    assert returned < 0.05
+    assert ticks >= 10
+    # close() waits for the queued write
+    index.close()
+    assert [r["title"] for r in index.search("walker")] == ["The River at Dusk"]
@@ -0,0 +1,110 @@
+"""
+Browser pool bookkeeping with fake browsers and contexts: leases, the
+scheduler's view of them, draining and the leak audit.
+"""
+import asyncio
+
+import pytest
+
+import browser_pool
+from browser_pool import PooledBrowser
+from pool_fakes import FakeBrowser, make_pool
+from scheduler import PriorityScheduler, scheduling, BULK
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = PriorityScheduler(interactive_reserved=0)
+    monkeypatch.setattr(browser_pool, "scheduler", scheduler)
+    monkeypatch.setattr(PooledBrowser, "rss_bytes", lambda self: 0)
+    return scheduler
+
+def test_acquire_timeout_leaves_the_scheduler_consistent(scheduler, monkeypatch):
+    monkeypatch.setattr(browser_pool, "BROWSER_MAX_CONTEXTS", 1)
+    monkeypatch.setattr(browser_pool, "BROWSER_ACQUIRE_TIMEOUT", 0.05)
+
+    async def run():
+        pool = make_pool(FakeBrowser())
+        held = await pool.acquire("edelweiss", "1")
+        with pytest.raises(TimeoutError):
+            await pool.acquire("edelweiss", "2")
+        # The timed out waiter no longer blocks the queue
+        assert scheduler._waiters == [] and pool.waiting == 0
+        await pool.release(held)
+        await pool.release(await pool.acquire("edelweiss", "3"))
+        return pool
+
+    pool = asyncio.run(run())
+    classes = scheduler.stats()["classes"]
+    assert classes["interactive"]["abandoned"] == 1
+    assert classes["interactive"]["granted"] == 2
+    assert scheduler._active == {} and pool.stats()["active_contexts"] == 0
+
+def test_new_context_failure_releases_the_tenant(scheduler):
+    async def run():
+        pool = make_pool(FakeBrowser(fail_contexts=1))
+        with scheduling(BULK, "shop-1"):
+            with pytest.raises(RuntimeError):
+                await pool.acquire("hachette")
+            assert scheduler._active == {} and pool.browsers[0].pending == 0
+            context = await pool.acquire("hachette")
+            assert scheduler._active == {"shop-1": 1}
+            await pool.release(context)
+        assert scheduler._active == {}
+
+    asyncio.run(run())
+
+def test_release_closes_the_context_before_unleasing_it(scheduler):
+    seen = []
+
+    async def run():
+        pool = make_pool(FakeBrowser())
+        pooled = pool.browsers[0]
+        with scheduling(BULK, "shop-1"):
+            context = await pool.acquire("edelweiss")
+        context.on_close = lambda c: seen.append((c in pooled.leases, pooled.leases[c].closing, dict(scheduler._active)))
+        await pool.release(context)
+        assert context.closed and not pooled.leases and scheduler._active == {}
+
+    asyncio.run(run())
+    # While closing, the lease is still held (marked closing) and counted for its tenant
+    assert seen == [(True, True, {"shop-1": 1})]
+
+def test_draining_browser_is_closed_after_its_last_release(scheduler):
+    async def run():
+        old, new = FakeBrowser(), FakeBrowser()
+        pool = make_pool(old)
+        first = await pool.acquire("edelweiss", "1")
+        second = await pool.acquire("edelweiss", "2")
+        pooled = pool.browsers[0]
+        pooled.draining = True
+        pool.browsers.append(PooledBrowser(new, "--scraper-pool-id=fake1"))
+
+        await pool.release(first)
+        assert not old.closed and pooled in pool.browsers
+        await pool.release(second)
+        assert old.closed and pooled not in pool.browsers
+        # New leases go to the replacement
+        context = await pool.acquire("edelweiss", "3")
+        assert context.browser is new
+        await pool.release(context)
+
+    asyncio.run(run())
+
+def test_audit_releases_a_lease_whose_task_has_finished(scheduler):
+    async def run():
+        pool = make_pool(FakeBrowser())
+
+        async def leaky():
+            # Acquired without release, the task ends holding the lease
+            return await pool.acquire("fantastic_fiction")
+
+        leaked = await asyncio.create_task(leaky())
+        held = await pool.acquire("edelweiss")
+
+        await pool.audit()
+        assert leaked.closed and not held.closed
+        assert list(pool.browsers[0].leases) == [held]
+        assert pool.leaked_contexts == 1
+        await pool.release(held)
+
+    asyncio.run(run())
@@ -0,0 +1,32 @@
+"""
+Diffing stored Hachette catalog snapshots by content hash.
+"""
+from catalog_snapshots import CatalogSnapshots
+
+def book(isbn, price="$30.00", format="Paperback", publication_date="01/01/2026", title="Title"):
+    return {"isbn": isbn, "title": title, "price": price, "format": format, "publication_date": publication_date}
+
+def test_diff_reports_added_removed_and_changed_titles():
+    snapshots = CatalogSnapshots(":memory:")
+    old = snapshots.save("January 2026 HNZ", [book("1"), book("2"), book("3")])
+    new = snapshots.save("January 2026 HNZ", [book("1", title="Renamed"), book("2", price="$35.00"), book("4")])
+
+    changes = snapshots.diff(old, new)
+
+    assert [b["isbn"] for b in changes["added"]] == ["4"]
+    assert [b["isbn"] for b in changes["removed"]] == ["3"]
+    # Only price, format and date count, so the renamed title is unchanged
+    assert changes["changed"] == [
+        {"isbn": "2", "title": "Title", "changes": {"price": {"old": "$30.00", "new": "$35.00"}}}
+    ]
+    assert changes["unchanged"] == 1
+
+def test_latest_snapshot_per_catalog():
+    snapshots = CatalogSnapshots(":memory:")
+    first = snapshots.save("January 2026 HNZ", [book("1")])
+    snapshots.save("January 2026 HCB", [book("1")])
+    second = snapshots.save("January 2026 HNZ", [book("1")])
+
+    assert snapshots.latest("January 2026 HNZ")["id"] == second
+    assert snapshots.latest("January 2026 HNZ", before_id=second)["id"] == first
+    assert snapshots.latest("January 2026 HNZ", before_id=first) is None
@@ -0,0 +1,127 @@
+"""
+Cover cache: de-duplication by content, LRU eviction and URL rewriting.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import httpx
+
+from covers import CoverCache
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+def store(cache, data):
+    return cache._store(hashlib.sha256(data).hexdigest(), data, "image/png", None)
+
+def test_same_content_is_stored_once(tmp_path):
+    async def run():
+        cache = CoverCache(str(tmp_path), max_bytes=10_000)
+        first = await store(cache, PNG)
+        second = await store(cache, PNG)
+        return cache, first, second, await cache.get(first)
+
+    cache, first, second, found = asyncio.run(run())
+    assert first == second
+    assert found == (str(tmp_path / first), "image/png")
+    assert cache.stats()["entries"] == 1
+
+def test_least_recently_used_cover_is_evicted(tmp_path):
+    async def run():
+        cache = CoverCache(str(tmp_path), max_bytes=250)
+        old = await store(cache, PNG + b"1")
+        kept = await store(cache, PNG + b"2")
+        await cache.get(old)  # old is now the most recently used
+        await store(cache, PNG + b"3")
+        return old, kept, await cache.get(old), await cache.get(kept)
+
+    old, kept, found_old, found_kept = asyncio.run(run())
+    assert found_kept is None
+    assert not (tmp_path / kept).exists()
+    assert found_old is not None
+
+def test_covers_of_earlier_runs_are_loaded(tmp_path):
+    async def run():
+        first = CoverCache(str(tmp_path))
+        content_hash = await store(first, PNG)
+        await first.close()
+        second = CoverCache(str(tmp_path))
+        return content_hash, await second.get(content_hash), second.stats()["entries"]
+
+    content_hash, found, entries = asyncio.run(run())
+    assert found == (str(tmp_path / content_hash), "image/png") and entries == 1
+
+class LoopOnlyDict(OrderedDict):
+    """Fails any change made outside the thread running the event loop"""
+
+    def __init__(self, loop_thread):
+        super().__init__()
+        self.loop_thread = loop_thread
+
+    def _check(self):
+        assert threading.current_thread() is self.loop_thread, "cover bookkeeping changed off the event loop"
+
+    def __setitem__(self, key, value):
+        self._check()
+        super().__setitem__(key, value)
+
+    def move_to_end(self, key, last=True):
+        self._check()
+        super().move_to_end(key, last)
+
+    def popitem(self, last=True):
+        self._check()
+        return super().popitem(last)
+
+def test_concurrent_fetches_keep_the_bookkeeping_on_the_loop(tmp_path):
+    covers = {f"https://example.com/{i}.png": PNG + bytes([i]) * 50 for i in range(12)}
+
+    def handler(request):
+        return httpx.Response(200, content=covers[str(request.url)])
+
+    async def run():
+        cache = CoverCache(str(tmp_path), max_bytes=800)
+        cache._entries = LoopOnlyDict(threading.current_thread())
+        cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        cache._semaphore = asyncio.Semaphore(4)
+        books = [{"cover": url} for url in covers]
+        await cache.localize(books)
+        await cache.close()
+        return cache, books
+
+    cache, books = asyncio.run(run())
+    # Covers evicted before their fetch finished keep the remote URL
+    assert all(book["cover"].startswith("/covers/") or book["cover"] in covers for book in books)
+    stats = cache.stats()
+    assert stats["fetched"] == 12 and stats["evicted"] == 12 - stats["entries"]
+    assert stats["bytes"] <= 800
+    # Files on disk, entries and the URL map agree after the evictions
+    assert sorted(os.listdir(tmp_path)) == sorted(cache._entries)
+    assert set(cache._by_url.values()) <= set(cache._entries)
+
+def test_localize_fetches_each_url_once(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, content=PNG if "cover" in str(request.url) else b"<html>")
+
+    async def run():
+        cache = CoverCache(str(tmp_path))
+        cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        cache._semaphore = asyncio.Semaphore(2)
+        books = [
+            {"cover": "https://example.com/cover.png"},
+            {"cover_url": "https://example.com/cover.png"},
+            {"cover": "https://example.com/missing"},
+        ]
+        await cache.localize(books)
+        await cache.close()
+        return books
+
+    books = asyncio.run(run())
+    assert sorted(requests) == ["https://example.com/cover.png", "https://example.com/missing"]
+    assert books[0]["cover"].startswith("/covers/") and books[1]["cover_url"] == books[0]["cover"]
+    assert books[2]["cover"] == "https://example.com/missing"
@@ -0,0 +1,53 @@
+"""
+Request deadlines: timeouts capped by the time left, optional steps
+skipped, and the deadline_ms parameter picked up per request.
+"""
+import asyncio
+
+import deadline
+from deadline import DeadlineMiddleware, can_afford, current_deadline, cut_short, expired, skip_step, timeout_ms
+
+def test_without_a_deadline_timeouts_are_unchanged():
+    assert timeout_ms(60000) == 60000
+    assert can_afford() and not expired()
+
+def test_timeouts_shrink_to_the_time_left(monkeypatch):
+    monkeypatch.setattr(deadline, "DEADLINE_RESERVE_MS", 1000)
+    with deadline.deadline(4000):
+        assert 2900 < timeout_ms(60000) <= 3000
+        assert timeout_ms(500) == 500
+        assert not can_afford(5000) and can_afford(1000)
+    with deadline.deadline(500):
+        # Past the deadline every wait is as short as Playwright allows
+        assert expired() and timeout_ms(15000) == 1
+
+def test_nested_scopes_keep_the_earlier_deadline_and_report_skips():
+    with deadline.deadline(3000) as request:
+        with deadline.deadline(60000) as catalog:
+            assert catalog.ends_at == request.ends_at
+            skip_step("summary")
+            assert cut_short()
+        with deadline.deadline() as other:
+            assert not other.cut_short
+    assert request.skipped == {"summary"}
+    assert current_deadline.get() is None
+
+def test_middleware_reads_the_query_parameter_or_header():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(deadline.remaining_ms())
+
+    middleware = DeadlineMiddleware(app)
+
+    async def call(query=b"", headers=()):
+        await middleware({"type": "http", "query_string": query, "headers": list(headers)}, None, None)
+
+    asyncio.run(call(b"isbn=1&deadline_ms=30000"))
+    asyncio.run(call(headers=[(b"x-deadline-ms", b"20000")]))
+    asyncio.run(call(b"deadline_ms=soon"))
+    asyncio.run(call(b"deadline_ms=-5"))
+
+    assert 28000 < seen[0] <= 29000
+    assert 18000 < seen[1] <= 19000
+    assert seen[2:] == [None, None]
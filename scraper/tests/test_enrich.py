@@ -0,0 +1,105 @@
+"""
+/hachette/enrich on a small pool of fake browsers: the Hachette scrape
+holds a context throughout, and the lookups must never wait on it.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import browser_pool
+import main
+from browser_pool import PooledBrowser
+from pool_fakes import FakeBrowser, make_pool
+from scheduler import PriorityScheduler, scheduling, BULK
+
+ISBNS = [f"97818697{n:05d}" for n in range(8)]
+AUTHORS = ["Mere Walker", "Tom Ellery", "Ana Lusk"]
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(browser_pool, "scheduler", PriorityScheduler(interactive_reserved=1))
+    monkeypatch.setattr(PooledBrowser, "rss_bytes", lambda self: 0)
+    # Much shorter than the Hachette scrape below
+    monkeypatch.setattr(browser_pool, "BROWSER_ACQUIRE_TIMEOUT", 0.3)
+    pool = make_pool(FakeBrowser())
+    state = {"wanting": 0, "peak_wanting": 0, "hachette_done": False}
+
+    async def get_browser_pool():
+        return pool
+
+    async def lease(site, key, seconds):
+        # Contexts asked for at once, held or waited for
+        state["wanting"] += 1
+        state["peak_wanting"] = max(state["peak_wanting"], state["wanting"])
+        try:
+            async with pool.context(site, key):
+                await asyncio.sleep(seconds)
+        finally:
+            state["wanting"] -= 1
+
+    async def stream_hachette_books(url=main.HACHETTE_LOGIN_URL, customer_number="46628", catalog_query=""):
+        state["wanting"] += 1
+        state["peak_wanting"] = max(state["peak_wanting"], state["wanting"])
+        try:
+            async with pool.context("hachette", catalog_query):
+                for i, isbn in enumerate(ISBNS):
+                    await asyncio.sleep(0.08)
+                    yield {"isbn": isbn, "title": f"Title {i}", "author": AUTHORS[i % len(AUTHORS)]}
+        finally:
+            state["wanting"] -= 1
+        state["hachette_done"] = True
+
+    async def scrape_isbns(isbns, **kwargs):
+        await lease("edelweiss", isbns[0], 0.02)
+        return {isbns[0]: {"status": "data_found", "message": "Found 1 book(s)", "books": [{"isbn": isbns[0]}]}}
+
+    async def search_fantastic_fiction(author):
+        await lease("fantastic_fiction", author, 0.02)
+        return SimpleNamespace(success=True, message=f"Found books by {author}", books=[], incomplete=False)
+
+    monkeypatch.setattr(main, "get_browser_pool", get_browser_pool)
+    monkeypatch.setattr(main, "stream_hachette_books", stream_hachette_books)
+    monkeypatch.setattr(main, "scrape_isbns", scrape_isbns)
+    monkeypatch.setattr(main, "search_fantastic_fiction", search_fantastic_fiction)
+    return pool, state
+
+def run_pipeline(state):
+    async def run():
+        records = []
+        with scheduling(BULK, "shop-1"):
+            async for record in main.enrich_hachette_catalog("January 2026 HNZ"):
+                records.append((record, state["hachette_done"]))
+        return records
+    return asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+def assert_all_enriched(records):
+    assert sorted(record["isbn"] for record, _ in records) == ISBNS
+    for record, _ in records:
+        assert record["edelweiss"]["status"] == "data_found"
+        assert record["fantastic_fiction"]["success"]
+
+def test_lookups_wait_for_the_catalog_when_the_pool_has_no_room_beside_it(pipeline, monkeypatch):
+    pool, state = pipeline
+    # Two contexts, one kept for interactive work: bulk work gets one at a time
+    monkeypatch.setattr(browser_pool, "BROWSER_MAX_CONTEXTS", 2)
+
+    records = run_pipeline(state)
+
+    assert_all_enriched(records)
+    # The Hachette context was released before the first lookup asked for one
+    assert all(hachette_done for _, hachette_done in records)
+    assert pool.stats()["active_contexts"] == 0
+
+def test_lookups_stream_within_what_the_pool_leaves_beside_the_catalog(pipeline, monkeypatch):
+    pool, state = pipeline
+    monkeypatch.setattr(browser_pool, "BROWSER_MAX_CONTEXTS", 5)
+
+    records = run_pipeline(state)
+
+    assert_all_enriched(records)
+    # Records arrive while the catalog is still being scraped
+    assert not records[0][1]
+    # The Hachette context and the lookups fit the 4 contexts bulk work may hold, so nothing waits
+    assert state["peak_wanting"] <= 4
+    assert pool.stats()["active_contexts"] == 0
@@ -0,0 +1,64 @@
+"""
+exact=true: only the row matching the ISBN is fully extracted.
+"""
+import asyncio
+
+import pytest
+
+import main
+from edelweiss_fakes import FakePage, FakeRow
+from metrics import FieldMetrics
+
+ISBN = "9780306406157"
+
+@pytest.fixture
+def search_results(monkeypatch):
+    searches = []
+    results = []
+
+    async def open_edelweiss_search(context, isbn, login_required=True, has_session=False, use_index=False):
+        searches.append((isbn, use_index))
+        return FakePage(rows=results), results, None
+
+    monkeypatch.setattr(main, "open_edelweiss_search", open_edelweiss_search)
+    monkeypatch.setattr(main, "field_metrics", FieldMetrics())
+    return results, searches
+
+def test_only_the_matching_row_is_extracted(search_results):
+    results, searches = search_results
+    other_edition = FakeRow("9780306406164", "Audio edition")
+    # Rows show the ISBN as Edelweiss prints it
+    matching = FakeRow("978-0-306-40615-7", "Hardback")
+    related = FakeRow("9781869712341", "Related title")
+    results.extend([other_edition, matching, related])
+
+    result = asyncio.run(main.scrape_isbn(None, ISBN, login_required=False, exact=True))
+
+    assert searches == [(ISBN, True)]
+    books = result["books"]
+    assert books[0]["title"] == "Hardback" and books[0]["isbn"] == "978-0-306-40615-7"
+    assert books[1:] == [
+        {"title": "Audio edition", "isbn": "9780306406164", "stub": True},
+        {"title": "Related title", "isbn": "9781869712341", "stub": True},
+    ]
+    assert matching.fully_extracted
+    assert not other_edition.fully_extracted and not related.fully_extracted
+
+def test_every_row_is_extracted_when_none_matches(search_results):
+    results, _ = search_results
+    results.extend([FakeRow("9780306406164"), FakeRow("9781869712341")])
+
+    result = asyncio.run(main.scrape_isbn(None, ISBN, login_required=False, exact=True))
+
+    assert [book["isbn"] for book in result["books"]] == ["9780306406164", "9781869712341"]
+    assert not any(book.get("stub") for book in result["books"])
+    assert all(row.fully_extracted for row in results)
+
+def test_without_exact_every_row_is_extracted(search_results):
+    results, searches = search_results
+    results.extend([FakeRow(ISBN), FakeRow("9780306406164")])
+
+    result = asyncio.run(main.scrape_isbn(None, ISBN, login_required=False))
+
+    assert searches == [(ISBN, False)]
+    assert len(result["books"]) == 2 and all(row.fully_extracted for row in results)
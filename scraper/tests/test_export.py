@@ -0,0 +1,75 @@
+"""
+/hachette/export: rows encoded as CSV or NDJSON as each title arrives.
+"""
+import asyncio
+import csv
+import io
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+import main
+
+BOOKS = [
+    {"title": 'The "Quiet" Year, Part 1', "author": "Walker, Mere", "isbn": "9781869712341", "price": "$37.99",
+     "format": "Paperback", "publication_date": "01/02/2026", "cover_url": None},
+    {"title": "Te Awa — Ngā Kōrero\nVolume 2", "author": "Ana Lusk", "isbn": "9781869718909", "price": "$45.00",
+     "format": "Hardback", "publication_date": "01/04/2026", "cover_url": "https://hachette.test/c/2.jpg"},
+]
+
+@pytest.fixture
+def catalog(monkeypatch):
+    state = {"books": BOOKS, "fail_after": None, "closed": False}
+
+    async def stream_hachette_books(url, customer_number, query):
+        try:
+            for i, book in enumerate(state["books"]):
+                if state["fail_after"] == i:
+                    raise RuntimeError("page went away")
+                yield book
+        finally:
+            state["closed"] = True
+
+    monkeypatch.setattr(main, "stream_hachette_books", stream_hachette_books)
+    return state
+
+def export(fmt):
+    async def run():
+        response = await main.export_hachette_catalog("January 2026 HNZ", format=fmt)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return response, b"".join(c.encode() if isinstance(c, str) else c for c in chunks)
+    return asyncio.run(run())
+
+def test_csv_rows_are_quoted_and_none_is_empty(catalog):
+    response, body = export("csv")
+
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"] == 'attachment; filename="january_2026_hnz.csv"'
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == main.EXPORT_FIELDS
+    assert rows[1] == [BOOKS[0][field] or "" for field in main.EXPORT_FIELDS]
+    assert rows[2] == [BOOKS[1][field] for field in main.EXPORT_FIELDS]
+    assert catalog["closed"]
+
+def test_ndjson_has_one_book_per_line(catalog):
+    response, body = export("ndjson")
+
+    assert response.media_type == "application/x-ndjson"
+    lines = body.decode().split("\n")
+    assert lines[-1] == "" and [orjson.loads(line) for line in lines[:-1]] == BOOKS
+
+def test_a_failure_mid_stream_ends_it_after_the_rows_sent(catalog):
+    catalog["fail_after"] = 1
+
+    _, body = export("ndjson")
+
+    assert [orjson.loads(line) for line in body.decode().splitlines()] == BOOKS[:1]
+    assert catalog["closed"]
+
+def test_an_empty_catalog_is_an_error_response(catalog):
+    catalog["books"] = []
+
+    with pytest.raises(HTTPException) as raised:
+        export("csv")
+    assert raised.value.status_code == 502
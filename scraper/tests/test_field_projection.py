@@ -0,0 +1,60 @@
+"""
+fields= projection and per-field timing, run against fake rows and tabs.
+"""
+import asyncio
+
+import pytest
+
+import main
+from deadline import deadline
+from edelweiss_fakes import FakeContext, FakePage, FakeRow
+from metrics import FieldMetrics
+from product_index import ProductIndex
+from summary_cache import SummaryCache
+
+ISBNS = ["9780306406157", "9781869712341", "9781869718909"]
+
+@pytest.fixture(autouse=True)
+def fake_edelweiss(monkeypatch):
+    async def search_edelweiss(page, keywords):
+        return [FakeRow(isbn) for isbn in ISBNS]
+
+    async def extract_summary_from_title_click(page, book):
+        return f"Summary of {book.isbn}"
+
+    monkeypatch.setattr(main, "search_edelweiss", search_edelweiss)
+    monkeypatch.setattr(main, "extract_summary_from_title_click", extract_summary_from_title_click)
+    monkeypatch.setattr(main, "product_index", ProductIndex(":memory:"))
+    monkeypatch.setattr(main, "summary_cache", SummaryCache())
+    monkeypatch.setattr(main, "field_metrics", FieldMetrics())
+
+def test_summaries_in_tabs_are_timed():
+    summaries = asyncio.run(main.extract_summaries_in_tabs(FakeContext(), "keywords", ISBNS))
+
+    assert summaries == {isbn: f"Summary of {isbn}" for isbn in ISBNS}
+    assert main.field_metrics.stats()["fields"]["summary"]["extracted"] == 3
+
+def test_tabs_are_not_opened_without_time_for_them():
+    context = FakeContext()
+
+    async def run():
+        with deadline(3000) as scope:
+            summaries = await main.extract_summaries_in_tabs(context, "keywords", ISBNS)
+        return summaries, scope.skipped
+
+    summaries, skipped = asyncio.run(run())
+    assert summaries == {} and skipped == {"summary"}
+    assert context.pages == []
+
+def test_projection_returns_and_extracts_only_the_requested_fields():
+    rows = [FakeRow(isbn) for isbn in ISBNS]
+
+    books = asyncio.run(main.extract_books(FakeContext(), FakePage(), "keywords", rows, fields={"title", "summary"}))
+
+    assert books == [{"title": f"Title {isbn}", "summary": f"Summary of {isbn}"} for isbn in ISBNS]
+    fields = main.field_metrics.stats()["fields"]
+    assert fields["summary"]["extracted"] == 3
+    # Rows are matched by ISBN, so it is read even when not returned
+    assert fields["isbn"]["extracted"] == 3
+    assert fields["author"]["skipped"] == 3 and fields["author"]["extracted"] == 0
+    assert "pages" not in fields or fields["pages"]["extracted"] == 0
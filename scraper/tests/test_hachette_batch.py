@@ -0,0 +1,83 @@
+"""
+/hachette/scrape-batch: one login for several catalogs, each catalog
+failing or succeeding on its own.
+"""
+import asyncio
+
+import orjson
+import pytest
+
+import main
+from edelweiss_fakes import FakePool
+
+CATALOGS = ["January 2026 HNZ", "February 2026 HNZ", "January 2026 HCB"]
+BROKEN = "February 2026 HNZ"
+
+def book(query, n):
+    return {"title": f"{query} #{n}", "author": "A. Writer", "isbn": f"97818697{n:05d}", "price": "$30.00",
+            "format": "Paperback", "publication_date": "01/01/2026", "cover_url": None}
+
+@pytest.fixture
+def hachette(monkeypatch):
+    pool = FakePool()
+    snapshots = []
+    state = {"logged_in": True}
+
+    async def get_browser_pool():
+        return pool
+
+    async def open_hachette_session(context, url=main.HACHETTE_LOGIN_URL, customer_number="46628"):
+        return "https://hachette.test/catalogs" if state["logged_in"] else None
+
+    async def scrape_hachette_catalog_in_tab(context, catalogs_url, catalog_query):
+        if catalog_query == BROKEN:
+            raise RuntimeError("Catalog link not found")
+        # The others are still running when the broken catalog fails
+        await asyncio.sleep(0.01)
+        return [book(catalog_query, n) for n in range(2)]
+
+    monkeypatch.setattr(main, "get_browser_pool", get_browser_pool)
+    monkeypatch.setattr(main, "open_hachette_session", open_hachette_session)
+    monkeypatch.setattr(main, "scrape_hachette_catalog_in_tab", scrape_hachette_catalog_in_tab)
+    monkeypatch.setattr(main, "record_snapshot", lambda query, books: snapshots.append(query))
+    monkeypatch.setattr(main, "COVER_CACHE_ENABLED", False)
+    return pool, snapshots, state
+
+def test_a_failing_catalog_does_not_fail_the_others(hachette):
+    pool, snapshots, _ = hachette
+
+    response = asyncio.run(main.scrape_hachette_batch(main.HachetteBatchRequest(catalogs=CATALOGS)))
+    body = orjson.loads(response.body)
+
+    assert not body["success"]
+    assert list(body["catalogs"]) == CATALOGS
+    broken = body["catalogs"][BROKEN]
+    assert not broken["success"] and broken["message"] == "Catalog link not found" and broken["books"] == []
+    for query in CATALOGS:
+        if query != BROKEN:
+            assert body["catalogs"][query]["success"] and body["catalogs"][query]["total_books"] == 2
+    # One login for the batch; only complete scrapes are snapshotted
+    assert pool.leases == [("hachette", "batch")]
+    assert sorted(snapshots) == sorted(query for query in CATALOGS if query != BROKEN)
+
+def test_streamed_batch_reports_each_catalog(hachette):
+    async def run():
+        response = await main.scrape_hachette_batch(main.HachetteBatchRequest(catalogs=CATALOGS), stream=True)
+        return [orjson.loads(line) async for line in response.body_iterator]
+
+    lines = asyncio.run(run())
+
+    # The failure finishes first and is streamed without waiting for the rest
+    assert lines[0]["catalog"] == BROKEN and not lines[0]["success"]
+    assert sorted(line["catalog"] for line in lines) == sorted(CATALOGS)
+    assert all(line["success"] for line in lines[1:])
+
+def test_failed_login_fails_every_catalog(hachette):
+    _, snapshots, state = hachette
+    state["logged_in"] = False
+
+    response = asyncio.run(main.scrape_hachette_batch(main.HachetteBatchRequest(catalogs=CATALOGS)))
+    body = orjson.loads(response.body)
+
+    assert {query: result["message"] for query, result in body["catalogs"].items()} == dict.fromkeys(CATALOGS, "Hachette login failed")
+    assert snapshots == []
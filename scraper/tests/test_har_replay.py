@@ -0,0 +1,57 @@
+"""
+Run a scraper entirely from a HAR archive, with no outbound network.
+
+har/fantastic_fiction/author-david-baldacci.har holds the live search URL
+answered with the Fantastic Fiction fixture page. The scraper runs in a
+subprocess because har_archive reads SCRAPER_HAR_MODE at import time.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.usefixtures("chromium")
+
+REPLAY_SCRIPT = """
+import asyncio, json
+from browser_pool import close_browser_pool
+from fantastic_fiction_scraper import search_fantastic_fiction
+
+async def run():
+    try:
+        result = await search_fantastic_fiction("David Baldacci")
+    finally:
+        await close_browser_pool()
+    print(json.dumps(result.model_dump()))
+
+asyncio.run(run())
+"""
+
+def run_replay():
+    env = {
+        **os.environ,
+        "SCRAPER_HAR_MODE": "replay",
+        "SCRAPER_HAR_DIR": os.path.join(SCRAPER_DIR, "har"),
+        # Replay must not depend on overrides pointing at a local server
+        "FANTASTIC_FICTION_URL": "https://www.fantasticfiction.com",
+        "BROWSER_POOL_SIZE": "1",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", REPLAY_SCRIPT],
+        cwd=SCRAPER_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def test_fantastic_fiction_search_replays_from_archive():
+    result = run_replay()
+
+    assert result["success"] is True
+    assert result["total_books"] == 10
+    assert result["books"][0]["title"] == "Absolute Power"
+    assert result["books"][0]["author"] == "David Baldacci"
+    assert result["books"][0]["url"] == "https://www.fantasticfiction.com/b/david-baldacci/absolute-power.htm"
@@ -0,0 +1,26 @@
+"""
+ISBN canonicalization and de-duplication done before any browser work.
+"""
+from isbn import normalize_isbn, dedupe_isbns
+
+def test_forms_of_one_title_normalize_to_the_same_isbn13():
+    forms = ["9780306406157", "978-0-306-40615-7", "0-306-40615-2", "0306406152", "ISBN 978 0 306 40615 7"]
+    assert {normalize_isbn(form) for form in forms} == {"9780306406157"}
+
+def test_isbn10_with_x_check_digit():
+    assert normalize_isbn("0-8044-2957-X") == "9780804429573"
+
+def test_invalid_isbns_are_rejected():
+    for garbage in ["", "123", "9780306406158", "0306406153", "9770306406156", "abcdefghij"]:
+        assert normalize_isbn(garbage) is None
+
+def test_dedupe_keeps_every_input_form():
+    unique, by_input, invalid = dedupe_isbns([" 0306406152", "978-0-306-40615-7", "9781869712341", "nope", "nope"])
+
+    assert unique == ["9780306406157", "9781869712341"]
+    assert by_input == {
+        "0306406152": "9780306406157",
+        "978-0-306-40615-7": "9780306406157",
+        "9781869712341": "9781869712341",
+    }
+    assert invalid == ["nope"]
@@ -0,0 +1,73 @@
+"""
+Batched Edelweiss searches: chunking, mapping rows back to their ISBN and
+single lookups for the ISBNs a batch did not match.
+"""
+import asyncio
+
+import pytest
+
+import main
+from edelweiss_fakes import FakePage, FakePool, FakeRow
+
+ISBNS = ["9780306406157", "9781869712341", "9781869715670", "9781869718909", "9781869720032"]
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+
+    async def get_browser_pool():
+        return pool
+
+    monkeypatch.setattr(main, "get_browser_pool", get_browser_pool)
+    monkeypatch.setattr(main, "index_records", lambda source, records: None)
+    monkeypatch.setattr(main.postgres_sink, "submit", lambda source, records: None)
+    return pool
+
+def found(isbn):
+    return {"status": "data_found", "message": f"Found 1 book(s) for ISBN {isbn}", "books": [{"isbn": isbn}]}
+
+def test_chunks_fall_back_to_single_lookups_for_unmatched_isbns(pool, monkeypatch):
+    batches, singles = [], []
+    unmatched = {"9781869712341", "9781869720032"}
+
+    async def scrape_isbn_batch(context, chunk, *args, **kwargs):
+        batches.append(list(chunk))
+        return {isbn: found(isbn) for isbn in chunk if isbn not in unmatched}
+
+    async def scrape_isbn(context, isbn, *args, **kwargs):
+        singles.append(isbn)
+        return found(isbn)
+
+    monkeypatch.setattr(main, "scrape_isbn_batch", scrape_isbn_batch)
+    monkeypatch.setattr(main, "scrape_isbn", scrape_isbn)
+
+    # ISBN-10 and hyphenated forms of the first title count once
+    inputs = ISBNS + ["0-306-40615-2", "978-0-306-40615-7"]
+    results = asyncio.run(main.scrape_isbns(inputs, login_required=False, batch_size=2))
+
+    assert batches == [ISBNS[0:2], ISBNS[2:4], ISBNS[4:5]]
+    assert singles == ["9781869712341", "9781869720032"]
+    assert pool.leases == [
+        ("edelweiss", "batch-9780306406157"), ("edelweiss", "batch-9781869715670"), ("edelweiss", "batch-9781869720032"),
+        ("edelweiss", "9781869712341"), ("edelweiss", "9781869720032"),
+    ]
+    assert all(results[raw]["status"] == "data_found" for raw in inputs)
+    assert results["0-306-40615-2"] is results["9780306406157"]
+
+def test_batch_rows_are_mapped_back_to_their_isbn(monkeypatch):
+    keywords = []
+    rows = [FakeRow("978-0-306-40615-7"), FakeRow("9789999999991"), FakeRow("9781869712341"), FakeRow("9780306406157")]
+
+    async def open_edelweiss_search(context, isbn, login_required=True, has_session=False, use_index=False):
+        keywords.append(isbn)
+        return FakePage(rows=rows), rows, None
+
+    monkeypatch.setattr(main, "open_edelweiss_search", open_edelweiss_search)
+
+    results = asyncio.run(main.scrape_isbn_batch(None, ISBNS[:3], login_required=False))
+
+    assert keywords == [" ".join(ISBNS[:3])]
+    # Rows of other titles are dropped and the unmatched ISBN is left out
+    assert sorted(results) == ["9780306406157", "9781869712341"]
+    assert [book["isbn"] for book in results["9780306406157"]["books"]] == ["978-0-306-40615-7", "9780306406157"]
+    assert not rows[1].fully_extracted
@@ -0,0 +1,69 @@
+"""
+Product index: stored Edelweiss title URLs, opened directly on a hit and
+dropped when stale.
+"""
+import asyncio
+
+import pytest
+
+import main
+from edelweiss_fakes import FakePage, FakeRow
+from product_index import ProductIndex
+
+ISBN = "9780306406157"
+URL = f"https://edelweiss.test/#sku={ISBN}"
+
+@pytest.fixture
+def index(monkeypatch):
+    index = ProductIndex(":memory:")
+    monkeypatch.setattr(main, "product_index", index)
+    return index
+
+def test_hit_opens_the_stored_url(index):
+    index.put("978-0-306-40615-7", URL)
+    row = FakeRow(ISBN)
+    page = FakePage(rows=[FakeRow("9781869712341"), row])
+
+    assert asyncio.run(main.open_indexed_title(page, ISBN)) is row
+    assert page.url == URL
+    assert index.stats() == {"entries": 1, "hits": 1, "misses": 0, "stale": 0}
+
+def test_miss_does_not_navigate(index):
+    page = FakePage(rows=[FakeRow(ISBN)])
+
+    assert asyncio.run(main.open_indexed_title(page, ISBN)) is None
+    assert page.url == "about:blank"
+    assert index.stats()["misses"] == 1
+
+def test_stale_urls_are_dropped(index):
+    other = "9781869712341"
+    index.put(ISBN, URL)
+    index.put(other, f"https://edelweiss.test/#sku={other}")
+
+    # The URL now shows a different title
+    page = FakePage(rows=[FakeRow("9781869715670")])
+    assert asyncio.run(main.open_indexed_title(page, ISBN)) is None
+    # The URL no longer loads
+    page = FakePage(rows=[FakeRow(other)], broken_urls=[f"https://edelweiss.test/#sku={other}"])
+    assert asyncio.run(main.open_indexed_title(page, other)) is None
+
+    assert index.get(ISBN) is None and index.get(other) is None
+    assert index.stale == 2
+
+def test_title_click_url_is_remembered(index):
+    page = FakePage()
+    page.url = "https://edelweiss.test/dashboard"
+    main.remember_title_url(page, ISBN)
+    assert index.get(ISBN) is None
+
+    page.url = URL
+    main.remember_title_url(page, ISBN)
+    assert index.get("978-0-306-40615-7") == URL
+
+def test_urls_survive_a_restart(tmp_path):
+    path = str(tmp_path / "products.sqlite3")
+    index = ProductIndex(path)
+    index.put(ISBN, URL)
+    index.close()
+
+    assert ProductIndex(path).get(ISBN) == URL
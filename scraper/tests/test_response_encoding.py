@@ -0,0 +1,60 @@
+"""
+Accept-Encoding negotiation and size-thresholded response compression.
+"""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import response_encoding
+from response_encoding import CompressionMiddleware, ORJSONResponse, negotiate_encoding
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    async def small():
+        return ORJSONResponse({"ok": True})
+
+    @app.get("/large")
+    async def large():
+        return ORJSONResponse({"books": [{"title": "A title", "isbn": str(i)} for i in range(100)]})
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(3):
+                yield f'{{"row": {i}}}\n'
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+def test_negotiation_follows_client_preference():
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("deflate, gzip;q=0.5") == "gzip"
+    expected = "br" if response_encoding.brotli is not None else "gzip"
+    assert negotiate_encoding("gzip, br") == expected
+    assert negotiate_encoding("*") == expected
+
+def test_only_bodies_over_the_threshold_are_compressed():
+    client = make_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    small = client.get("/small", headers=headers)
+    assert "content-encoding" not in small.headers
+
+    large = client.get("/large", headers=headers)
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert large.json()["books"][99] == {"title": "A title", "isbn": "99"}
+    # Content-Length is what went over the wire; httpx has decoded the body
+    assert int(large.headers["content-length"]) < len(large.content)
+
+def test_streams_are_compressed_chunk_by_chunk():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines() == ['{"row": 0}', '{"row": 1}', '{"row": 2}']
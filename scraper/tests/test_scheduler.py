@@ -0,0 +1,73 @@
+"""
+Priority scheduling: who gets the next free browser context.
+"""
+import asyncio
+
+from scheduler import PriorityScheduler, SchedulingMiddleware, scheduling, current_priority, current_tenant, INTERACTIVE, BULK, BACKGROUND
+
+def enter(scheduler, priority, tenant="default"):
+    with scheduling(priority, tenant):
+        return scheduler.enter()
+
+def test_interactive_goes_before_queued_bulk_and_background():
+    scheduler = PriorityScheduler(interactive_reserved=0)
+    background = enter(scheduler, BACKGROUND)
+    bulk = enter(scheduler, BULK)
+    interactive = enter(scheduler, INTERACTIVE)
+
+    assert scheduler.may_take(interactive, free=1, capacity=4)
+    assert not scheduler.may_take(bulk, free=1, capacity=4)
+    scheduler.granted(interactive)
+    assert scheduler.may_take(bulk, free=1, capacity=4)
+    scheduler.granted(bulk)
+    assert scheduler.may_take(background, free=1, capacity=4)
+
+def test_tenants_alternate_within_a_class():
+    scheduler = PriorityScheduler(interactive_reserved=0)
+    first = [enter(scheduler, BULK, "a") for _ in range(2)]
+    other = enter(scheduler, BULK, "b")
+
+    scheduler.granted(first[0])
+    # Tenant a holds a context, so b's later ticket goes first
+    assert scheduler.may_take(other, free=1, capacity=4)
+    assert not scheduler.may_take(first[1], free=1, capacity=4)
+    scheduler.granted(other)
+    scheduler.released("a")
+    assert scheduler.may_take(first[1], free=1, capacity=4)
+
+def test_reserved_contexts_are_left_for_interactive_work():
+    scheduler = PriorityScheduler(interactive_reserved=1)
+    bulk = enter(scheduler, BULK)
+
+    assert not scheduler.may_take(bulk, free=1, capacity=4)
+    assert scheduler.may_take(bulk, free=2, capacity=4)
+    # A single-context pool is never fully reserved
+    assert scheduler.may_take(bulk, free=1, capacity=1)
+    scheduler.abandoned(bulk)
+    assert scheduler.stats()["classes"][BULK]["abandoned"] == 1
+
+def test_capacity_for_leaves_out_the_reserved_contexts():
+    scheduler = PriorityScheduler(interactive_reserved=1)
+
+    assert scheduler.capacity_for(INTERACTIVE, 4) == 4
+    assert scheduler.capacity_for(BULK, 4) == 3
+    assert scheduler.capacity_for(BACKGROUND, 1) == 1
+    assert scheduler.capacity_for(BULK, 0) == 0
+
+def test_middleware_sets_priority_from_route_and_headers():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append((current_priority.get(), current_tenant.get()))
+
+    middleware = SchedulingMiddleware(app, route_priorities={"/scrape": INTERACTIVE, "/scrape-multiple": BULK})
+
+    async def call(path, headers=()):
+        await middleware({"type": "http", "path": path, "headers": list(headers)}, None, None)
+
+    asyncio.run(call("/scrape-multiple"))
+    asyncio.run(call("/scrape", [(b"x-tenant", b"shop-2")]))
+    asyncio.run(call("/scrape", [(b"x-priority", b"Background")]))
+    asyncio.run(call("/metrics"))
+
+    assert seen == [(BULK, "default"), (INTERACTIVE, "shop-2"), (BACKGROUND, "default"), (INTERACTIVE, "default")]
@@ -0,0 +1,75 @@
+"""
+Selector ordering learned by the registry, its persistence, and fallback
+lists resolved in the page.
+"""
+import asyncio
+
+import selector_registry
+from selector_registry import SelectorRegistry, resolve_first
+
+def test_winner_is_tried_first_and_fallbacks_stay_last(tmp_path):
+    registry = SelectorRegistry(str(tmp_path / "stats.json"))
+    selectors = ["#a", "#b", "#c"]
+
+    assert registry.order("site", "slot", selectors, ["p"]) == ["#a", "#b", "#c", "p"]
+
+    registry.record_hit("site", "slot", "#c")
+    registry.record_hit("site", "slot", "#c")
+    registry.record_hit("site", "slot", "p")
+    registry.record_hit("site", "slot", "p")
+    registry.record_hit("site", "slot", "p")
+
+    assert registry.order("site", "slot", selectors, ["p"]) == ["#c", "#a", "#b", "p"]
+
+def test_counts_survive_a_restart(tmp_path):
+    path = str(tmp_path / "stats.json")
+    registry = SelectorRegistry(path)
+    registry.record_hit("site", "slot", "#b")
+    registry.record_miss("site", "slot")
+    registry.save()
+
+    stats = SelectorRegistry(path).stats()["site"]["slot"]
+    assert stats["lookups"] == 2
+    assert stats["misses"] == 1
+    assert stats["selectors"] == [{"selector": "#b", "hits": 1, "hit_rate": 0.5}]
+
+PAGE = """
+<form>
+  <button id="cancel">Cancel</button>
+  <button id="go">
+      Sign   In
+  </button>
+  <p id="note">Short</p>
+</form>
+"""
+
+async def resolve_on_page(selectors, **kwargs):
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.set_content(PAGE)
+            element, selector, text = await resolve_first(page, "site", "slot", selectors, **kwargs)
+            # The element handle outlives the disposed result object
+            element_id = await element.get_attribute("id") if element else None
+            return element_id, selector, text
+        finally:
+            await browser.close()
+
+def test_has_text_matches_like_playwright(chromium, monkeypatch):
+    monkeypatch.setattr(selector_registry, "selector_registry", SelectorRegistry(None))
+
+    # Case-insensitive, across collapsed whitespace and line breaks
+    element_id, selector, _ = asyncio.run(resolve_on_page(['button:has-text("sign in")']))
+    assert (element_id, selector) == ("go", 'button:has-text("sign in")')
+    element_id, _, _ = asyncio.run(resolve_on_page(["#missing", 'button:has-text("SIGN  IN")']))
+    assert element_id == "go"
+
+def test_resolve_first_applies_text_conditions(chromium, monkeypatch):
+    registry = SelectorRegistry(None)
+    monkeypatch.setattr(selector_registry, "selector_registry", registry)
+
+    assert asyncio.run(resolve_on_page(["button"], exclude_text=["cancel"]))[0] == "go"
+    assert asyncio.run(resolve_on_page(["p"], longer_than=5)) == (None, None, None)
+    assert registry.stats()["site"]["slot"]["misses"] == 1
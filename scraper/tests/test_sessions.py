@@ -0,0 +1,58 @@
+"""
+Logged-in sessions: expiry, refresh margins and the /readyz probe.
+"""
+import asyncio
+import json
+
+import main
+import sessions
+from sessions import SessionStore
+
+STATE = {"cookies": [{"name": "sid", "value": "1"}], "origins": []}
+
+def test_sessions_expire_after_their_ttl(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_TTL_SECONDS", 60)
+    store = SessionStore()
+    store.save("edelweiss", STATE, url="https://example.test/dashboard")
+
+    assert store.get("edelweiss").url == "https://example.test/dashboard"
+    assert store.context_options("edelweiss") == {"storage_state": STATE}
+    assert not store.expires_within("edelweiss", 30)
+    assert store.expires_within("edelweiss", 90)
+
+    store._sessions["edelweiss"].created_at -= 61
+    assert store.get("edelweiss") is None
+    assert store.context_options("edelweiss") == {}
+    assert store.status()["edelweiss"] == {"valid": False, "age_s": 61, "expires_in_s": 0}
+
+def test_invalidated_sessions_are_dropped():
+    store = SessionStore()
+    store.save("hachette", STATE)
+    store.invalidate("hachette")
+
+    assert store.get("hachette") is None
+    assert store.expires_within("hachette", 0)
+    assert store.status() == {}
+
+class FakePool:
+    def stats(self):
+        return {"browsers": [{"id": "a"}], "waiting": 2}
+
+def test_readyz_waits_for_the_pool_and_warm_sessions(monkeypatch):
+    store = SessionStore()
+    monkeypatch.setattr(main, "session_store", store)
+    monkeypatch.setattr(main, "WARM_UP_ON_STARTUP", True)
+    monkeypatch.setattr(main, "warm_up_state", {"done": False, "errors": {}})
+    monkeypatch.setattr(main, "current_browser_pool", lambda: None)
+
+    response = asyncio.run(main.readyz())
+    assert response.status_code == 503
+    assert json.loads(response.body)["checks"] == {"browser_pool": False, "warm_up": False, "sessions": False}
+
+    monkeypatch.setattr(main, "current_browser_pool", lambda: FakePool())
+    main.warm_up_state["done"] = True
+    for site in main.WARM_SESSIONS:
+        store.save(site, STATE)
+    response = asyncio.run(main.readyz())
+    body = json.loads(response.body)
+    assert response.status_code == 200 and body["ready"] and body["queue_depth"] == 2
@@ -0,0 +1,46 @@
+"""
+Summary cache: ISBN-normalized keys, expiry, negative entries and LRU
+eviction.
+"""
+from summary_cache import SummaryCache
+
+def age(cache, isbn, seconds):
+    key = cache._key(isbn)
+    stored_at, summary = cache._entries[key]
+    cache._entries[key] = (stored_at - seconds, summary)
+
+def test_any_spelling_of_an_isbn_finds_the_entry():
+    cache = SummaryCache()
+    cache.put("978-0-306-40615-7", "A summary")
+
+    assert cache.get("9780306406157") == "A summary"
+    assert cache.get("0-306-40615-2") == "A summary"
+    assert cache.lookup("ISBN 9780306406157") == (True, "A summary")
+    assert cache.hits == 3
+
+def test_titles_without_a_summary_are_cached_for_the_shorter_ttl():
+    cache = SummaryCache(ttl_seconds=3600, negative_ttl_seconds=60)
+    cache.put("9780306406157", None)
+    cache.put("9781869712341", "A summary")
+
+    assert cache.lookup("9780306406157") == (True, None)
+    assert cache.get("9780306406157") is None
+
+    age(cache, "9780306406157", 61)
+    age(cache, "9781869712341", 61)
+    assert cache.lookup("9780306406157") == (False, None)
+    assert cache.lookup("9781869712341") == (True, "A summary")
+
+    age(cache, "9781869712341", 3600)
+    assert cache.lookup("9781869712341") == (False, None)
+    assert cache.misses == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SummaryCache(max_entries=2)
+    cache.put("9780306406157", "first")
+    cache.put("9781869712341", "second")
+    cache.get("9780306406157")
+    cache.put("9781869715670", None)
+
+    assert cache.lookup("9781869712341") == (False, None)
+    assert cache.get("9780306406157") == "first"
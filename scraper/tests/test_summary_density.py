@@ -0,0 +1,55 @@
+"""
+The in-page summary fallback on the Edelweiss fixture: with a title's side
+panel open, SUMMARY_DENSITY_JS must pick that title's summary, where the
+old fallback (the first element with more than 200 characters of text)
+picked a page-wide container.
+"""
+import asyncio
+import os
+
+from benchmarks.fixture_server import FIXTURES_DIR
+from benchmarks.run_benchmarks import load_edelweiss_fixture_books
+from main import SUMMARY_DENSITY_JS
+
+FIRST_LONG_ELEMENT_JS = """
+() => {
+    for (const el of document.querySelectorAll('*')) {
+        if (el.textContent.trim().length > 200) return el.textContent;
+    }
+    return null;
+}
+"""
+
+async def pick_summaries(books):
+    from playwright.async_api import async_playwright
+    picked = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.goto("file://" + os.path.join(FIXTURES_DIR, "edelweiss", "index.html"))
+            await page.click('button[type="submit"]')
+            await page.fill('input[name="keywords"]', " ".join(b["isbn"] for b in books))
+            await page.press('input[name="keywords"]', "Enter")
+            await page.wait_for_selector(f'[data-isbn="{books[-1]["isbn"]}"]')
+            # Every result row stays on the page while each panel is open
+            for book in books:
+                await page.click(f'[data-isbn="{book["isbn"]}"] .titleName___t0XBl')
+                await page.click('button[aria-label="Content"]')
+                await page.wait_for_selector('div[role="tabpanel"]:not([hidden])')
+                picked[book["isbn"]] = (
+                    await page.evaluate(SUMMARY_DENSITY_JS),
+                    await page.evaluate(FIRST_LONG_ELEMENT_JS),
+                )
+        finally:
+            await browser.close()
+    return picked
+
+def test_density_scoring_picks_the_open_titles_summary(chromium):
+    books = [b for b in load_edelweiss_fixture_books() if b.get("summary")]
+    picked = asyncio.run(pick_summaries(books))
+
+    for book in books:
+        density, first_long = picked[book["isbn"]]
+        assert density == book["summary"]
+        assert first_long != book["summary"]
@@ -0,0 +1,66 @@
+"""
+Summaries fanned out across tabs of one logged-in context, with fake pages
+standing in for Chromium.
+"""
+import asyncio
+
+import pytest
+
+import main
+from edelweiss_fakes import FakeContext, FakePage, FakeRow
+from product_index import ProductIndex
+from summary_cache import SummaryCache
+
+ISBNS = ["9780306406157", "9781869712341", "9781869715670", "9781869718909"]
+FAILING = "9781869715670"
+NOT_IN_RESULTS = "9781869720032"
+
+@pytest.fixture(autouse=True)
+def fake_edelweiss(monkeypatch):
+    async def search_edelweiss(page, keywords):
+        return [FakeRow(isbn) for isbn in ISBNS]
+
+    async def extract_summary_from_title_click(page, book):
+        await asyncio.sleep(0.01)
+        if book.isbn == FAILING:
+            raise RuntimeError("side panel did not open")
+        page.url = f"https://edelweiss.test/#sku={book.isbn}"
+        return f"Summary of {book.isbn}"
+
+    monkeypatch.setattr(main, "search_edelweiss", search_edelweiss)
+    monkeypatch.setattr(main, "extract_summary_from_title_click", extract_summary_from_title_click)
+    monkeypatch.setattr(main, "product_index", ProductIndex(":memory:"))
+    monkeypatch.setattr(main, "summary_cache", SummaryCache())
+    monkeypatch.setattr(main, "SUMMARY_CONCURRENCY", 2)
+
+def test_tabs_are_bounded_and_always_closed():
+    context = FakeContext()
+    summaries = asyncio.run(main.extract_summaries_in_tabs(context, " ".join(ISBNS), ISBNS + [NOT_IN_RESULTS]))
+
+    assert summaries == {
+        "9780306406157": "Summary of 9780306406157",
+        "9781869712341": "Summary of 9781869712341",
+        FAILING: None,
+        "9781869718909": "Summary of 9781869718909",
+        NOT_IN_RESULTS: None,
+    }
+    assert context.peak_open_pages == 2
+    assert len(context.pages) == 5 and all(page.closed for page in context.pages)
+    # Each tab remembers the title URL it landed on
+    assert main.product_index.get("9781869712341") == "https://edelweiss.test/#sku=9781869712341"
+
+def test_fill_summaries_uses_the_cache_then_tabs_then_the_page():
+    main.summary_cache.put("9780306406157", "Cached summary")
+    rows = [FakeRow("9780306406157"), FakeRow("9781869712341"), FakeRow("9781869718909"), FakeRow(None)]
+    books_data = [{"isbn": row.isbn} for row in rows]
+    context = FakeContext()
+
+    asyncio.run(main.fill_summaries(context, FakePage(), "keywords", rows, books_data))
+
+    assert [data["summary"] for data in books_data] == [
+        "Cached summary", "Summary of 9781869712341", "Summary of 9781869718909", "Summary of None",
+    ]
+    # Only the two uncached rows with an ISBN went to tabs
+    assert len(context.pages) == 2
+    assert main.summary_cache.get("9781869718909") == "Summary of 9781869718909"
+    assert not any(data.get("incomplete") for data in books_data)